@@ -0,0 +1,405 @@
+from __future__ import annotations
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import shutil
+import string
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import yaml
+
+SCENARIOS = ("workflow_single", "workflow_batch", "ingest", "approve")
+PROPOSED_FACTS = 200  # per approve iteration: 1/4 exact duplicates, 1/4 near-duplicates, 1/2 new
+
+
+@dataclass
+class BenchOptions:
+    iterations: int = 5
+    beats: int = 8
+    workers: int = 4
+    ingest_mb: List[float] = field(default_factory=lambda: [1.0, 10.0])
+    approve_claims: List[int] = field(default_factory=lambda: [100, 1000, 10000])
+    latency: str = "fixed:0"  # llm.fake.latency of the stand-in model
+    keep: bool = False  # keep the synthetic workspaces
+
+
+@dataclass
+class BenchResult:
+    scenario: str
+    params: Dict[str, Any]
+    unit: str  # what throughput counts
+    samples: List[float]  # seconds per iteration (per beat for workflow_batch)
+    units_per_sample: float
+    wall_seconds: float
+    peak_rss_mb: float = 0.0
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    def summary(self) -> Dict[str, Any]:
+        s = sorted(self.samples)
+        units = self.units_per_sample * len(s)
+        per_second = units / self.wall_seconds if self.wall_seconds else 0.0
+        return {
+            "scenario": self.scenario,
+            "params": self.params,
+            "iterations": len(s),
+            "latency_s": {
+                "p50": round(percentile(s, 50), 6),
+                "p90": round(percentile(s, 90), 6),
+                "p99": round(percentile(s, 99), 6),
+                "max": round(s[-1], 6) if s else 0.0,
+                "mean": round(sum(s) / len(s), 6) if s else 0.0,
+            },
+            "throughput": {
+                "unit": self.unit,
+                "per_second": round(per_second, 3),
+            },
+            "peak_rss_mb": round(self.peak_rss_mb, 1),
+            **({"extra": self.extra} if self.extra else {}),
+        }
+
+
+def percentile(sorted_samples: List[float], q: float) -> float:
+    """Linear-interpolated percentile of an already sorted list."""
+    if not sorted_samples:
+        return 0.0
+    pos = (len(sorted_samples) - 1) * q / 100.0
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_samples) - 1)
+    return sorted_samples[lo] + (sorted_samples[hi] - sorted_samples[lo]) * (pos - lo)
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and KiB elsewhere.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+# --- synthetic data ---------------------------------------------------------
+
+_NAMES = ["Mara", "Tobin", "Isolde", "Kestrel", "Arden", "Wren", "Corvin", "Lysa"]
+
+
+def _vocabulary(rng: random.Random, n: int = 4000) -> List[str]:
+    letters = string.ascii_lowercase
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(3, 9))) for _ in range(n)]
+
+
+def _paragraph(rng: random.Random, vocab: List[str]) -> str:
+    sentences = []
+    for _ in range(rng.randint(3, 6)):
+        words = [rng.choice(vocab) for _ in range(rng.randint(6, 14))]
+        words.insert(rng.randrange(len(words)), rng.choice(_NAMES))
+        sentences.append(" ".join(words).capitalize() + ".")
+    return " ".join(sentences)
+
+
+def write_manuscript(path: Path, megabytes: float, seed: int = 0) -> int:
+    """Write about ``megabytes`` MB of chapters of wrapped paragraphs to path; returns its size."""
+    rng = random.Random(seed)
+    vocab = _vocabulary(rng)
+    # ~256 KiB of distinct text, repeated under new chapter headings up to the target size.
+    block_lines: List[str] = []
+    while sum(len(x) + 1 for x in block_lines) < 256 * 1024:
+        para = _paragraph(rng, vocab)
+        block_lines.extend(para[i:i + 72] for i in range(0, len(para), 72))
+        block_lines.append("")
+    block = "\n".join(block_lines) + "\n"
+    target = int(megabytes * 1024 * 1024)
+    written, chapter = 0, 1
+    with path.open("w", encoding="utf-8") as fh:
+        while written < target:
+            head = f"Chapter {chapter}\n\n"
+            fh.write(head + block)
+            written += len(head) + len(block)
+            chapter += 1
+    return path.stat().st_size
+
+
+def make_workspace(
+    root: Path, *, latency: str, canon_claims: int = 50, beats: int = 1, seed: int = 0
+) -> Path:
+    """A project on the fake model with the LLM cache bypassed, plus synthetic canon and outline."""
+    from storyos.core.workspace import Workspace
+
+    Workspace.init_project(target_dir=str(root), name="Bench")
+    cfg_path = root / "project.yaml"
+    cfg = yaml.safe_load(cfg_path.read_text(encoding="utf-8"))
+    fake = {"latency": latency, "seed": seed}
+    cfg["llm"] = {**(cfg.get("llm") or {}), "provider": "fake", "fake": fake}
+    cfg["cache"] = {"llm": {"mode": "bypass"}}
+    cfg_path.write_text(yaml.safe_dump(cfg, sort_keys=False), encoding="utf-8")
+
+    rng = random.Random(seed)
+    vocab = _vocabulary(rng)
+    write_canon(root / "01_CANON" / "world.md", [_claim(rng, vocab) for _ in range(canon_claims)])
+    rules = "# Rules\n\n- Keep the point of view tight.\n"
+    (root / "01_CANON" / "rules.md").write_text(rules, encoding="utf-8")
+    for name in _NAMES[:4]:
+        facts = "\n".join(f"- {_claim(rng, vocab)}" for _ in range(10))
+        path = root / "02_CHARACTERS" / f"{name.lower()}.md"
+        path.write_text(f"# {name}\n\n{facts}\n", encoding="utf-8")
+    outline = ["# Chapter 01", ""]
+    for b in range(1, beats + 1):
+        outline += [f"## beat_{b:02d}", "", f"- {_paragraph(rng, vocab)}", ""]
+    (root / "03_OUTLINES" / "chapter_01.md").write_text("\n".join(outline), encoding="utf-8")
+    return root
+
+
+def _claim(rng: random.Random, vocab: List[str]) -> str:
+    return " ".join([rng.choice(_NAMES)] + [rng.choice(vocab) for _ in range(rng.randint(6, 10))])
+
+
+def write_canon(path: Path, claims: List[str]) -> None:
+    path.write_text("# World\n\n" + "".join(f"- {c} (high)\n" for c in claims), encoding="utf-8")
+
+
+# --- scenarios --------------------------------------------------------------
+
+def _timed(fn: Callable[[], Any]) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def bench_workflow_single(tmp: Path, opts: BenchOptions) -> List[BenchResult]:
+    from storyos.config import load_project_config
+    from storyos.core.workspace import Workspace
+    from storyos.workflow.engine import WorkflowEngine
+
+    root = make_workspace(tmp / "workflow_single", latency=opts.latency)
+    cfg = load_project_config(str(root))
+    engine = WorkflowEngine.from_config(cfg, Workspace.open(project_dir=str(root), config=cfg))
+    t0 = time.perf_counter()
+    samples = [
+        _timed(lambda: engine.run(chapter="chapter_01", beat="beat_01", resume=False))
+        for _ in range(opts.iterations)
+    ]
+    wall = time.perf_counter() - t0
+    return [BenchResult("workflow_single", {"latency": opts.latency}, "beats", samples, 1, wall)]
+
+
+def bench_workflow_batch(tmp: Path, opts: BenchOptions) -> List[BenchResult]:
+    from storyos.config import load_project_config
+    from storyos.core.workspace import Workspace
+    from storyos.workflow.batch import BatchItem, run_batch
+    from storyos.workflow.engine import WorkflowEngine
+
+    root = make_workspace(tmp / "workflow_batch", latency=opts.latency, beats=opts.beats)
+    cfg = load_project_config(str(root))
+    engine = WorkflowEngine.from_config(cfg, Workspace.open(project_dir=str(root), config=cfg))
+    items = [BatchItem("chapter_01", f"beat_{b:02d}") for b in range(1, opts.beats + 1)]
+    samples: List[float] = []
+    failed = 0
+    t0 = time.perf_counter()
+    for _ in range(opts.iterations):
+        outcomes = run_batch(engine, items, workers=opts.workers, resume=False)
+        samples.extend(o.seconds for o in outcomes)
+        failed += sum(1 for o in outcomes if not o.ok)
+    wall = time.perf_counter() - t0
+    params = {"beats": opts.beats, "workers": opts.workers, "latency": opts.latency}
+    extra = {"failed": failed}
+    return [BenchResult("workflow_batch", params, "beats", samples, 1, wall, extra=extra)]
+
+
+def bench_ingest(tmp: Path, opts: BenchOptions, megabytes: float) -> List[BenchResult]:
+    from storyos.config import load_project_config
+    from storyos.ingest.chunking import chunk_by_lines, iter_chunks, mapped_file
+    from storyos.ingest.extract import extract_to_proposals
+    from storyos.llm.registry import get_adapter
+
+    root = make_workspace(tmp / f"ingest_{megabytes:g}mb", latency=opts.latency)
+    src = root / "00_INGEST" / "inputs" / "manuscript.md"
+    size = write_manuscript(src, megabytes)
+    mb = size / (1024 * 1024)
+    params = {"mb": megabytes}
+    results: List[BenchResult] = []
+
+    samples, chunks = [], 0
+    t0 = time.perf_counter()
+    for _ in range(opts.iterations):
+        def _lines() -> None:
+            nonlocal chunks
+            lines = src.read_text(encoding="utf-8").splitlines()
+            chunks = len(chunk_by_lines(lines, max_lines=80, overlap=10))
+        samples.append(_timed(_lines))
+    wall = time.perf_counter() - t0
+    results.append(BenchResult("ingest.chunk_by_lines", params, "MB", samples, mb, wall,
+                               extra={"chunks": chunks}))
+
+    samples = []
+    t0 = time.perf_counter()
+    for _ in range(opts.iterations):
+        def _offsets() -> None:
+            with mapped_file(src) as buf:
+                for _c in iter_chunks(buf, max_lines=80, overlap=10):
+                    pass
+        samples.append(_timed(_offsets))
+    wall = time.perf_counter() - t0
+    results.append(BenchResult("ingest.iter_chunks", params, "MB", samples, mb, wall))
+
+    # Extraction is the slow part; one iteration per size is enough to see the trend.
+    llm = get_adapter(load_project_config(str(root)).llm)
+    t0 = time.perf_counter()
+    run = extract_to_proposals(project_dir=str(root), input_path=str(src), map_reduce=True,
+                               concurrency=8, chunks_per_call=4, llm=llm)
+    wall = time.perf_counter() - t0
+    shutil.rmtree(run.proposals_dir, ignore_errors=True)
+    results.append(BenchResult("ingest.extract_map_reduce", params, "MB", [wall], mb, wall,
+                               extra={"llm_calls": -(-chunks // 4)}))
+    return results
+
+
+def _proposal_run(root: Path, run_id: str, facts: List[str]) -> None:
+    run_dir = root / "00_INGEST" / "proposals" / run_id
+    run_dir.mkdir(parents=True, exist_ok=True)
+    world = {"facts": [{"claim": f, "confidence": "med", "evidence": []} for f in facts]}
+    doc = {"characters": [], "world": world, "timeline": {"events": []}}
+    (run_dir / "raw_llm_output.txt").write_text(json.dumps(doc), encoding="utf-8")
+
+
+def bench_approve(tmp: Path, opts: BenchOptions, claims: int) -> List[BenchResult]:
+    from storyos.ingest.approve import _read_existing_claims, approve_proposals_run
+    from storyos.ingest.near_dup import INDEX_DIR, NearDupIndex
+
+    root = make_workspace(tmp / f"approve_{claims}", latency=opts.latency, canon_claims=0)
+    rng = random.Random(claims)
+    vocab = _vocabulary(rng)
+    canon = [_claim(rng, vocab) for _ in range(claims)]
+    world = root / "01_CANON" / "world.md"
+    write_canon(world, canon)
+
+    quarter = PROPOSED_FACTS // 4
+    exact = rng.sample(canon, min(quarter, len(canon)))
+    near = [
+        " ".join(c.split()[:-1] + [rng.choice(vocab)])
+        for c in rng.sample(canon, min(quarter, len(canon)))
+    ]
+    fresh = [_claim(rng, vocab) for _ in range(PROPOSED_FACTS - len(exact) - len(near))]
+    _proposal_run(root, "bench_run", exact + near + fresh)
+
+    results: List[BenchResult] = []
+    for index in ("cold", "warm"):
+        samples = []
+        index_path = NearDupIndex.index_path(root, world)
+        for _ in range(opts.iterations):
+            shutil.rmtree(root / INDEX_DIR, ignore_errors=True)
+            if index == "warm":
+                idx = NearDupIndex.load(
+                    index_path, world, lambda: sorted(_read_existing_claims(world))
+                )
+                idx.save(index_path, world)
+            samples.append(
+                _timed(lambda: approve_proposals_run(str(root), "bench_run", dry_run=True))
+            )
+        # Wall time is the sum of the samples, so the "warm" index build is left out of it.
+        wall = sum(samples)
+        params = {"claims": claims, "index": index}
+        results.append(BenchResult("approve", params, "proposed facts", samples,
+                                   PROPOSED_FACTS, wall))
+    return results
+
+
+def _run_case(case: Tuple[str, Any], opts: BenchOptions, tmp: str) -> List[Dict[str, Any]]:
+    # Runs in a fresh process, so peak RSS belongs to this case alone.
+    name, arg = case
+    fn: Dict[str, Callable[..., List[BenchResult]]] = {
+        "workflow_single": bench_workflow_single,
+        "workflow_batch": bench_workflow_batch,
+        "ingest": bench_ingest,
+        "approve": bench_approve,
+    }
+    args = (Path(tmp), opts) if arg is None else (Path(tmp), opts, arg)
+    results = fn[name](*args)
+    rss = _peak_rss_mb()
+    for r in results:
+        r.peak_rss_mb = rss
+    return [asdict(r) for r in results]
+
+
+def cases(scenarios: List[str], opts: BenchOptions) -> List[Tuple[str, Any]]:
+    out: List[Tuple[str, Any]] = []
+    for s in scenarios:
+        if s not in SCENARIOS:
+            raise ValueError(f"Unknown scenario {s!r}; choose from {', '.join(SCENARIOS)}")
+        if s == "ingest":
+            out += [(s, mb) for mb in opts.ingest_mb]
+        elif s == "approve":
+            out += [(s, n) for n in opts.approve_claims]
+        else:
+            out.append((s, None))
+    return out
+
+
+def run_bench(
+    scenarios: List[str],
+    opts: BenchOptions,
+    on_case: Optional[Callable[[str, Any], None]] = None,
+) -> Dict[str, Any]:
+    """Run the scenarios, each case in its own process, and return the results document."""
+    tmp = tempfile.mkdtemp(prefix="storyos-bench-")
+    summaries: List[Dict[str, Any]] = []
+    t0 = time.perf_counter()
+    try:
+        ctx = multiprocessing.get_context("spawn")
+        for case in cases(scenarios, opts):
+            if on_case is not None:
+                on_case(*case)
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                raw = pool.submit(_run_case, case, opts, tmp).result()
+            summaries.extend(BenchResult(**r).summary() for r in raw)
+    finally:
+        if not opts.keep:
+            shutil.rmtree(tmp, ignore_errors=True)
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        storyos_version = version("storyos")
+    except PackageNotFoundError:
+        storyos_version = "unknown"
+    return {
+        "storyos_version": storyos_version,
+        "created_utc": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "options": asdict(opts),
+        "wall_seconds": round(time.perf_counter() - t0, 3),
+        "workspace": tmp if opts.keep else None,
+        "results": summaries,
+    }
+
+
+def _result_key(r: Dict[str, Any]) -> str:
+    return str(r["scenario"]) + "".join(f" {k}={v}" for k, v in sorted(r["params"].items()))
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """p50 latency and throughput of current vs. baseline, for the cases present in both."""
+    base = {_result_key(r): r for r in baseline.get("results", [])}
+    rows = []
+    for r in current.get("results", []):
+        b = base.get(_result_key(r))
+        if b is None:
+            continue
+        p50, bp50 = r["latency_s"]["p50"], b["latency_s"]["p50"]
+        tp, btp = r["throughput"]["per_second"], b["throughput"]["per_second"]
+        rows.append({
+            "case": _result_key(r),
+            "p50_s": p50,
+            "p50_change_pct": round((p50 - bp50) / bp50 * 100, 1) if bp50 else None,
+            "throughput": tp,
+            "throughput_change_pct": round((tp - btp) / btp * 100, 1) if btp else None,
+            "peak_rss_mb": r["peak_rss_mb"],
+            "peak_rss_change_mb": round(r["peak_rss_mb"] - b["peak_rss_mb"], 1),
+        })
+    return rows
@@ -1,19 +1,35 @@
 from __future__ import annotations
 from storyos.config import ProjectConfig
 from storyos.core.workspace import Workspace
-from storyos.llm.base import LLMMessage
+from storyos.llm.base import LLMMessage, agenerate
+from storyos.llm.budget import PromptSection, pack_prompt
 
 class ContinuityAgent:
-    def run(self, cfg: ProjectConfig, ws: Workspace, ctx: dict) -> str:
-        llm = ctx["llm"]
+    def messages(self, cfg: ProjectConfig, ws: Workspace, ctx: dict) -> list[LLMMessage]:
+        system = "You are a continuity editor. Be picky and list issues clearly."
+        ask = (
+            "Check the draft against canon. List:\n"
+            "1) Contradictions\n2) Unclear references\n3) Accidental new entities\n"
+            "4) Timeline inconsistencies\n5) Voice drift\n\n"
+        )
+        packed = pack_prompt(cfg, ctx, "continuity", [
+            PromptSection("canon", ctx.get('canon_bundle',''), priority=1),
+            PromptSection("draft", ctx.get('draft_text',''), priority=2),
+        ], fixed=system + ask)
         messages = [
-            LLMMessage(role="system", content="You are a continuity editor. Be picky and list issues clearly."),
+            LLMMessage(role="system", content=system),
             LLMMessage(role="user", content=(
-                "Check the draft against canon. List:\n"
-                "1) Contradictions\n2) Unclear references\n3) Accidental new entities\n"
-                "4) Timeline inconsistencies\n5) Voice drift\n\n"
-                f"Canon:\n{ctx.get('canon_bundle','')}\n\n"
-                f"Draft:\n{ctx.get('draft_text','')}\n"
+                f"{ask}"
+                f"Canon:\n{packed['canon']}\n\n"
+                f"Draft:\n{packed['draft']}\n"
             )),
         ]
-        return llm.generate(messages, model=cfg.llm.model, temperature=0.2).text
+        return messages
+
+    def run(self, cfg: ProjectConfig, ws: Workspace, ctx: dict) -> str:
+        llm = ctx["llm"]
+        return llm.generate(self.messages(cfg, ws, ctx), model=cfg.llm.model, temperature=0.2).text
+
+    async def arun(self, cfg: ProjectConfig, ws: Workspace, ctx: dict) -> str:
+        result = await agenerate(ctx["llm"], self.messages(cfg, ws, ctx), model=cfg.llm.model, temperature=0.2)
+        return result.text
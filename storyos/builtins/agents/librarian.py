@@ -6,3 +6,6 @@ class LibrarianAgent:
     def run(self, cfg: ProjectConfig, ws: Workspace, ctx: dict) -> str:
         # Placeholder: later apply canon patches after user approval
         return ""
+
+    async def arun(self, cfg: ProjectConfig, ws: Workspace, ctx: dict) -> str:
+        return self.run(cfg, ws, ctx)
@@ -1,20 +1,34 @@
 from __future__ import annotations
 from storyos.config import ProjectConfig
 from storyos.core.workspace import Workspace
-from storyos.llm.base import LLMMessage
+from storyos.llm.base import LLMMessage, agenerate
+from storyos.llm.budget import PromptSection, pack_prompt
 
 class PlannerAgent:
-    def run(self, cfg: ProjectConfig, ws: Workspace, ctx: dict) -> str:
-        llm = ctx["llm"]
+    def messages(self, cfg: ProjectConfig, ws: Workspace, ctx: dict) -> list[LLMMessage]:
         target = cfg.project.target_beat_words
+        system = "You are a story beat planner. Output a concise beat plan."
+        header = f"Project: {cfg.project.name}\nChapter: {ctx['chapter']}\nBeat: {ctx['beat']}\n\n"
+        ask = f"Create a beat plan that can be drafted into ~{target} words."
+        packed = pack_prompt(cfg, ctx, "planner", [
+            PromptSection("canon", ctx.get('canon_bundle',''), priority=1),
+            PromptSection("outline", ctx.get('chapter_outline',''), priority=2),
+        ], fixed=system + header + ask)
         messages = [
-            LLMMessage(role="system", content="You are a story beat planner. Output a concise beat plan."),
+            LLMMessage(role="system", content=system),
             LLMMessage(role="user", content=(
-                f"Project: {cfg.project.name}\n"
-                f"Chapter: {ctx['chapter']}\nBeat: {ctx['beat']}\n\n"
-                f"Canon:\n{ctx.get('canon_bundle','')}\n\n"
-                f"Chapter outline:\n{ctx.get('chapter_outline','')}\n\n"
-                f"Create a beat plan that can be drafted into ~{target} words."
+                f"{header}"
+                f"Canon:\n{packed['canon']}\n\n"
+                f"Chapter outline:\n{packed['outline']}\n\n"
+                f"{ask}"
             )),
         ]
-        return llm.generate(messages, model=cfg.llm.model, temperature=0.4).text
+        return messages
+
+    def run(self, cfg: ProjectConfig, ws: Workspace, ctx: dict) -> str:
+        llm = ctx["llm"]
+        return llm.generate(self.messages(cfg, ws, ctx), model=cfg.llm.model, temperature=0.4).text
+
+    async def arun(self, cfg: ProjectConfig, ws: Workspace, ctx: dict) -> str:
+        result = await agenerate(ctx["llm"], self.messages(cfg, ws, ctx), model=cfg.llm.model, temperature=0.4)
+        return result.text
@@ -1,20 +1,44 @@
 from __future__ import annotations
+from typing import Any, AsyncIterator, Dict, Iterator
 from storyos.config import ProjectConfig
 from storyos.core.workspace import Workspace
-from storyos.llm.base import LLMMessage
+from storyos.llm.base import LLMMessage, agenerate, agenerate_stream, generate_stream
+from storyos.llm.budget import PromptSection, pack_prompt
 
 class VoiceAgent:
-    def run(self, cfg: ProjectConfig, ws: Workspace, ctx: dict) -> str:
-        llm = ctx["llm"]
+    def messages(self, cfg: ProjectConfig, ws: Workspace, ctx: dict) -> list[LLMMessage]:
+        system = "You are a line editor focused on voice, rhythm, and specificity."
+        ask = (
+            "Revise the draft for stronger voice and specificity.\n"
+            "- Remove generic phrasing and repetition.\n"
+            "- Keep facts unchanged.\n"
+            "- Keep length roughly similar.\n\n"
+        )
+        packed = pack_prompt(cfg, ctx, "voice", [
+            PromptSection("draft", ctx.get('draft_text',''), priority=2),
+            PromptSection("continuity", ctx.get('continuity_report',''), priority=1),
+        ], fixed=system + ask)
         messages = [
-            LLMMessage(role="system", content="You are a line editor focused on voice, rhythm, and specificity."),
+            LLMMessage(role="system", content=system),
             LLMMessage(role="user", content=(
-                "Revise the draft for stronger voice and specificity.\n"
-                "- Remove generic phrasing and repetition.\n"
-                "- Keep facts unchanged.\n"
-                "- Keep length roughly similar.\n\n"
-                f"Draft:\n{ctx.get('draft_text','')}\n\n"
-                f"Continuity notes:\n{ctx.get('continuity_report','')}\n"
+                f"{ask}"
+                f"Draft:\n{packed['draft']}\n\n"
+                f"Continuity notes:\n{packed['continuity']}\n"
             )),
         ]
-        return llm.generate(messages, model=cfg.llm.model, temperature=0.5).text
+        return messages
+
+    def run(self, cfg: ProjectConfig, ws: Workspace, ctx: dict) -> str:
+        llm = ctx["llm"]
+        return llm.generate(self.messages(cfg, ws, ctx), model=cfg.llm.model, temperature=0.5).text
+
+    def stream(self, cfg: ProjectConfig, ws: Workspace, ctx: dict) -> Iterator[str]:
+        yield from generate_stream(ctx["llm"], self.messages(cfg, ws, ctx), model=cfg.llm.model, temperature=0.5)
+
+    async def astream(self, cfg: ProjectConfig, ws: Workspace, ctx: Dict[str, Any]) -> AsyncIterator[str]:
+        async for delta in agenerate_stream(ctx["llm"], self.messages(cfg, ws, ctx), model=cfg.llm.model, temperature=0.5):
+            yield delta
+
+    async def arun(self, cfg: ProjectConfig, ws: Workspace, ctx: dict) -> str:
+        result = await agenerate(ctx["llm"], self.messages(cfg, ws, ctx), model=cfg.llm.model, temperature=0.5)
+        return result.text
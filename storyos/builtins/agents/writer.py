@@ -1,11 +1,12 @@
 from __future__ import annotations
+from typing import Any, AsyncIterator, Dict, Iterator
 from storyos.config import ProjectConfig
 from storyos.core.workspace import Workspace
-from storyos.llm.base import LLMMessage
+from storyos.llm.base import LLMMessage, agenerate, agenerate_stream, generate_stream
+from storyos.llm.budget import PromptSection, pack_prompt
 
 class WriterAgent:
-    def run(self, cfg: ProjectConfig, ws: Workspace, ctx: dict) -> str:
-        llm = ctx["llm"]
+    def messages(self, cfg: ProjectConfig, ws: Workspace, ctx: dict) -> list[LLMMessage]:
         target = cfg.project.target_beat_words
         rules = (
             "Rules:\n"
@@ -15,13 +16,33 @@ class WriterAgent:
             f"- Aim for ~{target} words.\n"
             f"- POV: {cfg.project.default_pov}.\n"
         )
+        system = "You are a careful fiction writer who follows constraints."
+        packed = pack_prompt(cfg, ctx, "writer", [
+            PromptSection("canon", ctx.get('canon_bundle',''), priority=1),
+            PromptSection("beat_plan", ctx.get('beat_plan',''), priority=2),
+        ], fixed=system + rules + "Draft the beat now.")
         messages = [
-            LLMMessage(role="system", content="You are a careful fiction writer who follows constraints."),
+            LLMMessage(role="system", content=system),
             LLMMessage(role="user", content=(
                 f"{rules}\n"
-                f"Canon:\n{ctx.get('canon_bundle','')}\n\n"
-                f"Beat plan:\n{ctx.get('beat_plan','')}\n\n"
+                f"Canon:\n{packed['canon']}\n\n"
+                f"Beat plan:\n{packed['beat_plan']}\n\n"
                 "Draft the beat now."
             )),
         ]
-        return llm.generate(messages, model=cfg.llm.model, temperature=cfg.llm.temperature).text
+        return messages
+
+    def run(self, cfg: ProjectConfig, ws: Workspace, ctx: dict) -> str:
+        llm = ctx["llm"]
+        return llm.generate(self.messages(cfg, ws, ctx), model=cfg.llm.model, temperature=cfg.llm.temperature).text
+
+    def stream(self, cfg: ProjectConfig, ws: Workspace, ctx: dict) -> Iterator[str]:
+        yield from generate_stream(ctx["llm"], self.messages(cfg, ws, ctx), model=cfg.llm.model, temperature=cfg.llm.temperature)
+
+    async def astream(self, cfg: ProjectConfig, ws: Workspace, ctx: Dict[str, Any]) -> AsyncIterator[str]:
+        async for delta in agenerate_stream(ctx["llm"], self.messages(cfg, ws, ctx), model=cfg.llm.model, temperature=cfg.llm.temperature):
+            yield delta
+
+    async def arun(self, cfg: ProjectConfig, ws: Workspace, ctx: dict) -> str:
+        result = await agenerate(ctx["llm"], self.messages(cfg, ws, ctx), model=cfg.llm.model, temperature=cfg.llm.temperature)
+        return result.text
@@ -1,16 +1,26 @@
 from __future__ import annotations
 
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
+
 import typer
 from rich.console import Console
 
 from storyos.core.workspace import Workspace
+from storyos.workflow.dag import WorkflowError
 from storyos.workflow.engine import WorkflowEngine
 from storyos.config import load_project_config
 
+if TYPE_CHECKING:
+    from storyos.core.runs_index import RunFilter, RunsIndex
+    from storyos.ingest.bulk import DirOutcome
+    from storyos.workflow.batch import BatchOutcome
+
 app = typer.Typer(add_completion=False)
 
 ingest_app = typer.Typer(add_completion=False)
 app.add_typer(ingest_app, name="ingest")
+runs_app = typer.Typer(add_completion=False, help="Query the index of past beat and ingest runs.")
+app.add_typer(runs_app, name="runs")
 console = Console()
 
 
@@ -19,17 +29,84 @@ def run(
     project_dir: str = typer.Argument(..., help="Path to a StoryOS MPF project folder"),
     chapter: str = typer.Option("chapter_01", help="Chapter id/name (e.g., chapter_01)"),
     beat: str = typer.Option("beat_01", help="Beat id/name (e.g., beat_02)"),
+    fresh: bool = typer.Option(False, help="Ignore saved step checkpoints and rerun every step"),
 ):
     """Run the storytelling pipeline for a specific chapter + beat."""
     cfg = load_project_config(project_dir)
     ws = Workspace.open(project_dir=project_dir, config=cfg)
 
-    engine = WorkflowEngine.from_config(cfg, ws)
-    result = engine.run(chapter=chapter, beat=beat)
+    try:
+        engine = WorkflowEngine.from_config(cfg, ws)
+    except WorkflowError as e:
+        console.print(f"[bold red]Invalid workflow:[/bold red] {e}")
+        raise typer.Exit(code=2)
+    with console.status("Running…") as status:
+        def _progress(stage: str, nbytes: int) -> None:
+            status.update(f"Streaming {stage}: {nbytes:,} bytes")
+
+        result = engine.run(chapter=chapter, beat=beat, resume=not fresh, on_progress=_progress)
 
     console.print(f"[bold green]Done.[/bold green] Run id: {result.run_id}")
     console.print(f"Draft: {result.outputs.get('draft_path', '(none)')}")
     console.print(f"Run log: {result.outputs.get('runlog_path', '(none)')}")
+    if result.outputs.get("trace_path"):
+        console.print(f"Trace: {result.outputs['trace_path']} (open in https://ui.perfetto.dev)")
+
+
+@app.command("run-batch")
+def run_batch(
+    project_dir: str = typer.Argument(..., help="Path to a StoryOS MPF project folder"),
+    chapters: str = typer.Option("", help="Chapter ids or ranges, e.g. chapter_01-chapter_03 or chapter_01,chapter_04"),
+    beats: str = typer.Option("", help="Beat ids or ranges, e.g. beat_01-beat_06"),
+    manifest: str = typer.Option("", help="YAML manifest of chapter/beat items (instead of --chapters/--beats)"),
+    workers: int = typer.Option(4, help="Beats drafted concurrently"),
+    fresh: bool = typer.Option(False, help="Ignore saved step checkpoints and rerun every step"),
+) -> None:
+    """Draft many chapter/beat pairs with one shared engine and a bounded worker pool."""
+    import time
+    from storyos.paths import make_run_id
+    from storyos.workflow.batch import BatchError, items_from_ranges, load_manifest, run_batch as _run_batch, summary_yaml
+
+    try:
+        if manifest:
+            items = load_manifest(manifest)
+        elif chapters and beats:
+            items = items_from_ranges(chapters, beats)
+        else:
+            raise BatchError("Pass --manifest, or both --chapters and --beats")
+    except BatchError as e:
+        console.print(f"[bold red]{e}[/bold red]")
+        raise typer.Exit(code=2)
+
+    cfg = load_project_config(project_dir)
+    ws = Workspace.open(project_dir=project_dir, config=cfg)
+    try:
+        engine = WorkflowEngine.from_config(cfg, ws)
+    except WorkflowError as e:
+        console.print(f"[bold red]Invalid workflow:[/bold red] {e}")
+        raise typer.Exit(code=2)
+
+    def _progress(o: BatchOutcome, n: int, total: int) -> None:
+        status = "[green]ok[/green]" if o.ok else f"[red]failed[/red] {o.error}"
+        console.print(f"[{n}/{total}] {o.item.chapter} {o.item.beat} {status} ({o.seconds:.1f}s)")
+
+    t0 = time.perf_counter()
+    outcomes = _run_batch(engine, items, workers=workers, resume=not fresh, on_progress=_progress)
+    wall = time.perf_counter() - t0
+
+    batch_id = make_run_id(prefix="batch")
+    summary_path = ws.safe_path(f"05_RUNS/batches/{batch_id}.yaml")
+    summary_path.parent.mkdir(parents=True, exist_ok=True)
+    summary_path.write_text(summary_yaml(batch_id, outcomes, wall), encoding="utf-8")
+
+    failed = [o for o in outcomes if not o.ok]
+    console.print(
+        f"[bold green]Done.[/bold green] {len(outcomes) - len(failed)}/{len(outcomes)} beats drafted "
+        f"in {wall:.1f}s with {workers} workers"
+    )
+    console.print(f"Summary: {summary_path.relative_to(ws.root)}")
+    if failed:
+        raise typer.Exit(code=1)
 
 
 @ingest_app.command("extract")
@@ -38,41 +115,281 @@ def ingest_extract(
     input_path: str = typer.Argument(..., help="Path to a text/markdown file to ingest"),
     max_lines: int = typer.Option(80, help="Max lines per chunk"),
     overlap: int = typer.Option(10, help="Overlap lines between chunks"),
+    map_reduce: bool = typer.Option(False, help="Extract chunk groups in parallel calls and merge the results"),
+    concurrency: int = typer.Option(4, help="Max LLM calls in flight (map-reduce mode)"),
+    chunks_per_call: int = typer.Option(1, help="Chunks sent per LLM call (map-reduce mode)"),
+    chunker: str = typer.Option("lines", help="Chunking strategy: lines | tokens | content"),
+    chunk_tokens: int = typer.Option(1500, help="Token budget per chunk (tokens chunker)"),
+    overlap_tokens: int = typer.Option(150, help="Overlap tokens between chunks (tokens chunker)"),
+    incremental: bool = typer.Option(False, help="Reuse stored extractions for chunks unchanged since a previous ingest"),
 ):
     """Extract proposals (world/timeline/characters) into 00_INGEST/proposals/<run_id>/."""
     from storyos.ingest.extract import extract_to_proposals
-    result = extract_to_proposals(
-        project_dir=project_dir,
-        input_path=input_path,
-        max_lines_per_chunk=max_lines,
-        overlap=overlap,
-    )
+    with console.status("Extracting…") as status:
+        def _progress(label: str, n: int) -> None:
+            status.update(f"Extracting… {n:,} {label}")
+
+        result = extract_to_proposals(
+            project_dir=project_dir,
+            input_path=input_path,
+            max_lines_per_chunk=max_lines,
+            overlap=overlap,
+            map_reduce=map_reduce,
+            concurrency=concurrency,
+            chunks_per_call=chunks_per_call,
+            chunker=chunker,
+            chunk_tokens=chunk_tokens,
+            overlap_tokens=overlap_tokens,
+            incremental=incremental,
+            on_progress=_progress,
+        )
     console.print(f"[bold green]Extracted proposals.[/bold green] Run id: {result.run_id}")
     console.print(f"Proposals: {result.proposals_dir}")
 
+@ingest_app.command("extract-dir")
+def ingest_extract_dir(
+    project_dir: str = typer.Argument(..., help="Path to an MPF project folder"),
+    input_dir: str = typer.Option("", help="Directory of inputs (default: 00_INGEST/inputs/)"),
+    workers: int = typer.Option(4, help="Files extracted concurrently (one process each)"),
+    force: bool = typer.Option(False, help="Re-ingest files already recorded in 00_INGEST/manifest.json"),
+    max_lines: int = typer.Option(80, help="Max lines per chunk"),
+    overlap: int = typer.Option(10, help="Overlap lines between chunks"),
+    map_reduce: bool = typer.Option(False, help="Extract chunk groups in parallel calls and merge the results"),
+    concurrency: int = typer.Option(4, help="Max LLM calls in flight per file (map-reduce mode)"),
+    chunks_per_call: int = typer.Option(1, help="Chunks sent per LLM call (map-reduce mode)"),
+    chunker: str = typer.Option("lines", help="Chunking strategy: lines | tokens | content"),
+    chunk_tokens: int = typer.Option(1500, help="Token budget per chunk (tokens chunker)"),
+    overlap_tokens: int = typer.Option(150, help="Overlap tokens between chunks (tokens chunker)"),
+    incremental: bool = typer.Option(False, help="Reuse stored extractions for chunks unchanged since a previous ingest"),
+) -> None:
+    """Extract proposals for every new or changed file in an input directory."""
+    import time
+    from storyos.ingest.bulk import dir_summary_yaml, extract_dir
+    from storyos.paths import make_run_id
+
+    def _progress(o: DirOutcome, n: int, total: int) -> None:
+        status = {
+            "ingested": f"[green]ingested[/green] {o.run_id} ({o.seconds:.1f}s)",
+            "skipped": f"[dim]unchanged[/dim] {o.run_id}",
+            "duplicate": "[dim]duplicate content[/dim]",
+        }.get(o.status, f"[red]failed[/red] {o.error}")
+        console.print(f"[{n}/{total}] {o.path} {status}")
+
+    t0 = time.perf_counter()
+    try:
+        outcomes = extract_dir(
+            project_dir=project_dir,
+            input_dir=input_dir or None,
+            workers=workers,
+            force=force,
+            on_progress=_progress,
+            max_lines_per_chunk=max_lines,
+            overlap=overlap,
+            map_reduce=map_reduce,
+            concurrency=concurrency,
+            chunks_per_call=chunks_per_call,
+            chunker=chunker,
+            chunk_tokens=chunk_tokens,
+            overlap_tokens=overlap_tokens,
+            incremental=incremental,
+        )
+    except (FileNotFoundError, ValueError) as e:
+        console.print(f"[bold red]{e}[/bold red]")
+        raise typer.Exit(code=2)
+    wall = time.perf_counter() - t0
+
+    cfg = load_project_config(project_dir)
+    ws = Workspace.open(project_dir=project_dir, config=cfg)
+    batch_id = make_run_id(prefix="ingest-dir")
+    summary_path = ws.safe_path(f"00_INGEST/batches/{batch_id}.yaml")
+    summary_path.parent.mkdir(parents=True, exist_ok=True)
+    summary_path.write_text(dir_summary_yaml(batch_id, input_dir or "00_INGEST/inputs", outcomes, wall), encoding="utf-8")
+
+    ingested = sum(1 for o in outcomes if o.status == "ingested")
+    failed = [o for o in outcomes if not o.ok]
+    console.print(
+        f"[bold green]Done.[/bold green] {ingested} ingested, {len(outcomes) - ingested - len(failed)} unchanged, "
+        f"{len(failed)} failed in {wall:.1f}s with {workers} workers"
+    )
+    console.print(f"Summary: {summary_path.relative_to(ws.root)}")
+    if failed:
+        raise typer.Exit(code=1)
+
 @ingest_app.command("approve")
 def ingest_approve(
     project_dir: str = typer.Argument(..., help="Path to a StoryOS project folder"),
-    run_id: str = typer.Argument(..., help="Run id under 00_INGEST/proposals/<run_id>"),
+    run_ids: Optional[List[str]] = typer.Argument(None, help="Run ids under 00_INGEST/proposals/<run_id>"),
+    all_pending: bool = typer.Option(False, help="Approve every proposals run not yet approved, oldest first"),
     dry_run: bool = typer.Option(False, help="Preview changes without writing"),
-    archive: bool = typer.Option(True, help="Move approved proposals to 00_INGEST/approved/<run_id>"),
+    archive: bool = typer.Option(True, help="Copy approved proposals to 00_INGEST/approved/<run_id>/proposals"),
+    near_dup_threshold: float = typer.Option(0.5, help="Report claims this similar (0-1) to existing canon; 0 disables"),
+    suppress_near_dups: bool = typer.Option(True, "--suppress-near-dups/--keep-near-dups", help="Skip near-duplicates of canon (listed in the report), or add them anyway"),
 ):
+    """Merge one or more proposal runs into canon, writing each canon file once."""
     # Import inside to keep CLI import-time light.
-    from storyos.ingest.approve import approve_run_to_canon
+    from storyos.ingest.approve import approve_proposals_run, approve_proposals_runs, pending_run_ids
 
-    result = approve_run_to_canon(
-        project_dir=project_dir,
-        run_id=run_id,
-        dry_run=dry_run,
-        archive=archive,
-    )
-    console.print("✅ Approved ingest run")
-    console.print(f"  Run: {run_id}")
-    console.print(f"  Report: {getattr(result, 'report_path', None)}")
+    ids = list(run_ids or [])
+    if all_pending:
+        ids += [r for r in pending_run_ids(project_dir) if r not in ids]
+    if not ids:
+        if all_pending:
+            console.print("Nothing pending: every proposals run is already approved.")
+            return
+        console.print("[bold red]Pass one or more run ids, or --all-pending[/bold red]")
+        raise typer.Exit(code=2)
+
+    if len(ids) == 1:
+        result = approve_proposals_run(
+            project_dir=project_dir,
+            run_id=ids[0],
+            dry_run=dry_run,
+            archive=archive,
+            near_dup_threshold=near_dup_threshold,
+            suppress_near_dups=suppress_near_dups,
+        )
+        console.print("✅ Approved ingest run")
+        console.print(f"  Run: {ids[0]}")
+        console.print(f"  Report: {getattr(result, 'report_path', None)}")
+    else:
+        batch = approve_proposals_runs(
+            project_dir=project_dir, run_ids=ids, dry_run=dry_run, archive=archive,
+            near_dup_threshold=near_dup_threshold, suppress_near_dups=suppress_near_dups,
+        )
+        console.print(f"✅ Approved {len(batch.results)} ingest runs")
+        for r in batch.results:
+            console.print(
+                f"  {r.run_id}: {r.world_facts_added} world, {r.timeline_events_added} timeline, "
+                f"{r.character_facts_added} character facts"
+            )
+        console.print(f"  Report: {batch.report_path}")
     if dry_run:
         console.print("  (dry-run: nothing was written)")
 
 
+def _runs_index(project_dir: str, refresh: bool) -> RunsIndex:
+    import time
+    from storyos.core.runs_index import RunsIndex
+
+    index = RunsIndex.for_workspace(Workspace.open(project_dir=project_dir, config=load_project_config(project_dir)))
+    if refresh:
+        t0 = time.perf_counter()
+        changed, removed = index.refresh()
+        if changed or removed:
+            console.print(f"Indexed {changed} runs, dropped {removed} ({(time.perf_counter() - t0) * 1000:.0f} ms)")
+    return index
+
+
+def _run_filter(
+    kind: Optional[str],
+    chapter: Optional[str],
+    beat: Optional[str],
+    model: Optional[str],
+    status: Optional[str],
+    since: Optional[str],
+    min_ms: Optional[int],
+) -> RunFilter:
+    from storyos.core.runs_index import RunFilter, parse_since
+
+    try:
+        since_ms = parse_since(since) if since else None
+    except ValueError:
+        console.print(f"[bold red]Bad --since:[/bold red] {since} (use e.g. 7d, 12h or 2026-01-31)")
+        raise typer.Exit(code=2)
+    return RunFilter(kind=kind, chapter=chapter, beat=beat, model=model, status=status, since_ms=since_ms, min_duration_ms=min_ms)
+
+
+def _print_rows(rows: List[Dict[str, Any]], columns: Sequence[str], as_json: bool, elapsed_ms: float) -> None:
+    import json
+    from rich.table import Table
+
+    if as_json:
+        console.print_json(json.dumps(rows))
+        return
+    table = Table(*columns)
+    for r in rows:
+        table.add_row(*("" if r.get(c) is None else str(r[c]) for c in columns))
+    console.print(table)
+    console.print(f"{len(rows)} rows in {elapsed_ms:.1f} ms")
+
+
+@runs_app.command("list")
+def runs_list(
+    project_dir: str = typer.Argument(..., help="Path to an MPF project folder"),
+    kind: Optional[str] = typer.Option(None, help="beat | ingest"),
+    chapter: Optional[str] = typer.Option(None),
+    beat: Optional[str] = typer.Option(None),
+    model: Optional[str] = typer.Option(None),
+    status: Optional[str] = typer.Option(None, help="ok | failed | incomplete | pending | approved"),
+    since: Optional[str] = typer.Option(None, help="Only runs started since, e.g. 7d, 12h or 2026-01-31"),
+    min_ms: Optional[int] = typer.Option(None, help="Only runs that took at least this many milliseconds"),
+    sort: str = typer.Option("started", help="started | duration | tokens"),
+    ascending: bool = typer.Option(False, help="Smallest first"),
+    limit: int = typer.Option(20),
+    json_out: bool = typer.Option(False, "--json", help="Print JSON rows"),
+    refresh: bool = typer.Option(True, help="Index new or changed run files first"),
+) -> None:
+    """List runs, newest (or slowest, or costliest) first."""
+    import time
+    from storyos.core.runs_index import SORT_BY
+
+    if sort not in SORT_BY:
+        console.print(f"[bold red]Bad --sort:[/bold red] {sort} (use {' | '.join(SORT_BY)})")
+        raise typer.Exit(code=2)
+    index = _runs_index(project_dir, refresh)
+    f = _run_filter(kind, chapter, beat, model, status, since, min_ms)
+    t0 = time.perf_counter()
+    rows = index.runs(f, sort=sort, limit=limit, descending=not ascending)
+    for r in rows:
+        r["started"] = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(r["started_ms"] / 1000)) if r["started_ms"] else None
+        r["tokens"] = r["prompt_tokens"] + r["completion_tokens"]
+    columns = ["run_id", "kind", "chapter", "beat", "model", "status", "started", "duration_ms", "tokens", "llm_calls"]
+    _print_rows(rows, columns, json_out, (time.perf_counter() - t0) * 1000)
+
+
+@runs_app.command("stats")
+def runs_stats(
+    project_dir: str = typer.Argument(..., help="Path to an MPF project folder"),
+    by: str = typer.Option("chapter", help="chapter | beat | model | status | kind | day | step"),
+    kind: Optional[str] = typer.Option(None, help="beat | ingest"),
+    chapter: Optional[str] = typer.Option(None),
+    beat: Optional[str] = typer.Option(None),
+    model: Optional[str] = typer.Option(None),
+    status: Optional[str] = typer.Option(None),
+    since: Optional[str] = typer.Option(None, help="Only runs started since, e.g. 7d, 12h or 2026-01-31"),
+    json_out: bool = typer.Option(False, "--json", help="Print JSON rows"),
+    refresh: bool = typer.Option(True, help="Index new or changed run files first"),
+) -> None:
+    """Aggregate run time and tokens per chapter, beat, model, status, kind, day or workflow step."""
+    import time
+    from storyos.core.runs_index import GROUP_BY
+
+    if by not in GROUP_BY and by != "step":
+        console.print(f"[bold red]Bad --by:[/bold red] {by} (use {' | '.join([*GROUP_BY, 'step'])})")
+        raise typer.Exit(code=2)
+    index = _runs_index(project_dir, refresh)
+    f = _run_filter(kind, chapter, beat, model, status, since, None)
+    t0 = time.perf_counter()
+    if by == "step":
+        rows = index.slowest_steps(f)
+        columns = ["step", "runs", "avg_ms", "max_ms"]
+    else:
+        rows = index.aggregate(by, f)
+        columns = [by, "runs", "total_ms", "avg_ms", "max_ms", "prompt_tokens", "completion_tokens", "llm_calls", "cache_hits"]
+    _print_rows(rows, columns, json_out, (time.perf_counter() - t0) * 1000)
+
+
+@runs_app.command("reindex")
+def runs_reindex(project_dir: str = typer.Argument(..., help="Path to an MPF project folder")) -> None:
+    """Rebuild the runs index from 05_RUNS/ and 00_INGEST/proposals/."""
+    import time
+
+    index = _runs_index(project_dir, refresh=False)
+    t0 = time.perf_counter()
+    n = index.rebuild()
+    console.print(f"[bold green]Indexed {n} runs[/bold green] in {(time.perf_counter() - t0) * 1000:.0f} ms")
+
+
 @app.command()
 def init(
     target_dir: str = typer.Argument(..., help="Where to create a new MPF project"),
@@ -83,6 +400,97 @@ def init(
     console.print(f"[bold green]Created.[/bold green] {target_dir}")
 
 
+@app.command("fake-api")
+def fake_api(
+    project_dir: Optional[str] = typer.Argument(None, help="Read llm.fake defaults from this project's config"),
+    host: str = typer.Option("127.0.0.1", help="Interface to bind"),
+    port: int = typer.Option(8089, help="Port to listen on"),
+    latency: Optional[str] = typer.Option(None, help="fixed:<ms> | uniform:<lo>,<hi> | lognormal:<median_ms>,<sigma>"),
+    output: Optional[str] = typer.Option(None, help="Output size: small | medium | large | <tokens>"),
+    error_rate: Optional[float] = typer.Option(None, help="Fraction of calls answered with a 500"),
+    rate_limit_rate: Optional[float] = typer.Option(None, help="Fraction of calls answered with a 429"),
+    seed: Optional[int] = typer.Option(None, help="Seed for replies, latencies and injected errors"),
+) -> None:
+    """Serve a local stand-in for the OpenAI API, for offline load tests."""
+    from storyos.config import FakeLLMConfig
+    from storyos.llm.fake_server import FakeAPIServer
+
+    base = load_project_config(project_dir).llm.fake if project_dir else FakeLLMConfig()
+    overrides = {"latency": latency, "output": output, "error_rate": error_rate, "rate_limit_rate": rate_limit_rate, "seed": seed}
+    fake_cfg = FakeLLMConfig.model_validate({**base.model_dump(), **{k: v for k, v in overrides.items() if v is not None}})
+    server = FakeAPIServer(fake_cfg, host=host, port=port)
+    console.print(f"Fake OpenAI API on {server.base_url} (set OPENAI_BASE_URL to this; Ctrl-C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    b = server.backend
+    console.print(f"Served {b.calls} calls (injected: {b.injected['429']} x 429, {b.injected['500']} x 500)")
+
+
+@app.command()
+def bench(
+    scenarios: Optional[List[str]] = typer.Argument(None, help="workflow_single | workflow_batch | ingest | approve (default: all)"),
+    iterations: int = typer.Option(5, help="Timed iterations per case"),
+    beats: int = typer.Option(8, help="Beats per workflow_batch iteration"),
+    workers: int = typer.Option(4, help="Batch workers"),
+    ingest_mb: str = typer.Option("1,10", help="Comma-separated input sizes in MB for the ingest scenario"),
+    approve_claims: str = typer.Option("100,1000,10000", help="Comma-separated canon sizes for the approve scenario"),
+    latency: str = typer.Option("fixed:0", help="Fake model latency: fixed:<ms> | uniform:<lo>,<hi> | lognormal:<median_ms>,<sigma>"),
+    out: str = typer.Option("", help="Write results as JSON here (default: bench-<timestamp>.json)"),
+    compare: str = typer.Option("", help="Baseline results JSON to compare against"),
+    keep: bool = typer.Option(False, help="Keep the synthetic workspaces"),
+) -> None:
+    """Benchmark drafting, ingest and approval against the offline fake model."""
+    import json
+    from pathlib import Path
+    from rich.table import Table
+    from storyos.bench import SCENARIOS, BenchOptions, compare as _compare, run_bench
+    from storyos.paths import make_run_id
+
+    opts = BenchOptions(
+        iterations=iterations,
+        beats=beats,
+        workers=workers,
+        ingest_mb=[float(x) for x in ingest_mb.split(",") if x.strip()],
+        approve_claims=[int(x) for x in approve_claims.split(",") if x.strip()],
+        latency=latency,
+        keep=keep,
+    )
+    try:
+        doc = run_bench(list(scenarios or SCENARIOS), opts, on_case=lambda s, arg: console.print(f"Running {s}" + (f" ({arg})" if arg is not None else "")))
+    except ValueError as e:
+        console.print(f"[bold red]{e}[/bold red]")
+        raise typer.Exit(code=2)
+
+    table = Table("case", "n", "p50 s", "p90 s", "p99 s", "max s", "throughput", "peak RSS MB")
+    for r in doc["results"]:
+        lat = r["latency_s"]
+        params = " ".join(f"{k}={v}" for k, v in r["params"].items())
+        table.add_row(
+            f"{r['scenario']} {params}", str(r["iterations"]),
+            *(f"{lat[k]:.4f}" for k in ("p50", "p90", "p99", "max")),
+            f"{r['throughput']['per_second']:g} {r['throughput']['unit']}/s", f"{r['peak_rss_mb']:.0f}",
+        )
+    console.print(table)
+
+    out_path = Path(out or f"{make_run_id(prefix='bench')}.json")
+    out_path.write_text(json.dumps(doc, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    console.print(f"Results: {out_path}")
+    if doc["workspace"]:
+        console.print(f"Workspaces kept in {doc['workspace']}")
+
+    if compare:
+        rows = _compare(json.loads(Path(compare).read_text(encoding="utf-8")), doc)
+        cmp = Table("case", "p50 s", "p50 Δ%", "throughput", "throughput Δ%", "RSS Δ MB")
+        for row in rows:
+            cmp.add_row(row["case"], f"{row['p50_s']:.4f}", str(row["p50_change_pct"]), f"{row['throughput']:g}",
+                        str(row["throughput_change_pct"]), f"{row['peak_rss_change_mb']:+g}")
+        console.print(cmp)
+
+
 
 @app.command()
 def doctor():
@@ -93,11 +501,14 @@ def doctor():
     if not has_key:
         raise typer.Exit(code=2)
     try:
-        from storyos.llm.openai_adapter import OpenAIAdapter
+        from storyos.config import LLMConfig
         from storyos.llm.base import LLMMessage
-        a = OpenAIAdapter()
-        r = a.generate([LLMMessage(role="user", content="Say 'ok'")], model="gpt-4.1-mini", temperature=0)
+        from storyos.llm.registry import connection_stats, get_adapter, stats_line
+        llm_cfg = LLMConfig()
+        a = get_adapter(llm_cfg)
+        r = a.generate([LLMMessage(role="user", content="Say 'ok'")], model=llm_cfg.model, temperature=0)
         console.print(f"OpenAI call: {r.text.strip()}")
+        console.print(f"HTTP pool: {stats_line(connection_stats())}")
     except Exception as e:
         console.print(f"[bold red]OpenAI call failed:[/bold red] {e}")
         raise typer.Exit(code=3)
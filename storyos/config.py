@@ -1,16 +1,62 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 import yaml
 from pydantic import BaseModel, Field
 
 
+class LLMHTTPConfig(BaseModel):
+    # Keep-alive pool of the process-wide adapter (storyos.llm.registry); seconds for timeouts.
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+    connect_timeout: float = 10.0
+    read_timeout: float = 120.0
+    write_timeout: float = 30.0
+    pool_timeout: float = 30.0
+
+
+class FakeLLMConfig(BaseModel):
+    # Offline stand-in used by provider "fake" and `storyos fake-api` (storyos.llm.fake).
+    seed: int = 0
+    # fixed:<ms> | uniform:<lo_ms>,<hi_ms> | lognormal:<median_ms>,<sigma>
+    latency: str = Field(default="fixed:0", pattern=r"^(fixed:[\d.]+|uniform:[\d.]+,[\d.]+|lognormal:[\d.]+,[\d.]+)$")
+    # small | medium | large, or a token count; always capped at max_output_tokens.
+    output: str = Field(default="medium", pattern=r"^(small|medium|large|\d+)$")
+    error_rate: float = 0.0  # injected 500s
+    rate_limit_rate: float = 0.0  # injected 429s
+    retry_after: float = 1.0  # seconds, sent with injected 429s
+    stream_chunk_chars: int = 16
+    # Returned verbatim for extraction prompts instead of the JSON built from the chunks.
+    extraction_json: Optional[str] = None
+
+
 class LLMConfig(BaseModel):
     provider: str = "openai"
     model: str = "gpt-4.1-mini"
     temperature: float = 0.8
+    # Prompt packing: None uses the known window for `model` (storyos.llm.tokens).
+    context_window: Optional[int] = None
+    reserve_output_tokens: int = 4000
+    # Client-side API limits, shared by every adapter in the process (0 = unlimited).
+    requests_per_minute: int = 0
+    tokens_per_minute: int = 0
+    max_in_flight: int = 8
+    # 429/5xx/connection errors: retries with jittered exponential backoff (honours retry-after).
+    max_retries: int = 5
+    retry_base_delay: float = 1.0
+    retry_max_delay: float = 60.0
+    http: LLMHTTPConfig = Field(default_factory=LLMHTTPConfig)
+    fake: FakeLLMConfig = Field(default_factory=FakeLLMConfig)
+
+
+# LLMConfig fields that change how calls are transported, not what the model returns.
+LLM_TRANSPORT_FIELDS = frozenset({
+    "requests_per_minute", "tokens_per_minute", "max_in_flight",
+    "max_retries", "retry_base_delay", "retry_max_delay", "http",
+})
 
 
 class SecurityConfig(BaseModel):
@@ -32,6 +78,39 @@ class WorkflowConfig(BaseModel):
         "write_outputs",
         "write_runlog",
     ])
+    # Steps with no declared dependency between them run concurrently, up to this many at once.
+    max_parallel_steps: int = 4
+    # Save step outputs keyed on an input hash and skip unchanged steps on rerun.
+    checkpoints: bool = True
+
+
+class RetrievalConfig(BaseModel):
+    # Markdown indexed for retrieve_canon (globs relative to the project root).
+    sources: list[str] = Field(default_factory=lambda: ["01_CANON/*.md", "02_CHARACTERS/*.md"])
+    # Included verbatim ahead of retrieved passages; counts against the budget.
+    always_include: list[str] = Field(default_factory=lambda: ["01_CANON/rules.md"])
+    top_k: int = 12
+    max_kb: int = 24
+    index_path: str = ".storyos/index/canon.json"
+
+
+class LLMCacheConfig(BaseModel):
+    # read_write: serve hits and store misses; read_only: serve hits, never store;
+    # bypass: always call the model and leave the cache untouched.
+    mode: str = Field(default="read_write", pattern="^(read_write|read_only|bypass)$")
+    dir: str = ".storyos/cache/llm"
+    max_mb: int = 256
+
+
+class FileCacheConfig(BaseModel):
+    # In-process cache of workspace file contents (canon, outlines, characters),
+    # shared by every run in the process; 0 disables it.
+    max_mb: int = 64
+
+
+class CacheConfig(BaseModel):
+    llm: LLMCacheConfig = Field(default_factory=LLMCacheConfig)
+    files: FileCacheConfig = Field(default_factory=FileCacheConfig)
 
 
 class PluginsConfig(BaseModel):
@@ -50,6 +129,8 @@ class ProjectConfig(BaseModel):
     security: SecurityConfig = Field(default_factory=SecurityConfig)
     llm: LLMConfig = Field(default_factory=LLMConfig)
     workflow: WorkflowConfig = Field(default_factory=WorkflowConfig)
+    cache: CacheConfig = Field(default_factory=CacheConfig)
+    retrieval: RetrievalConfig = Field(default_factory=RetrievalConfig)
     plugins: PluginsConfig = Field(default_factory=PluginsConfig)
 
 
@@ -0,0 +1,98 @@
+from __future__ import annotations
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import ClassVar, Dict, Optional, Tuple
+
+from storyos.core.workspace import Workspace
+
+
+class FileTooLarge(Exception):
+    def __init__(self, path: Path, size: int):
+        super().__init__(f"{path} ({size} bytes)")
+        self.size = size
+
+
+class FileContentCache:
+    """In-memory LRU of file contents, keyed on path and checked against mtime_ns and size.
+
+    One instance per workspace root is shared by every step, agent and
+    concurrent run in the process, so canon and outline files are read from
+    disk once per change instead of once per beat. Contents are immutable
+    bytes that callers share without a copy. Each get() stats the file, so an
+    edit on disk is picked up on the next read.
+    """
+
+    _instances: ClassVar[Dict[Path, "FileContentCache"]] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[int, int, bytes]]" = OrderedDict()  # path -> (mtime_ns, size, data)
+        self._total = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def for_workspace(cls, ws: Workspace) -> "FileContentCache":
+        max_bytes = ws.config.cache.files.max_mb * 1024 * 1024
+        with cls._instances_lock:
+            inst = cls._instances.get(ws.root)
+            if inst is None or inst.max_bytes != max_bytes:
+                inst = cls._instances[ws.root] = cls(max_bytes)
+        return inst
+
+    def cacheable(self, size: int) -> bool:
+        # Files over a quarter of the cap would churn everything else out; they are read through.
+        return size <= self.max_bytes // 4
+
+    def get(self, path: Path, max_bytes: Optional[int] = None) -> Tuple[bytes, bool]:
+        """(contents, whether they came from the cache); FileTooLarge if over max_bytes, checked before reading."""
+        key = str(path)
+        st = os.stat(path)
+        if max_bytes is not None and st.st_size > max_bytes:
+            raise FileTooLarge(path, st.st_size)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2], True
+            self.misses += 1
+        with open(path, "rb") as fh:
+            # Key on the stat of the open file, so a write racing the read is seen as a change next time.
+            fst = os.fstat(fh.fileno())
+            data = fh.read() if max_bytes is None else fh.read(max_bytes + 1)  # bounded if it grew since the stat
+        if max_bytes is not None and len(data) > max_bytes:
+            raise FileTooLarge(path, len(data))
+        if fst.st_size == len(data):
+            self._put(key, fst.st_mtime_ns, data)
+        return data, False
+
+    def _put(self, key: str, mtime_ns: int, data: bytes) -> None:
+        if not self.cacheable(len(data)):
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._total -= len(old[2])
+            self._entries[key] = (mtime_ns, len(data), data)
+            self._total += len(data)
+            while self._total > self.max_bytes and self._entries:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self._total -= len(evicted)
+                self.evictions += 1
+
+    def invalidate(self, path: Path) -> None:
+        with self._lock:
+            old = self._entries.pop(str(path), None)
+            if old is not None:
+                self._total -= len(old[2])
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "entries": len(self._entries), "bytes": self._total}
@@ -1,9 +1,23 @@
 from __future__ import annotations
 import hashlib
+import json
 from pathlib import Path
+from typing import Any
 
 def sha256_bytes(data: bytes) -> str:
     return hashlib.sha256(data).hexdigest()
 
-def sha256_file(path: Path) -> str:
-    return sha256_bytes(path.read_bytes())
+def sha256_file(path: Path, chunk_size: int = 1 << 20) -> str:
+    """Digest of a file's bytes, read in chunks so large inputs are not loaded whole."""
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def sha256_text(text: str) -> str:
+    return sha256_bytes(text.encode("utf-8"))
+
+def sha256_json(obj: Any) -> str:
+    """Digest of a JSON-able value; key order and whitespace do not matter."""
+    return sha256_text(json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str))
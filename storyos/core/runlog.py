@@ -1,40 +1,288 @@
 from __future__ import annotations
-from dataclasses import dataclass, field
+import asyncio
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field, fields, is_dataclass
 from datetime import datetime, timezone
-from typing import Any, Dict, List
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, TextIO
 import yaml
 
+_Dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+# Fields that steps and adapters update in place; journaled as a snapshot after each step.
+_STATE_FIELDS = ("outputs", "llm_cache", "file_cache", "prompt_tokens", "prompt_trimmed")
+
 @dataclass
 class ToolInvocationRecord:
     tool: str
     args: Dict[str, Any]
     ok: bool
     error: str | None = None
+    seconds: float | None = None
+    bytes: int | None = None
 
 @dataclass
 class FileAccessRecord:
     path: str
     action: str  # "read"|"write"
     sha256: str | None = None
+    bytes: int | None = None
+
+@dataclass
+class Span:
+    """One timed piece of a run: a workflow step, an LLM call or a file operation."""
+    name: str
+    kind: str  # "step"|"llm"|"file"
+    start: float  # seconds since the run started
+    id: int = 0  # position in RunLog.spans
+    end: float | None = None
+    lane: int = 0  # thread (or asyncio task) it ran on, numbered from 1 in order of first use
+    attrs: Dict[str, Any] = field(default_factory=dict)  # tokens, bytes, cache status, error, ...
+
+    @property
+    def seconds(self) -> float | None:
+        return None if self.end is None else self.end - self.start
+
+def _plain(value: Any) -> Any:
+    if is_dataclass(value) and not isinstance(value, type):
+        return asdict(value)
+    if isinstance(value, list):
+        return [_plain(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    return value
 
 @dataclass
 class RunLog:
     run_id: str
     started_at: str
     finished_at: str | None = None
+    status: str = "running"  # running|ok|failed
+    error: str | None = None
+    chapter: str | None = None
+    beat: str | None = None
     model: str | None = None
     steps: List[str] = field(default_factory=list)
+    step_status: Dict[str, str] = field(default_factory=dict)  # step -> ran|checkpoint|preloaded|failed
     tool_invocations: List[ToolInvocationRecord] = field(default_factory=list)
     file_access: List[FileAccessRecord] = field(default_factory=list)
     outputs: Dict[str, Any] = field(default_factory=dict)
+    llm_cache: Dict[str, int] = field(default_factory=dict)
+    file_cache: Dict[str, int] = field(default_factory=dict)  # hits/misses of the workspace file cache
+    prompt_tokens: Dict[str, int] = field(default_factory=dict)  # agent -> estimated prompt tokens
+    prompt_trimmed: Dict[str, List[str]] = field(default_factory=dict)  # agent -> sections trimmed to fit
+    spans: List[Span] = field(default_factory=list)
+    # Steps run on worker threads, so recording goes through a lock.
+    _t0: float = field(default_factory=time.perf_counter, init=False, repr=False, compare=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
+    _lanes: Dict[int, int] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _journal: Optional[TextIO] = field(default=None, init=False, repr=False, compare=False)
 
     @staticmethod
-    def new(run_id: str) -> "RunLog":
+    def new(run_id: str, chapter: str | None = None, beat: str | None = None) -> "RunLog":
         now = datetime.now(timezone.utc).isoformat()
-        return RunLog(run_id=run_id, started_at=now)
+        return RunLog(run_id=run_id, started_at=now, chapter=chapter, beat=beat)
+
+    # --- journal ---------------------------------------------------------------
+    # An append-only JSONL file, one event per line, written and flushed as the run
+    # goes. A crashed run leaves its journal behind and from_journal() rebuilds the
+    # RunLog from it. A finished run is compacted to the YAML summary.
 
-    def finish(self) -> None:
+    def open_journal(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._journal = path.open("a", encoding="utf-8")
+        with self._lock:
+            self._emit({"ev": "run", "run_id": self.run_id, "started_at": self.started_at,
+                        "chapter": self.chapter, "beat": self.beat, "model": self.model})
+
+    def close_journal(self) -> None:
+        with self._lock:
+            journal, self._journal = self._journal, None
+        if journal is not None:
+            journal.close()
+
+    def _emit(self, event: Dict[str, Any]) -> None:
+        # Callers hold self._lock, so lines from different threads never interleave.
+        if self._journal is not None:
+            self._journal.write(json.dumps(event, ensure_ascii=False, default=str) + "\n")
+            self._journal.flush()
+
+    def _state(self) -> Dict[str, Any]:
+        return {"ev": "state", **{name: _plain(getattr(self, name)) for name in _STATE_FIELDS}}
+
+    def step_started(self, step: str) -> None:
+        with self._lock:
+            self.steps.append(step)
+            self._emit({"ev": "step", "name": step, "status": "started"})
+
+    def step_finished(self, step: str, status: str) -> None:
+        with self._lock:
+            self.step_status[step] = status
+            self._emit({"ev": "step", "name": step, "status": status})
+            self._emit(self._state())
+
+    def finish(self, error: BaseException | None = None) -> None:
         self.finished_at = datetime.now(timezone.utc).isoformat()
+        self.status = "ok" if error is None else "failed"
+        self.error = None if error is None else f"{type(error).__name__}: {error}"
+        with self._lock:
+            self._emit(self._state())
+            self._emit({"ev": "end", "finished_at": self.finished_at, "status": self.status, "error": self.error})
+
+    @classmethod
+    def from_journal(cls, path: Path) -> "RunLog":
+        """Rebuild a RunLog by replaying a journal; a torn last line (from a crash) is ignored."""
+        runlog: RunLog | None = None
+        spans: Dict[int, Span] = {}
+        for line in path.read_text(encoding="utf-8").splitlines():
+            try:
+                e = json.loads(line)
+            except json.JSONDecodeError:
+                break
+            ev = e.pop("ev", None)
+            if ev == "run":
+                runlog = cls(**e)
+                continue
+            if runlog is None:
+                raise ValueError(f"Journal does not start with a run event: {path}")
+            if ev == "span":
+                spans[e["id"]] = Span(**e)
+                runlog.spans.append(spans[e["id"]])
+            elif ev == "span_end" and e["id"] in spans:
+                spans[e["id"]].end = e["end"]
+                spans[e["id"]].attrs = e["attrs"]
+            elif ev == "tool":
+                runlog.tool_invocations.append(ToolInvocationRecord(**e["record"]))
+                if e.get("access"):
+                    runlog.file_access.append(FileAccessRecord(**e["access"]))
+            elif ev == "access":
+                runlog.file_access.append(FileAccessRecord(**e["record"]))
+            elif ev == "step":
+                if e["status"] == "started":
+                    runlog.steps.append(e["name"])
+                else:
+                    runlog.step_status[e["name"]] = e["status"]
+            elif ev == "state":
+                for name in _STATE_FIELDS:
+                    setattr(runlog, name, e.get(name) or {})
+            elif ev == "end":
+                runlog.finished_at, runlog.status, runlog.error = e["finished_at"], e["status"], e["error"]
+        if runlog is None:
+            raise ValueError(f"Empty run journal: {path}")
+        if runlog.finished_at is None:
+            runlog.status = "crashed"
+        return runlog
+
+    def write_summary(self, yaml_path: Path, trace_path: Path | None = None) -> None:
+        """Write the YAML summary (and the Chrome trace) atomically."""
+        outputs = [(yaml_path, self.to_yaml())]
+        if trace_path is not None:
+            outputs.append((trace_path, json.dumps(self.to_chrome_trace())))
+        for path, text in outputs:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            tmp.write_text(text, encoding="utf-8")
+            os.replace(tmp, path)
+
+    def _now(self) -> float:
+        return round(time.perf_counter() - self._t0, 6)
+
+    def _lane(self) -> int:
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        ident = id(task) if task is not None else threading.get_ident()
+        with self._lock:
+            return self._lanes.setdefault(ident, len(self._lanes) + 1)
+
+    def start_span(self, name: str, kind: str, **attrs: Any) -> Span:
+        span = Span(name=name, kind=kind, start=self._now(), lane=self._lane(), attrs=attrs)
+        with self._lock:
+            span.id = len(self.spans)
+            self.spans.append(span)
+            self._emit({"ev": "span", **asdict(span)})
+        return span
+
+    def end_span(self, span: Span, error: BaseException | None = None) -> None:
+        if error is not None:
+            span.attrs["error"] = f"{type(error).__name__}: {error}"
+        span.end = self._now()
+        with self._lock:
+            self._emit({"ev": "span_end", "id": span.id, "end": span.end, "attrs": _plain(span.attrs)})
+
+    @contextmanager
+    def span(self, name: str, kind: str, **attrs: Any) -> Iterator[Span]:
+        """Time the block as a span; callers may add attrs to the yielded span."""
+        span = self.start_span(name, kind, **attrs)
+        try:
+            yield span
+        except GeneratorExit:
+            # A stream abandoned by its consumer: the span ends where it stopped.
+            span.attrs["abandoned"] = True
+            self.end_span(span)
+            raise
+        except BaseException as e:
+            self.end_span(span, e)
+            raise
+        self.end_span(span)
+
+    def record_tool(self, record: ToolInvocationRecord, access: FileAccessRecord | None = None) -> None:
+        with self._lock:
+            self.tool_invocations.append(record)
+            if access is not None:
+                self.file_access.append(access)
+            self._emit({"ev": "tool", "record": asdict(record), "access": asdict(access) if access else None})
+
+    def count_file_cache(self, hit: bool) -> None:
+        key = "hits" if hit else "misses"
+        with self._lock:
+            self.file_cache[key] = self.file_cache.get(key, 0) + 1
+
+    def record_access(self, access: FileAccessRecord) -> None:
+        with self._lock:
+            self.file_access.append(access)
+            self._emit({"ev": "access", "record": asdict(access)})
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {f.name: _plain(getattr(self, f.name)) for f in fields(self) if not f.name.startswith("_")}
 
     def to_yaml(self) -> str:
-        return yaml.safe_dump(self.__dict__, sort_keys=False, allow_unicode=True)
+        return yaml.dump(self.to_dict(), Dumper=_Dumper, sort_keys=False, allow_unicode=True)
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Spans as Chrome trace events (open in Perfetto or chrome://tracing); one track per lane."""
+        now = self._now()
+        with self._lock:
+            spans = list(self.spans)
+            lanes = sorted(self._lanes.values())
+        events: List[Dict[str, Any]] = [
+            {"ph": "M", "name": "process_name", "pid": 1, "tid": 0, "args": {"name": f"storyos run {self.run_id}"}},
+        ]
+        events += [{"ph": "M", "name": "thread_name", "pid": 1, "tid": lane, "args": {"name": f"lane {lane}"}} for lane in lanes]
+        for s in spans:
+            end = s.end if s.end is not None else now
+            events.append({
+                "ph": "X", "name": s.name, "cat": s.kind, "pid": 1, "tid": s.lane,
+                "ts": round(s.start * 1e6), "dur": round((end - s.start) * 1e6),
+                "args": _plain(s.attrs),
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms",
+                "otherData": {"run_id": self.run_id, "started_at": self.started_at, "model": self.model}}
+
+def compact_journal(journal_path: Path, runlog: RunLog | None = None) -> Path:
+    """Write <run_id>.yaml and <run_id>.trace.json next to a run journal, then delete the journal.
+
+    Pass the live RunLog when the run just ended in this process; otherwise the
+    journal is replayed (e.g. one left behind by a crashed run).
+    """
+    if runlog is None:
+        runlog = RunLog.from_journal(journal_path)
+    yaml_path = journal_path.with_suffix(".yaml")
+    runlog.write_summary(yaml_path, journal_path.with_suffix(".trace.json"))
+    journal_path.unlink(missing_ok=True)
+    return yaml_path
@@ -0,0 +1,326 @@
+from __future__ import annotations
+import re
+import sqlite3
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import yaml
+
+from storyos.core.runlog import RunLog
+from storyos.core.workspace import Workspace
+
+INDEX_PATH = ".storyos/index/runs.sqlite"
+SCHEMA_VERSION = 1
+GROUP_BY = {
+    "chapter": "chapter",
+    "beat": "chapter || '/' || beat",
+    "model": "model",
+    "status": "status",
+    "kind": "kind",
+    "day": "date(started_ms / 1000, 'unixepoch')",
+}
+SORT_BY = {"started": "started_ms", "duration": "duration_ms", "tokens": "prompt_tokens + completion_tokens"}
+
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+_SCHEMA = """
+CREATE TABLE runs (
+    run_id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,               -- beat | ingest
+    chapter TEXT,
+    beat TEXT,
+    model TEXT,
+    status TEXT,                      -- ok | failed | incomplete (beat); pending | approved (ingest)
+    started_ms INTEGER,               -- unix epoch milliseconds
+    duration_ms INTEGER,
+    prompt_tokens INTEGER NOT NULL DEFAULT 0,
+    completion_tokens INTEGER NOT NULL DEFAULT 0,
+    llm_calls INTEGER NOT NULL DEFAULT 0,
+    cache_hits INTEGER NOT NULL DEFAULT 0,
+    input TEXT,
+    source TEXT NOT NULL,             -- file the row was read from, relative to the project
+    source_sig TEXT NOT NULL          -- mtime/size (and approval) of the source when it was read
+);
+CREATE INDEX runs_started ON runs(started_ms);
+CREATE INDEX runs_chapter_beat ON runs(chapter, beat);
+CREATE INDEX runs_model ON runs(model);
+CREATE TABLE steps (
+    run_id TEXT NOT NULL,
+    step TEXT NOT NULL,
+    status TEXT,
+    duration_ms INTEGER,
+    PRIMARY KEY (run_id, step)
+);
+"""
+
+
+@dataclass
+class RunRow:
+    run_id: str
+    kind: str
+    chapter: str | None = None
+    beat: str | None = None
+    model: str | None = None
+    status: str | None = None
+    started_ms: int | None = None
+    duration_ms: int | None = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    llm_calls: int = 0
+    cache_hits: int = 0
+    input: str | None = None
+    source: str = ""
+    source_sig: str = ""
+
+
+def _epoch_ms(iso: str | None) -> int | None:
+    if not iso:
+        return None
+    try:
+        return int(datetime.fromisoformat(str(iso)).timestamp() * 1000)
+    except ValueError:
+        return None
+
+
+def _sig(path: Path, extra: str = "") -> str:
+    st = path.stat()
+    return f"{st.st_mtime_ns}:{st.st_size}{extra}"
+
+
+def row_from_runlog(d: Dict[str, Any], source: str, sig: str) -> Tuple[RunRow, List[Tuple[str, str, int | None]]]:
+    """A runs row and its (step, status, duration_ms) rows from a RunLog dict (RunLog.to_dict() or the YAML)."""
+    spans = d.get("spans") or []
+    llm = [s for s in spans if s.get("kind") == "llm"]
+    prompt = sum(int(s.get("attrs", {}).get("prompt_tokens") or 0) for s in llm)
+    if not llm:
+        # Run logs from before spans only have the packer's prompt estimates.
+        prompt = sum((d.get("prompt_tokens") or {}).values())
+    started, finished = _epoch_ms(d.get("started_at")), _epoch_ms(d.get("finished_at"))
+    # Older summaries have no status; they were only written by runs that got to write_runlog.
+    status = d.get("status") or "ok"
+    row = RunRow(
+        run_id=str(d["run_id"]),
+        kind="beat",
+        chapter=d.get("chapter"),
+        beat=d.get("beat"),
+        model=d.get("model"),
+        status="incomplete" if status in ("running", "crashed") else status,
+        started_ms=started,
+        duration_ms=finished - started if started is not None and finished is not None else None,
+        prompt_tokens=prompt,
+        completion_tokens=sum(int(s.get("attrs", {}).get("completion_tokens") or 0) for s in llm),
+        llm_calls=sum(1 for s in llm if s.get("attrs", {}).get("cache") != "hit"),
+        cache_hits=int((d.get("llm_cache") or {}).get("hits", 0)),
+        source=source,
+        source_sig=sig,
+    )
+    step_ms = {s["name"]: round((s["end"] - s["start"]) * 1000) for s in spans
+               if s.get("kind") == "step" and s.get("end") is not None}
+    steps = [(name, status, step_ms.get(name)) for name, status in (d.get("step_status") or {}).items()]
+    return row, steps
+
+
+_meta_rx = re.compile(r"^- (\w+): (.*)$", re.MULTILINE)
+
+
+def row_from_ingest(meta_path: Path, approved: bool, source: str, sig: str) -> RunRow:
+    """A runs row from an ingest run's 00_META.md."""
+    meta = dict(_meta_rx.findall(meta_path.read_text(encoding="utf-8")))
+    seconds = meta.get("seconds")
+    duration = round(float(seconds) * 1000) if seconds else None
+    created = _epoch_ms(meta.get("created_utc"))  # written when the run ended
+    calls = re.match(r"\d+", meta.get("llm_calls", ""))
+    hits = re.search(r"hits=(\d+)", meta.get("llm_cache", ""))
+    # Runs from before token totals were recorded have no tokens line and count as 0.
+    prompt = re.search(r"prompt=(\d+)", meta.get("tokens", ""))
+    completion = re.search(r"completion=(\d+)", meta.get("tokens", ""))
+    return RunRow(
+        run_id=meta_path.parent.name,
+        kind="ingest",
+        model=meta.get("model"),
+        status="approved" if approved else "pending",
+        started_ms=created - duration if created is not None and duration is not None else created,
+        duration_ms=duration,
+        prompt_tokens=int(prompt.group(1)) if prompt else 0,
+        completion_tokens=int(completion.group(1)) if completion else 0,
+        llm_calls=int(calls.group(0)) if calls else 0,
+        cache_hits=int(hits.group(1)) if hits else 0,
+        input=meta.get("input"),
+        source=source,
+        source_sig=sig,
+    )
+
+
+def parse_since(spec: str) -> int:
+    """Epoch ms for "7d", "12h", "30m" ago, or for an ISO date/time."""
+    m = re.fullmatch(r"(\d+)([dhm])", spec.strip())
+    if m:
+        unit = {"d": "days", "h": "hours", "m": "minutes"}[m.group(2)]
+        return int((datetime.now(timezone.utc) - timedelta(**{unit: int(m.group(1))})).timestamp() * 1000)
+    when = datetime.fromisoformat(spec.strip())
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return int(when.timestamp() * 1000)
+
+
+@dataclass
+class RunFilter:
+    kind: Optional[str] = None
+    chapter: Optional[str] = None
+    beat: Optional[str] = None
+    model: Optional[str] = None
+    status: Optional[str] = None
+    since_ms: Optional[int] = None
+    min_duration_ms: Optional[int] = None
+
+    def where(self) -> Tuple[str, List[Any]]:
+        clauses, args = [], []
+        for col in ("kind", "chapter", "beat", "model", "status"):
+            value = getattr(self, col)
+            if value is not None:
+                clauses.append(f"{col} = ?")
+                args.append(value)
+        if self.since_ms is not None:
+            clauses.append("started_ms >= ?")
+            args.append(self.since_ms)
+        if self.min_duration_ms is not None:
+            clauses.append("duration_ms >= ?")
+            args.append(self.min_duration_ms)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", args
+
+
+class RunsIndex:
+    """SQLite index of beat runs (05_RUNS/) and ingest runs (00_INGEST/proposals/) for fast queries.
+
+    The engine and extract_to_proposals record each run as it completes, and
+    refresh() catches up with anything else. It re-reads only the files whose
+    mtime or size changed, adds new ones and drops rows whose file is gone.
+    The index can always be rebuilt from the files, so it is safe to delete.
+    """
+
+    def __init__(self, root: Path, db_path: Path):
+        self.root = root
+        self.db_path = db_path
+
+    @classmethod
+    def for_workspace(cls, ws: Workspace) -> "RunsIndex":
+        return cls(ws.root, ws.root / INDEX_PATH)
+
+    def _connect(self) -> sqlite3.Connection:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            conn.executescript("DROP TABLE IF EXISTS runs; DROP TABLE IF EXISTS steps;" + _SCHEMA)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        return conn
+
+    @contextmanager
+    def _db(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connect()
+        try:
+            with conn:  # commits, or rolls back on error
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _upsert(conn: sqlite3.Connection, row: RunRow, steps: Iterable[Tuple[str, str, int | None]] = ()) -> None:
+        d = asdict(row)
+        conn.execute(
+            f"INSERT OR REPLACE INTO runs ({', '.join(d)}) VALUES ({', '.join('?' * len(d))})", list(d.values())
+        )
+        conn.execute("DELETE FROM steps WHERE run_id = ?", (row.run_id,))
+        conn.executemany("INSERT INTO steps VALUES (?, ?, ?, ?)", [(row.run_id, *s) for s in steps])
+
+    def record_run(self, runlog: RunLog, source: Path) -> None:
+        """Index a beat run that just ended (source is its YAML summary)."""
+        row, steps = row_from_runlog(runlog.to_dict(), source.relative_to(self.root).as_posix(), _sig(source))
+        with self._db() as conn:
+            self._upsert(conn, row, steps)
+
+    def record_ingest(self, run_dir: Path) -> None:
+        meta = run_dir / "00_META.md"
+        with self._db() as conn:
+            self._upsert(conn, row_from_ingest(meta, False, meta.relative_to(self.root).as_posix(), _sig(meta)))
+
+    def _sources(self) -> Dict[str, Tuple[Path, str, str]]:
+        """run_id -> (path, kind, signature) for every run file in the workspace."""
+        out: Dict[str, Tuple[Path, str, str]] = {}
+        runs = self.root / "05_RUNS"
+        if runs.is_dir():
+            for p in runs.glob("*.jsonl"):
+                out[p.stem] = (p, "journal", _sig(p))
+            for p in runs.glob("*.yaml"):  # a summary wins over a leftover journal
+                out[p.stem] = (p, "yaml", _sig(p))
+        proposals = self.root / "00_INGEST" / "proposals"
+        approved = self.root / "00_INGEST" / "approved"
+        if proposals.is_dir():
+            for meta in proposals.glob("*/00_META.md"):
+                flag = ":approved" if (approved / meta.parent.name).is_dir() else ""
+                out[meta.parent.name] = (meta, "ingest", _sig(meta, flag))
+        return out
+
+    def refresh(self) -> Tuple[int, int]:
+        """Bring the index up to date with the files; returns (rows added or updated, rows removed)."""
+        sources = self._sources()
+        with self._db() as conn:
+            known = {r["run_id"]: r["source_sig"] for r in conn.execute("SELECT run_id, source_sig FROM runs")}
+            gone = [run_id for run_id in known if run_id not in sources]
+            conn.executemany("DELETE FROM runs WHERE run_id = ?", [(r,) for r in gone])
+            conn.executemany("DELETE FROM steps WHERE run_id = ?", [(r,) for r in gone])
+            changed = 0
+            for run_id, (path, kind, sig) in sources.items():
+                if known.get(run_id) == sig:
+                    continue
+                rel = path.relative_to(self.root).as_posix()
+                try:
+                    if kind == "ingest":
+                        self._upsert(conn, row_from_ingest(path, sig.endswith(":approved"), rel, sig))
+                    else:
+                        d = (yaml.load(path.read_text(encoding="utf-8"), Loader=_Loader) if kind == "yaml"
+                             else RunLog.from_journal(path).to_dict())
+                        self._upsert(conn, *row_from_runlog(d, rel, sig))
+                except (OSError, ValueError, KeyError, TypeError, yaml.YAMLError):
+                    continue  # unreadable or foreign file; retried on the next refresh
+                changed += 1
+        return changed, len(gone)
+
+    def rebuild(self) -> int:
+        self.db_path.unlink(missing_ok=True)
+        return self.refresh()[0]
+
+    def runs(self, f: RunFilter, sort: str = "started", limit: int = 20, descending: bool = True) -> List[Dict[str, Any]]:
+        where, args = f.where()
+        order = SORT_BY[sort] + (" DESC" if descending else " ASC")
+        with self._db() as conn:
+            rows = conn.execute(f"SELECT * FROM runs{where} ORDER BY {order} NULLS LAST LIMIT ?", [*args, limit])
+            return [dict(r) for r in rows]
+
+    def aggregate(self, by: str, f: RunFilter) -> List[Dict[str, Any]]:
+        """Counts, durations and token totals per chapter, beat, model, status, kind or day."""
+        where, args = f.where()
+        key = GROUP_BY[by]
+        sql = (
+            f"SELECT {key} AS {by}, COUNT(*) AS runs, "
+            "SUM(duration_ms) AS total_ms, CAST(AVG(duration_ms) AS INTEGER) AS avg_ms, MAX(duration_ms) AS max_ms, "
+            "SUM(prompt_tokens) AS prompt_tokens, SUM(completion_tokens) AS completion_tokens, "
+            "SUM(llm_calls) AS llm_calls, SUM(cache_hits) AS cache_hits "
+            f"FROM runs{where} GROUP BY 1 ORDER BY total_ms DESC NULLS LAST"
+        )
+        with self._db() as conn:
+            return [dict(r) for r in conn.execute(sql, args)]
+
+    def slowest_steps(self, f: RunFilter, limit: int = 20) -> List[Dict[str, Any]]:
+        where, args = f.where()
+        sql = (
+            "SELECT s.step, COUNT(*) AS runs, CAST(AVG(s.duration_ms) AS INTEGER) AS avg_ms, MAX(s.duration_ms) AS max_ms "
+            f"FROM steps s JOIN runs USING (run_id){where} GROUP BY s.step ORDER BY avg_ms DESC LIMIT ?"
+        )
+        with self._db() as conn:
+            return [dict(r) for r in conn.execute(sql, [*args, limit])]
+
@@ -24,7 +24,7 @@ class Workspace:
         root.mkdir(parents=True, exist_ok=True)
 
         for d in ["00_INGEST/inputs","00_INGEST/proposals","01_CANON","02_CHARACTERS","03_OUTLINES","04_DRAFTS","05_RUNS","06_EXPORTS"]:
-            (root/d).mkdir(exist_ok=True)
+            (root/d).mkdir(parents=True, exist_ok=True)
 
         (root / "project.yaml").write_text(
             f'''project:
@@ -45,6 +45,11 @@ llm:
   model: "gpt-4.1-mini"
   temperature: 0.8
 
+cache:
+  llm:
+    mode: "read_write"   # read_write | read_only | bypass
+    max_mb: 256
+
 workflow:
   steps:
     - load_context
@@ -3,11 +3,13 @@ from __future__ import annotations
 import json
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Any, Dict, List, Tuple
 
 import yaml
 
+from storyos.config import load_project_config
 from storyos.ingest.extract import extract_to_proposals
+from storyos.llm.registry import connection_stats, get_adapter, stats_line
 
 
 @dataclass(frozen=True)
@@ -33,8 +35,8 @@ def load_dataset(path: str) -> List[EvalCase]:
     return cases
 
 
-def eval_one(project_dir: str, case: EvalCase, pack_dir: str, pack: str) -> Tuple[bool, Dict]:
-    res = extract_to_proposals(project_dir=project_dir, input_path=case.input_path, pack_dir=pack_dir, pack=pack)
+def eval_one(project_dir: str, case: EvalCase, pack_dir: str, pack: str, llm: Any = None) -> Tuple[bool, Dict]:
+    res = extract_to_proposals(project_dir=project_dir, input_path=case.input_path, pack_dir=pack_dir, pack=pack, llm=llm)
     run_dir = Path(res.proposals_dir)
     parsed_json = run_dir / "parsed.json"
     data = json.loads(parsed_json.read_text(encoding="utf-8"))
@@ -57,10 +59,12 @@ def eval_one(project_dir: str, case: EvalCase, pack_dir: str, pack: str) -> Tupl
 
 def run(project_dir: str, dataset: str, pack_dir: str, pack: str) -> int:
     cases = load_dataset(dataset)
+    # One adapter (and connection pool) for every case.
+    llm = get_adapter(load_project_config(project_dir).llm)
     all_ok = True
     reports = []
     for c in cases:
-        ok, rep = eval_one(project_dir, c, pack_dir, pack)
+        ok, rep = eval_one(project_dir, c, pack_dir, pack, llm=llm)
         all_ok &= ok
         reports.append(rep)
         print(f"[{c.id}] ok={ok} characters={rep['characters_count']} missing={rep['missing_names']}")
@@ -68,6 +72,9 @@ def run(project_dir: str, dataset: str, pack_dir: str, pack: str) -> int:
     out_path = Path(project_dir) / "00_INGEST" / "eval_reports"
     out_path.mkdir(parents=True, exist_ok=True)
     (out_path / "latest_ingest_eval.json").write_text(json.dumps(reports, indent=2), encoding="utf-8")
+    stats = connection_stats()
+    if stats:
+        print(f"http: {stats_line(stats)}")
     return 0 if all_ok else 2
 
 
@@ -1,12 +1,19 @@
 from __future__ import annotations
 
-import json
 import re
+import shutil
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
+from storyos.ingest.json_stream import parse_extractor_text
+from storyos.ingest.near_dup import NearDupIndex
+
+# Word-set Jaccard at or above which a claim counts as a near-duplicate of canon.
+# "Pooh is fond of honey" vs "Pooh loves honey" scores 0.5.
+DEFAULT_NEAR_DUP_THRESHOLD = 0.5
+
 
 # --- confidence normalisation ---
 CONF_MAP = {
@@ -17,21 +24,6 @@ CONF_MAP = {
 }
 
 
-def _normalise_confidence(obj: Any) -> Any:
-    """Walk nested dict/list and normalise confidence fields to high|med|low."""
-    if isinstance(obj, dict):
-        out: Dict[str, Any] = {}
-        for k, v in obj.items():
-            if k == "confidence" and isinstance(v, str):
-                out[k] = CONF_MAP.get(v.strip().lower(), v)
-            else:
-                out[k] = _normalise_confidence(v)
-        return out
-    if isinstance(obj, list):
-        return [_normalise_confidence(x) for x in obj]
-    return obj
-
-
 def safe_slug(text: str) -> str:
     """Filesystem-friendly slug for filenames/paths."""
     s = (text or "").strip().lower()
@@ -51,25 +43,16 @@ class ApprovalResult:
     character_facts_added: int
 
 
-def _extract_first_json_object(text: str) -> str:
-    """Return the first top-level JSON object substring from text.
+def _load_extractor_json(raw_llm_output: Path) -> Dict[str, Any]:
+    """Extractor JSON from raw_llm_output.txt.
 
-    We intentionally look for a single {...} object (not double braces).
+    Prose or code fences around the object are ignored. A response that was cut
+    off (e.g. an interrupted stream) is reduced to its complete items rather than
+    rejected.
     """
-    start = text.find("{")
-    end = text.rfind("}")
-    if start == -1 or end == -1 or end <= start:
-        raise ValueError("No JSON object found in model output")
-    return text[start : end + 1]
-
-
-def _load_extractor_json(raw_llm_output: Path) -> Dict[str, Any]:
     raw = raw_llm_output.read_text(encoding="utf-8", errors="replace")
-    json_text = _extract_first_json_object(raw)
-    data = json.loads(json_text)
-    if not isinstance(data, dict):
-        raise ValueError("Extractor JSON root must be an object")
-    return _normalise_confidence(data)
+    data, _complete = parse_extractor_text(raw)
+    return data
 
 
 def _ensure_list(x: Any) -> List[Any]:
@@ -334,34 +317,98 @@ def _read_existing_claims(md_path: Path) -> set[str]:
     return claims
 
 
-def approve_proposals_run(
-    project_dir: str,
-    run_id: str,
-    dry_run: bool = False,
-    archive: bool = True,
-    dedupe: bool = True,
-) -> ApprovalResult:
-    """Approve an ingest proposals run and merge into canon.
+def _append_sections(md_path: Path, sections: List[Tuple[str, List[str]]], stamp: str, header: str = "") -> None:
+    """Append sections to md_path in a single append-mode write.
 
-    Inputs
-    - project_dir: path to a StoryOS project
-    - run_id: folder name under 00_INGEST/proposals/<run_id>
+    The existing file is not read back; only its last two bytes are checked, so
+    a blank line separates the new sections from what is already there. ``header``
+    starts a file that does not exist yet.
+    """
+    blocks = ["\n".join([f"## {title}", f"_Approved: {stamp}_", ""] + lines + [""]) for title, lines in sections if lines]
+    if not blocks:
+        return
+    sep = header
+    size = md_path.stat().st_size if md_path.exists() else 0
+    if size:
+        with md_path.open("rb") as fh:
+            fh.seek(max(0, size - 2))
+            tail = fh.read()
+        sep = "" if tail.endswith(b"\n\n") else "\n" if tail.endswith(b"\n") else "\n\n"
+    with md_path.open("a", encoding="utf-8") as fh:
+        fh.write(sep + "\n".join(blocks))
+
+
+class _ExistingClaims:
+    """Claims already in each canon file, loaded once per approval and extended as claims are accepted.
+
+    An exact match is always a duplicate. With near_dup_threshold > 0, a claim
+    whose word-set Jaccard similarity to an existing claim reaches the threshold
+    is a near-duplicate too; candidates come from a MinHash/LSH index per canon
+    file, persisted under .storyos/index/near_dup/. Near-duplicates are dropped
+    and reported, or with suppress_near_dups=False kept and reported.
+    """
 
-    What it does
-    - Parses 00_INGEST/proposals/<run_id>/raw_llm_output.txt for the extractor JSON.
-    - Appends approved facts/events into:
-        - 01_CANON/world.md
-        - 01_CANON/timeline.md
-        - 02_CHARACTERS/<character>.md (creates if missing)
-    - Writes an approval report under 00_INGEST/approved/<run_id>/.
+    def __init__(self, project_dir: Path, dedupe: bool, near_dup_threshold: float = 0.0, suppress_near_dups: bool = True):
+        self.project_dir = project_dir
+        self.dedupe = dedupe
+        self.near_dup_threshold = near_dup_threshold
+        self.suppress_near_dups = suppress_near_dups
+        self._exact: Dict[Path, set[str]] = {}
+        self._near: Dict[Path, NearDupIndex] = {}
+
+    def _load(self, md_path: Path) -> set[str]:
+        if md_path not in self._exact:
+            if self.near_dup_threshold > 0:
+                idx = NearDupIndex.load(
+                    NearDupIndex.index_path(self.project_dir, md_path), md_path, lambda: sorted(_read_existing_claims(md_path))
+                )
+                self._near[md_path] = idx
+                self._exact[md_path] = set(idx.claims)
+            else:
+                self._exact[md_path] = _read_existing_claims(md_path)
+        return self._exact[md_path]
+
+    def check(self, md_path: Path, key: str) -> Optional[Tuple[str, float]]:
+        """Return the (claim, similarity) key duplicates, or None; key is recorded unless it is dropped."""
+        if not self.dedupe:
+            return None
+        claims = self._load(md_path)
+        if key in claims:
+            return key, 1.0
+        idx = self._near.get(md_path)
+        match = idx.query(key, self.near_dup_threshold) if idx is not None else None
+        if match is not None and self.suppress_near_dups:
+            return match
+        if idx is not None:
+            idx.add(key)
+        claims.add(key)
+        return match
+
+    def save(self) -> None:
+        """Persist the near-duplicate indexes; call after the canon files are written."""
+        for md_path, idx in self._near.items():
+            idx.save(NearDupIndex.index_path(self.project_dir, md_path), md_path)
 
-    Notes
-    - This is intentionally conservative: it appends, it doesn't rewrite.
-    - If you want richer merging (sections, structured tables, conflict resolution),
-      keep this as the stable base and add a smarter merger later.
-    """
 
-    project_dir = Path(project_dir)
+@dataclass
+class _RunPlan:
+    run_id: str
+    world_lines: List[str]
+    world_skipped: List[str]
+    tl_lines: List[str]
+    tl_skipped: List[str]
+    char_blocks: List[Tuple[str, List[str]]]
+    char_questions: Dict[str, List[str]]
+    char_skipped: Dict[str, List[str]]
+    near_dups: List[Tuple[str, str, str, float]]  # (section, claim, existing claim, similarity)
+    near_dups_suppressed: bool  # False: near-duplicates were added to canon and only flagged
+
+    @property
+    def character_facts_added(self) -> int:
+        return sum(len(lines) for _, lines in self.char_blocks)
+
+
+def _plan_run(project_dir: Path, run_id: str, existing: _ExistingClaims) -> _RunPlan:
     proposals_root = project_dir / "00_INGEST" / "proposals" / run_id
     if not proposals_root.exists():
         raise FileNotFoundError(f"No proposals run found: {proposals_root}")
@@ -375,17 +422,6 @@ def approve_proposals_run(
     canon_world = project_dir / "01_CANON" / "world.md"
     canon_timeline = project_dir / "01_CANON" / "timeline.md"
     canon_chars_dir = project_dir / "02_CHARACTERS"
-    canon_chars_dir.mkdir(parents=True, exist_ok=True)
-
-    approved_dir = project_dir / "00_INGEST" / "approved" / run_id
-    stamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
-
-    def _as_diff_lines(lines: List[str]) -> List[str]:
-        diffed = []
-        for line in lines:
-            text = line[2:] if line.startswith("- ") else line.lstrip()
-            diffed.append(f"+ {text}")
-        return diffed
 
     # --- gather world facts ---
     world_obj = (data.get("world") or {})
@@ -393,7 +429,18 @@ def approve_proposals_run(
 
     world_lines: List[str] = []
     world_skipped: List[str] = []
-    existing_world = _read_existing_claims(canon_world) if dedupe else set()
+    near_dups: List[Tuple[str, str, str, float]] = []
+
+    def _duplicate(md_path: Path, key: str, section: str) -> Optional[str]:
+        """None for a claim to add, else "exact" or "near" (near-duplicates are kept for the report)."""
+        match = existing.check(md_path, key)
+        if match is None:
+            return None
+        if match[0] == key:
+            return "exact"
+        near_dups.append((section, key, match[0], match[1]))
+        return "near" if existing.suppress_near_dups else None
+
     for f in world_facts:
         if not isinstance(f, dict):
             continue
@@ -401,8 +448,10 @@ def approve_proposals_run(
         if not claim:
             continue
         rendered = _format_fact_line(claim, f.get("confidence"))
-        if dedupe and claim in existing_world:
+        dup = _duplicate(canon_world, claim, "World")
+        if dup == "exact":
             world_skipped.append(rendered)
+        if dup:
             continue
         world_lines.append(rendered)
 
@@ -412,7 +461,6 @@ def approve_proposals_run(
 
     tl_lines: List[str] = []
     tl_skipped: List[str] = []
-    existing_tl = _read_existing_claims(canon_timeline) if dedupe else set()
     for ev in events:
         if not isinstance(ev, dict):
             continue
@@ -423,15 +471,15 @@ def approve_proposals_run(
         # dedupe uses the full rendered line without confidence
         dedupe_key = f"{when}: {what}" if when else what
         rendered = _format_event_line(when, what, ev.get("confidence"))
-        if dedupe and dedupe_key in existing_tl:
+        dup = _duplicate(canon_timeline, dedupe_key, "Timeline")
+        if dup == "exact":
             tl_skipped.append(rendered)
+        if dup:
             continue
         tl_lines.append(rendered)
 
     # --- gather character facts ---
     characters = _ensure_list(data.get("characters"))
-    chars_touched = 0
-    char_facts_added = 0
     char_blocks: List[Tuple[str, List[str]]] = []
     char_questions: Dict[str, List[str]] = {}
     char_skipped: Dict[str, List[str]] = {}
@@ -448,7 +496,6 @@ def approve_proposals_run(
             continue
 
         md_path = canon_chars_dir / f"{safe_slug(name)}.md"
-        existing = _read_existing_claims(md_path) if dedupe else set()
 
         lines: List[str] = []
         for f in facts:
@@ -458,8 +505,10 @@ def approve_proposals_run(
             if not claim:
                 continue
             rendered = _format_fact_line(claim, f.get("confidence"))
-            if dedupe and claim in existing:
+            dup = _duplicate(md_path, claim, name)
+            if dup == "exact":
                 char_skipped.setdefault(name, []).append(rendered)
+            if dup:
                 continue
             lines.append(rendered)
 
@@ -474,93 +523,284 @@ def approve_proposals_run(
             char_questions[name] = question_lines
 
         if lines:
-            chars_touched += 1
-            char_facts_added += len(lines)
             char_blocks.append((name, lines))
 
-    # --- apply writes ---
-    if not dry_run:
-        approved_dir.mkdir(parents=True, exist_ok=True)
+    return _RunPlan(
+        run_id=run_id,
+        world_lines=world_lines,
+        world_skipped=world_skipped,
+        tl_lines=tl_lines,
+        tl_skipped=tl_skipped,
+        char_blocks=char_blocks,
+        char_questions=char_questions,
+        char_skipped=char_skipped,
+        near_dups=near_dups,
+        near_dups_suppressed=existing.suppress_near_dups,
+    )
 
-        if world_lines:
-            _append_section(canon_world, f"Approved ingest facts ({run_id})", world_lines)
 
-        if tl_lines:
-            _append_section(canon_timeline, f"Approved ingest timeline ({run_id})", tl_lines)
+def _as_diff_lines(lines: List[str]) -> List[str]:
+    diffed = []
+    for line in lines:
+        text = line[2:] if line.startswith("- ") else line.lstrip()
+        diffed.append(f"+ {text}")
+    return diffed
 
-        for name, lines in char_blocks:
-            md_path = canon_chars_dir / f"{safe_slug(name)}.md"
-            if not md_path.exists():
-                # create a minimal scaffold
-                md_path.write_text(f"# {name}\n\n", encoding="utf-8")
-            _append_section(md_path, f"Approved ingest facts ({run_id})", lines)
 
-        # Write a report so humans can audit what got merged.
-        report_lines: List[str] = [
-            f"# Approval report: {run_id}",
+def _near_dup_label(suppressed: bool) -> str:
+    return "Near-duplicates suppressed" if suppressed else "Possible near-duplicates (added, check these)"
+
+
+def _report_body(plan: _RunPlan, heading: str = "##") -> List[str]:
+    """Per-run report sections; ``heading`` is the markdown level of the top sections."""
+    h2, h3, h4 = heading, heading + "#", heading + "##"
+    report_lines: List[str] = [
+        f"{h2} Summary",
+        f"- World facts added: {len(plan.world_lines)}",
+        f"- World facts skipped (duplicate): {len(plan.world_skipped)}",
+        f"- Timeline events added: {len(plan.tl_lines)}",
+        f"- Timeline events skipped (duplicate): {len(plan.tl_skipped)}",
+        f"- Characters touched: {len(plan.char_blocks)}",
+        f"- Character facts added: {plan.character_facts_added}",
+        f"- {_near_dup_label(plan.near_dups_suppressed)}: {len(plan.near_dups)}",
+        "",
+        f"{h2} World facts added",
+    ]
+
+    if plan.world_lines:
+        report_lines += [""] + _as_diff_lines(plan.world_lines) + [""]
+    else:
+        report_lines += ["", "+ (none)", ""]
+    if plan.world_skipped:
+        report_lines += [f"{h3} World (skipped duplicates)", ""] + plan.world_skipped + [""]
+    report_lines += [f"{h2} Timeline events added", ""]
+    if plan.tl_lines:
+        report_lines += _as_diff_lines(plan.tl_lines) + [""]
+    else:
+        report_lines += ["+ (none)", ""]
+    if plan.tl_skipped:
+        report_lines += [f"{h3} Timeline (skipped duplicates)", ""] + plan.tl_skipped + [""]
+    report_lines += [f"{h2} Characters updated", ""]
+    if plan.char_blocks:
+        for name, lines in plan.char_blocks:
+            report_lines += [f"{h3} {name}", ""]
+            report_lines += [f"{h4} Facts added", ""] + _as_diff_lines(lines) + [""]
+            questions = plan.char_questions.get(name, [])
+            if questions:
+                report_lines += [f"{h4} Open questions", ""]
+                report_lines += [f"+ {q}" for q in questions] + [""]
+    else:
+        report_lines += ["+ (none)", ""]
+    if plan.char_skipped:
+        report_lines += [f"{h3} Characters (skipped duplicates)", ""]
+        for name, lines in plan.char_skipped.items():
+            report_lines += [f"{h4} {name}", ""] + lines + [""]
+    if plan.near_dups:
+        report_lines += [f"{h2} {_near_dup_label(plan.near_dups_suppressed)}", ""]
+        for section, claim, match, score in plan.near_dups:
+            report_lines.append(f"- [{section}] {claim} ≈ {match} (similarity {score:.2f})")
+        report_lines.append("")
+    return report_lines
+
+
+_REPORT_NOTES = [
+    "## Notes",
+    "- Evidence sources (when shown in proposals) use `file:Lx-Ly` line references to the input.",
+    "- This report lists only additions; removals are not tracked yet.",
+    "",
+]
+
+
+@dataclass
+class BatchApprovalResult:
+    results: List[ApprovalResult]
+    report_path: Optional[Path]  # combined report; None for a single run
+
+    @property
+    def run_ids(self) -> List[str]:
+        return [r.run_id for r in self.results]
+
+
+def pending_run_ids(project_dir: str | Path) -> List[str]:
+    """Proposal runs with extractor output that have not been approved yet, oldest first."""
+    root = Path(project_dir) / "00_INGEST"
+    proposals = root / "proposals"
+    if not proposals.exists():
+        return []
+    return sorted(
+        p.name for p in proposals.iterdir()
+        if (p / "raw_llm_output.txt").exists() and not (root / "approved" / p.name).exists()
+    )
+
+
+def approve_proposals_runs(
+    project_dir: str | Path,
+    run_ids: List[str],
+    dry_run: bool = False,
+    archive: bool = True,
+    dedupe: bool = True,
+    near_dup_threshold: float = DEFAULT_NEAR_DUP_THRESHOLD,
+    suppress_near_dups: bool = True,
+) -> BatchApprovalResult:
+    """Approve several ingest proposal runs into canon in one pass.
+
+    Every run is parsed and deduped in memory first, against the canon files
+    (each read once) and against the runs before it, in the order given. Each
+    canon file is then written once, with one append that holds a section per
+    run, so approving N runs costs one write per file instead of N rewrites.
+    Each run still gets 00_INGEST/approved/<run_id>/APPROVAL_REPORT.md. With
+    more than one run, a combined report is written to
+    00_INGEST/approved/batches/<batch_id>/APPROVAL_REPORT.md.
+
+    Claims whose similarity to an existing one reaches ``near_dup_threshold``
+    (Jaccard over stemmed content words; 0 disables) are near-duplicates: they
+    are skipped and listed in the report with the claim they matched and the
+    score. With ``suppress_near_dups=False`` they are added and only listed. A
+    claim and its negation never match.
+
+    With ``archive``, each run's proposals folder is copied to
+    00_INGEST/approved/<run_id>/proposals alongside its report.
+    """
+    root = Path(project_dir)
+    if not run_ids:
+        raise ValueError("No proposal runs to approve")
+    if len(set(run_ids)) != len(run_ids):
+        raise ValueError("A run id is listed more than once")
+
+    existing = _ExistingClaims(root, dedupe, near_dup_threshold, suppress_near_dups)
+    plans = [_plan_run(root, run_id, existing) for run_id in run_ids]
+
+    canon_world = root / "01_CANON" / "world.md"
+    canon_timeline = root / "01_CANON" / "timeline.md"
+    canon_chars_dir = root / "02_CHARACTERS"
+    approved_root = root / "00_INGEST" / "approved"
+    stamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+
+    results = [
+        ApprovalResult(
+            run_id=plan.run_id,
+            approved_dir=approved_root / plan.run_id,
+            report_path=approved_root / plan.run_id / "APPROVAL_REPORT.md",
+            world_facts_added=len(plan.world_lines),
+            timeline_events_added=len(plan.tl_lines),
+            characters_touched=len(plan.char_blocks),
+            character_facts_added=plan.character_facts_added,
+        )
+        for plan in plans
+    ]
+    combined_path: Optional[Path] = None
+    if len(plans) > 1:
+        from storyos.paths import make_run_id
+        combined_path = approved_root / "batches" / make_run_id(prefix="approve") / "APPROVAL_REPORT.md"
+
+    if dry_run:
+        return BatchApprovalResult(results=results, report_path=combined_path)
+
+    # --- apply writes: one append per canon file ---
+    canon_chars_dir.mkdir(parents=True, exist_ok=True)
+    canon_world.parent.mkdir(parents=True, exist_ok=True)
+    _append_sections(canon_world, [(f"Approved ingest facts ({p.run_id})", p.world_lines) for p in plans], stamp)
+    _append_sections(canon_timeline, [(f"Approved ingest timeline ({p.run_id})", p.tl_lines) for p in plans], stamp)
+
+    char_sections: Dict[str, List[Tuple[str, List[str]]]] = {}
+    char_names: Dict[str, str] = {}
+    for p in plans:
+        for name, lines in p.char_blocks:
+            slug = safe_slug(name)
+            char_names.setdefault(slug, name)
+            char_sections.setdefault(slug, []).append((f"Approved ingest facts ({p.run_id})", lines))
+    for slug, sections in char_sections.items():
+        # a new file gets a minimal scaffold
+        _append_sections(canon_chars_dir / f"{slug}.md", sections, stamp, header=f"# {char_names[slug]}\n\n")
+    existing.save()
+
+    # Write reports so humans can audit what got merged.
+    for plan, result in zip(plans, results):
+        result.approved_dir.mkdir(parents=True, exist_ok=True)
+        report_lines = [
+            f"# Approval report: {plan.run_id}",
+            "",
+            f"Approved at: {stamp}",
+            f"Project: {root.resolve()}",
+            "",
+            *_report_body(plan),
+            *_REPORT_NOTES,
+        ]
+        result.report_path.write_text("\n".join(report_lines), encoding="utf-8")
+        if archive:
+            shutil.copytree(root / "00_INGEST" / "proposals" / plan.run_id, result.approved_dir / "proposals",
+                            dirs_exist_ok=True)
+
+    if combined_path is not None:
+        combined_path.parent.mkdir(parents=True, exist_ok=True)
+        report_lines = [
+            f"# Approval report: {len(plans)} runs",
             "",
             f"Approved at: {stamp}",
-            f"Project: {project_dir.resolve()}",
+            f"Project: {root.resolve()}",
             "",
             "## Summary",
-            f"- World facts added: {len(world_lines)}",
-            f"- World facts skipped (duplicate): {len(world_skipped)}",
-            f"- Timeline events added: {len(tl_lines)}",
-            f"- Timeline events skipped (duplicate): {len(tl_skipped)}",
-            f"- Characters touched: {chars_touched}",
-            f"- Character facts added: {char_facts_added}",
             "",
-            "## World facts added",
+            "| run | world facts | timeline events | characters | character facts | skipped |",
+            "| --- | ---: | ---: | ---: | ---: | ---: |",
         ]
-
-        if world_lines:
-            report_lines += [""] + _as_diff_lines(world_lines) + [""]
-        else:
-            report_lines += ["", "+ (none)", ""]
-        if world_skipped:
-            report_lines += ["### World (skipped duplicates)", ""] + world_skipped + [""]
-        report_lines += ["## Timeline events added", ""]
-        if tl_lines:
-            report_lines += _as_diff_lines(tl_lines) + [""]
-        else:
-            report_lines += ["+ (none)", ""]
-        if tl_skipped:
-            report_lines += ["### Timeline (skipped duplicates)", ""] + tl_skipped + [""]
-        report_lines += ["## Characters updated", ""]
-        if char_blocks:
-            for name, lines in char_blocks:
-                report_lines += [f"### {name}", ""]
-                report_lines += ["#### Facts added", ""] + _as_diff_lines(lines) + [""]
-                questions = char_questions.get(name, [])
-                if questions:
-                    report_lines += ["#### Open questions", ""]
-                    report_lines += [f"+ {q}" for q in questions] + [""]
-        else:
-            report_lines += ["+ (none)", ""]
-        if char_skipped:
-            report_lines += ["### Characters (skipped duplicates)", ""]
-            for name, lines in char_skipped.items():
-                report_lines += [f"#### {name}", ""] + lines + [""]
+        for plan in plans:
+            skipped = (
+                len(plan.world_skipped) + len(plan.tl_skipped) + sum(len(v) for v in plan.char_skipped.values())
+                + (len(plan.near_dups) if plan.near_dups_suppressed else 0)
+            )
+            report_lines.append(
+                f"| `{plan.run_id}` | {len(plan.world_lines)} | {len(plan.tl_lines)} | "
+                f"{len(plan.char_blocks)} | {plan.character_facts_added} | {skipped} |"
+            )
         report_lines += [
-            "## Notes",
-            "- Evidence sources (when shown in proposals) use `file:Lx-Ly` line references to the input.",
-            "- This report lists only additions; removals are not tracked yet.",
+            "",
+            f"- World facts added: {sum(r.world_facts_added for r in results)}",
+            f"- Timeline events added: {sum(r.timeline_events_added for r in results)}",
+            f"- Characters touched: {len(char_sections)}",
+            f"- Character facts added: {sum(r.character_facts_added for r in results)}",
+            f"- {_near_dup_label(suppress_near_dups)}: {sum(len(p.near_dups) for p in plans)}",
             "",
         ]
+        for plan in plans:
+            report_lines += [f"## Run {plan.run_id}", "", *_report_body(plan, heading="###")]
+        report_lines += _REPORT_NOTES
+        combined_path.write_text("\n".join(report_lines), encoding="utf-8")
 
-        (approved_dir / "APPROVAL_REPORT.md").write_text(
-            "\n".join(report_lines), encoding="utf-8"
-        )
+    return BatchApprovalResult(results=results, report_path=combined_path)
 
-    return ApprovalResult(
-        run_id=run_id,
-        approved_dir=approved_dir,
-        report_path=(approved_dir / "APPROVAL_REPORT.md"),
-        world_facts_added=len(world_lines),
-        timeline_events_added=len(tl_lines),
-        characters_touched=chars_touched,
-        character_facts_added=char_facts_added,
-    )
+
+def approve_proposals_run(
+    project_dir: str | Path,
+    run_id: str,
+    dry_run: bool = False,
+    archive: bool = True,
+    dedupe: bool = True,
+    near_dup_threshold: float = DEFAULT_NEAR_DUP_THRESHOLD,
+    suppress_near_dups: bool = True,
+) -> ApprovalResult:
+    """Approve an ingest proposals run and merge into canon.
+
+    Inputs
+    - project_dir: path to a StoryOS project
+    - run_id: folder name under 00_INGEST/proposals/<run_id>
+
+    What it does
+    - Parses 00_INGEST/proposals/<run_id>/raw_llm_output.txt for the extractor JSON.
+    - Appends approved facts/events into:
+        - 01_CANON/world.md
+        - 01_CANON/timeline.md
+        - 02_CHARACTERS/<character>.md (creates if missing)
+    - Writes an approval report under 00_INGEST/approved/<run_id>/.
+
+    Notes
+    - This is intentionally conservative: it appends, it doesn't rewrite.
+    - To approve several runs at once use approve_proposals_runs().
+    """
+    return approve_proposals_runs(
+        project_dir, [run_id], dry_run=dry_run, archive=archive, dedupe=dedupe,
+        near_dup_threshold=near_dup_threshold, suppress_near_dups=suppress_near_dups,
+    ).results[0]
 
 
 # --- compatibility shim -------------------------------------------------------
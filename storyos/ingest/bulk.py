@@ -0,0 +1,163 @@
+from __future__ import annotations
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import yaml
+
+from storyos.config import load_project_config
+from storyos.core.hashing import sha256_file
+from storyos.core.workspace import Workspace
+from storyos.ingest.extract import extract_to_proposals
+
+DEFAULT_INPUT_DIR = "00_INGEST/inputs"
+MANIFEST_PATH = "00_INGEST/manifest.json"
+INPUT_SUFFIXES = (".md", ".markdown", ".txt")
+
+
+@dataclass
+class DirOutcome:
+    path: str  # relative to the input dir
+    sha256: str
+    status: str  # ingested | skipped | duplicate | failed
+    run_id: str | None = None
+    error: str | None = None
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.status != "failed"
+
+
+def load_ingest_manifest(ws: Workspace) -> Dict[str, Dict[str, Any]]:
+    """sha256 of an input file -> {run_id, path, ingested_utc} for every file already ingested."""
+    path = ws.safe_path(MANIFEST_PATH)
+    if not path.exists():
+        return {}
+    data = json.loads(path.read_text(encoding="utf-8"))
+    inputs = data.get("inputs") if isinstance(data, dict) else None
+    return inputs if isinstance(inputs, dict) else {}
+
+
+def save_ingest_manifest(ws: Workspace, entries: Dict[str, Dict[str, Any]]) -> None:
+    path = ws.safe_path(MANIFEST_PATH)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps({"inputs": entries}, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def list_inputs(input_dir: Path) -> List[Path]:
+    return sorted(
+        p for p in input_dir.rglob("*")
+        if p.is_file() and p.suffix.lower() in INPUT_SUFFIXES and not p.name.startswith(".")
+    )
+
+
+def _extract_one(kwargs: Dict[str, Any]) -> tuple[str, float]:
+    # Module-level so ProcessPoolExecutor can pickle it.
+    t0 = time.perf_counter()
+    run_id = extract_to_proposals(**kwargs).run_id
+    return run_id, time.perf_counter() - t0
+
+
+def extract_dir(
+    *,
+    project_dir: str,
+    input_dir: str | None = None,
+    workers: int = 4,
+    force: bool = False,
+    on_progress: Optional[Callable[[DirOutcome, int, int], None]] = None,
+    **extract_kwargs: Any,
+) -> List[DirOutcome]:
+    """Run extract_to_proposals on every input under input_dir (default 00_INGEST/inputs/).
+
+    Files run in a pool of ``workers`` processes. Each input is keyed by its
+    sha256 in 00_INGEST/manifest.json, and files whose digest is already there
+    are skipped unless ``force``. Identical files are only ingested once per call.
+    The manifest is saved after every completed file, so an interrupted job
+    resumes where it stopped. ``extract_kwargs`` go to extract_to_proposals.
+    """
+    cfg = load_project_config(project_dir)
+    ws = Workspace.open(project_dir=project_dir, config=cfg)
+    root = Path(input_dir).expanduser().resolve() if input_dir else ws.safe_path(DEFAULT_INPUT_DIR)
+    if not root.is_dir():
+        raise FileNotFoundError(f"Input directory not found: {root}")
+
+    manifest = load_ingest_manifest(ws)
+    outcomes: List[DirOutcome] = []
+    todo: Dict[str, Path] = {}  # digest -> first file with that content
+    for p in list_inputs(root):
+        rel = p.relative_to(root).as_posix()
+        digest = sha256_file(p)
+        if digest in todo:
+            outcomes.append(DirOutcome(path=rel, sha256=digest, status="duplicate"))
+        elif digest in manifest and not force:
+            outcomes.append(DirOutcome(path=rel, sha256=digest, status="skipped", run_id=manifest[digest].get("run_id")))
+        else:
+            todo[digest] = p
+
+    total = len(outcomes) + len(todo)
+    done = 0
+    for o in outcomes:
+        done += 1
+        if on_progress is not None:
+            on_progress(o, done, total)
+
+    if todo:
+        with ProcessPoolExecutor(max_workers=max(1, min(workers, len(todo)))) as pool:
+            futures = {
+                pool.submit(_extract_one, {**extract_kwargs, "project_dir": project_dir, "input_path": str(p)}): (d, p)
+                for d, p in todo.items()
+            }
+            for fut in as_completed(futures):
+                digest, p = futures[fut]
+                o = DirOutcome(path=p.relative_to(root).as_posix(), sha256=digest, status="ingested")
+                try:
+                    o.run_id, o.seconds = fut.result()
+                except Exception as e:
+                    o.status, o.error = "failed", f"{type(e).__name__}: {e}"
+                else:
+                    manifest[digest] = {
+                        "run_id": o.run_id,
+                        "path": o.path,
+                        "ingested_utc": datetime.now(timezone.utc).isoformat(),
+                    }
+                    save_ingest_manifest(ws, manifest)
+                outcomes.append(o)
+                done += 1
+                if on_progress is not None:
+                    on_progress(o, done, total)
+
+    outcomes.sort(key=lambda o: o.path)
+    return outcomes
+
+
+def dir_summary_yaml(batch_id: str, input_dir: str, outcomes: List[DirOutcome], wall_seconds: float) -> str:
+    counts: Dict[str, int] = {}
+    for o in outcomes:
+        counts[o.status] = counts.get(o.status, 0) + 1
+    doc = {
+        "batch_id": batch_id,
+        "input_dir": input_dir,
+        "files": len(outcomes),
+        **{k: counts.get(k, 0) for k in ("ingested", "skipped", "duplicate", "failed")},
+        "wall_seconds": round(wall_seconds, 3),
+        "items": [
+            {
+                "path": o.path,
+                "sha256": o.sha256,
+                "status": o.status,
+                "run_id": o.run_id,
+                "seconds": round(o.seconds, 3),
+                "error": o.error,
+            }
+            for o in outcomes
+        ],
+    }
+    return yaml.safe_dump(doc, sort_keys=False, allow_unicode=True)
@@ -0,0 +1,89 @@
+from __future__ import annotations
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from storyos.core.hashing import sha256_json
+from storyos.core.workspace import Workspace
+from storyos.ingest.schemas import Evidence, ExtractorOutput, ProposedItem
+
+STORE_DIR = ".storyos/ingest/chunks"
+
+_ref_rx = re.compile(r"^(?P<file>.*):L(?P<start>\d+)-L(?P<end>\d+)$")
+
+
+def _evidence_lists(out: ExtractorOutput) -> Iterator[List[Evidence]]:
+    for ch in out.characters:
+        for f in ch.facts:
+            yield f.evidence
+        for q in ch.open_questions:
+            yield q.evidence
+    for f in out.world.facts:
+        yield f.evidence
+    for q in out.world.open_questions:
+        yield q.evidence
+    for ev in out.timeline.events:
+        yield ev.evidence
+
+
+def rebase_evidence(out: ExtractorOutput, *, delta: int, filename: str) -> None:
+    """Shift "<file>:L<a>-L<b>" evidence refs by delta lines and point them at filename (in place)."""
+    for evs in _evidence_lists(out):
+        for e in evs:
+            m = _ref_rx.match(e.source)
+            if m:
+                start, end = int(m.group("start")) + delta, int(m.group("end")) + delta
+                e.source = f"{filename}:L{start}-L{end}"
+
+
+def mark_origin(out: ExtractorOutput, origin: str) -> None:
+    items: List[ProposedItem] = [*out.world.facts, *out.world.open_questions, *out.timeline.events]
+    for ch in out.characters:
+        items += [*ch.facts, *ch.open_questions]
+    for item in items:
+        item.origin = origin
+
+
+class ChunkStore:
+    """Per-chunk extraction results for incremental re-ingest.
+
+    Keyed on the chunk's text plus a fingerprint of the prompt/model, so a chunk
+    that is byte-identical to one extracted before (in any file or revision) is
+    not sent to the LLM again. Entries live at <root>/<key[:2]>/<key>.json and
+    record the chunk's start line, so evidence refs can be moved to where the
+    chunk sits now.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+
+    @classmethod
+    def for_workspace(cls, ws: Workspace) -> "ChunkStore":
+        return cls(ws.safe_path(STORE_DIR))
+
+    @staticmethod
+    def key(text: str, fingerprint: str) -> str:
+        return sha256_json({"text": text, "prompt": fingerprint})
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Tuple[int, ExtractorOutput]]:
+        try:
+            data = json.loads(self._path(key).read_text(encoding="utf-8"))
+            return int(data["start_line"]), ExtractorOutput.model_validate(data["extracted"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def put(self, key: str, start_line: int, extracted: ExtractorOutput) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(
+            json.dumps({"start_line": start_line, "extracted": extracted.model_dump(exclude_none=True)}),
+            encoding="utf-8",
+        )
+        os.replace(tmp, path)
@@ -1,6 +1,14 @@
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import List
+import mmap
+import re
+import zlib
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Union
+
+from storyos.llm.tokens import count_tokens_uncached
 
 @dataclass(frozen=True)
 class LineSpan:
@@ -15,6 +23,27 @@ class TextChunk:
     span: LineSpan
     text: str
 
+@dataclass(frozen=True)
+class OffsetChunk:
+    """A chunk that references a byte range of a shared buffer (bytes or mmap).
+
+    ``text`` is decoded on each access, so holding many chunks costs a few ints
+    each rather than a copy of the text. The buffer must still be open when
+    ``text`` is read.
+    """
+    id: str
+    span: LineSpan
+    buf: Union[bytes, mmap.mmap] = field(repr=False, compare=False)
+    start: int
+    end: int
+
+    @property
+    def text(self) -> str:
+        return self.buf[self.start:self.end].decode("utf-8", errors="replace")
+
+Chunk = Union[TextChunk, OffsetChunk]
+Buffer = Union[bytes, mmap.mmap]
+
 def chunk_by_lines(lines: List[str], *, max_lines: int = 80, overlap: int = 10) -> List[TextChunk]:
     step = max(1, max_lines - max(0, overlap))
     out: List[TextChunk] = []
@@ -26,3 +55,242 @@ def chunk_by_lines(lines: List[str], *, max_lines: int = 80, overlap: int = 10)
         k += 1
         i += step
     return out
+
+@contextmanager
+def mapped_file(path: Path) -> Iterator[Buffer]:
+    """Open ``path`` read-only as an mmap (empty files yield b"", which mmap rejects)."""
+    with open(path, "rb") as fh:
+        if fh.seek(0, 2) == 0:
+            yield b""
+            return
+        mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield mm
+        finally:
+            mm.close()
+
+def _line_offsets(buf: Buffer) -> Iterator[int]:
+    """Yield the byte offset of every line start, then the end of the buffer."""
+    n = len(buf)
+    yield 0
+    pos = 0
+    while pos < n:
+        i = buf.find(b"\n", pos)
+        pos = n if i < 0 else i + 1
+        yield pos
+
+def iter_chunks(buf: Buffer, *, max_lines: int = 80, overlap: int = 10) -> Iterator[OffsetChunk]:
+    """Streaming chunk_by_lines over a byte buffer: same spans and ids, lazy text.
+
+    Only the line offsets of the current window (max_lines + 1 ints) are kept, so
+    a multi-hundred-MB mmap is chunked in constant memory. Lines end at "\\n".
+    """
+    max_lines = max(1, max_lines)
+    step = max(1, max_lines - max(0, overlap))
+    window: Deque[int] = deque()  # window[j] = byte offset of line (first + j)
+    first, k = 0, 1
+
+    def emit(n_lines: int) -> OffsetChunk:
+        nonlocal first, k
+        chunk = OffsetChunk(
+            id=f"chunk_{k:03d}",
+            span=LineSpan(first + 1, first + n_lines),
+            buf=buf,
+            start=window[0],
+            end=window[n_lines],
+        )
+        for _ in range(min(step, len(window) - 1)):
+            window.popleft()
+        first += step
+        k += 1
+        return chunk
+
+    for off in _line_offsets(buf):
+        window.append(off)
+        if len(window) == max_lines + 1:
+            yield emit(max_lines)
+    while len(window) > 1:
+        yield emit(len(window) - 1)
+
+# Scene breaks ("***", "* * *", "---", "###"), markdown headings and "Chapter N" lines.
+_scene_break_rx = re.compile(r"^\s*(?:(?:[*#~-]\s*){3,}|#{1,6}\s.*|chapter\b.*)$", re.IGNORECASE)
+
+@dataclass
+class _Line:
+    start: int
+    end: int
+    tokens: int
+    para_start: bool
+
+def _paragraphs(buf: Buffer, model: str) -> Iterator[tuple[List[_Line], bool]]:
+    """Yield (lines, is_scene_break) per paragraph; blank lines stay with the paragraph above."""
+    para: List[_Line] = []
+    prev_blank, prev_break = True, False
+    offsets = _line_offsets(buf)
+    start = next(offsets)
+    for end in offsets:
+        text = buf[start:end].decode("utf-8", errors="replace")
+        blank = not text.strip()
+        is_break = not blank and bool(_scene_break_rx.match(text))
+        if not blank and (prev_blank or prev_break or is_break) and para:
+            yield para, prev_break
+            para = []
+        if not blank and (prev_blank or prev_break or is_break):
+            prev_break = is_break
+        para.append(_Line(start, end, count_tokens_uncached(text, model), para_start=not para))
+        prev_blank = blank
+        start = end
+    if para:
+        yield para, prev_break
+
+def iter_token_chunks(
+    buf: Buffer, *, max_tokens: int = 1500, overlap_tokens: int = 150, model: str = ""
+) -> Iterator[OffsetChunk]:
+    """Chunk by token budget along paragraph and scene boundaries.
+
+    Whole paragraphs are packed until the next would exceed ``max_tokens``; a
+    paragraph larger than the budget is split between lines. A scene break ends
+    the current chunk once it is at least half full, with no overlap carried
+    across it. Otherwise each chunk starts with up to ``overlap_tokens`` of the
+    previous one, from a paragraph start when one falls inside that tail.
+    """
+    max_tokens = max(1, max_tokens)
+    cur: List[_Line] = []
+    first, fresh, k = 1, 0, 1  # first: line number of cur[0]; fresh: lines not carried over
+
+    def flush(carry: bool) -> Optional[OffsetChunk]:
+        nonlocal cur, first, fresh, k
+        if not fresh:
+            return None
+        chunk = OffsetChunk(
+            id=f"chunk_{k:03d}",
+            span=LineSpan(first, first + len(cur) - 1),
+            buf=buf,
+            start=cur[0].start,
+            end=cur[-1].end,
+        )
+        k += 1
+        keep, total = len(cur), 0
+        if carry and overlap_tokens > 0:
+            while keep > 1 and total + cur[keep - 1].tokens <= overlap_tokens:
+                keep -= 1
+                total += cur[keep].tokens
+            tail_starts = [i for i in range(keep, len(cur)) if cur[i].para_start]
+            if tail_starts:
+                keep = tail_starts[0]
+        if total == 0:
+            keep = len(cur)
+        first += keep
+        cur, fresh = cur[keep:], 0
+        return chunk
+
+    def fit(tokens: int) -> None:
+        # Drop carried-over lines until the incoming text fits the budget.
+        nonlocal cur, first
+        while cur and sum(x.tokens for x in cur) + tokens > max_tokens:
+            cur = cur[1:]
+            first += 1
+
+    for para, is_break in _paragraphs(buf, model):
+        size = sum(x.tokens for x in para)
+        used = sum(x.tokens for x in cur)
+        if is_break and used * 2 >= max_tokens:
+            chunk = flush(carry=False)
+            if chunk:
+                yield chunk
+            used = 0
+        if used + size <= max_tokens:
+            cur.extend(para)
+            fresh += len(para)
+            continue
+        chunk = flush(carry=True)
+        if chunk:
+            yield chunk
+        if size <= max_tokens:
+            fit(size)
+            cur.extend(para)
+            fresh += len(para)
+            continue
+        for line in para:
+            if fresh and sum(x.tokens for x in cur) + line.tokens > max_tokens:
+                chunk = flush(carry=True)
+                if chunk:
+                    yield chunk
+            fit(line.tokens)
+            cur.append(line)
+            fresh += 1
+    chunk = flush(carry=False)
+    if chunk:
+        yield chunk
+
+
+def iter_content_chunks(
+    buf: Buffer, *, avg_lines: int = 20, min_lines: int = 20, max_lines: int = 80
+) -> Iterator[OffsetChunk]:
+    """Content-defined chunks: boundaries depend on line content, not position.
+
+    A non-blank line whose crc32 is divisible by ``avg_lines`` ends a chunk once
+    it has ``min_lines`` lines; the blank lines after it stay in the same chunk.
+    ``max_lines`` forces a cut. Inserting or deleting text therefore only changes
+    the chunks around the edit, and later chunks keep their exact bytes, which
+    lets incremental ingest reuse their extractions. There is no overlap.
+    """
+    avg_lines, min_lines = max(1, avg_lines), max(1, min_lines)
+    max_lines = max(min_lines, max_lines)
+    first, n, k = 1, 0, 1  # first line of the open chunk, lines in it, next chunk number
+    offsets = _line_offsets(buf)
+    chunk_start = start = next(offsets)
+    cut_pending = False
+
+    def make(end: int) -> OffsetChunk:
+        nonlocal k
+        chunk = OffsetChunk(id=f"chunk_{k:03d}", span=LineSpan(first, first + n - 1), buf=buf, start=chunk_start, end=end)
+        k += 1
+        return chunk
+
+    for end in offsets:
+        stripped = buf[start:end].strip()
+        if cut_pending and stripped:
+            yield make(start)
+            first, n, chunk_start, cut_pending = first + n, 0, start, False
+        n += 1
+        if stripped and n >= min_lines and zlib.crc32(stripped) % avg_lines == 0:
+            cut_pending = True
+        if n >= max_lines:
+            yield make(end)
+            first, n, chunk_start, cut_pending = first + n, 0, end, False
+        start = end
+    if n:
+        yield make(start)
+
+
+@dataclass(frozen=True)
+class ChunkOptions:
+    max_lines: int = 80
+    overlap: int = 10
+    max_tokens: int = 1500
+    overlap_tokens: int = 150
+    model: str = ""
+
+Chunker = Callable[[Buffer, ChunkOptions], Iterator[Chunk]]
+
+# Chunking strategies selectable by name (storyos ingest extract --chunker).
+CHUNKERS: Dict[str, Chunker] = {
+    "lines": lambda buf, o: iter_chunks(buf, max_lines=o.max_lines, overlap=o.overlap),
+    "tokens": lambda buf, o: iter_token_chunks(
+        buf, max_tokens=o.max_tokens, overlap_tokens=o.overlap_tokens, model=o.model
+    ),
+    # Boundaries average about max_lines / 2; used by incremental ingest.
+    "content": lambda buf, o: iter_content_chunks(
+        buf, avg_lines=max(1, o.max_lines // 4), min_lines=max(1, o.max_lines // 4), max_lines=o.max_lines
+    ),
+}
+
+def get_chunker(strategy: str) -> Chunker:
+    try:
+        return CHUNKERS[strategy]
+    except KeyError:
+        raise ValueError(f"Unknown chunker: {strategy!r} (expected one of {', '.join(CHUNKERS)})") from None
+
+def chunk_buffer(buf: Buffer, strategy: str = "lines", opts: ChunkOptions | None = None) -> Iterator[Chunk]:
+    return get_chunker(strategy)(buf, opts or ChunkOptions())
@@ -1,18 +1,25 @@
 from __future__ import annotations
-import re, uuid
+import re, sqlite3, threading, time, uuid
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
 
 from storyos.config import load_project_config
+from storyos.core.runs_index import RunsIndex
 from storyos.core.workspace import Workspace
-from storyos.llm.base import LLMMessage
-from storyos.llm.openai_adapter import OpenAIAdapter
-from storyos.ingest.chunking import chunk_by_lines
+from storyos.llm.base import LLMAdapter, LLMMessage, generate_stream
+from storyos.llm.cache import CachingLLMAdapter, LLMCache
+from storyos.llm.registry import connection_stats, get_adapter, stats_line
+from storyos.core.hashing import sha256_json
+from storyos.ingest.chunk_store import ChunkStore, mark_origin, rebase_evidence
+from storyos.ingest.chunking import Chunk, ChunkOptions, get_chunker, mapped_file
+from storyos.ingest.json_stream import ExtractorStreamParser, salvage_extractor_output
+from storyos.ingest.merge import merge_extractor_outputs
 from storyos.ingest.schemas import ExtractorOutput
 from storyos.ingest.templates import render_character_md, render_world_md, render_timeline_md
-from storyos.prompts.pack_loader import load_pipeline
+from storyos.prompts.pack_loader import PackPipeline, load_pipeline
 import json
 from storyos.paths import make_run_id
 
@@ -26,31 +33,6 @@ def safe_slug(text: str) -> str:
     return s or 'item'
 
 
-# --- confidence normalisation (patch v3) ---
-
-CONF_MAP = {
-    "high": "high",
-    "med": "med",
-    "medium": "med",
-    "low": "low",
-}
-
-def _normalise_confidence(obj):
-    """Walk nested dict/list and normalise confidence fields to high|med|low."""
-    if isinstance(obj, dict):
-        out = {}
-        for k, v in obj.items():
-            if k == "confidence" and isinstance(v, str):
-                out[k] = CONF_MAP.get(v.strip().lower(), v)
-            else:
-                out[k] = _normalise_confidence(v)
-        return out
-    if isinstance(obj, list):
-        return [_normalise_confidence(x) for x in obj]
-    return obj
-
-
-
 @dataclass(frozen=True)
 class IngestResult:
     run_id: str
@@ -73,54 +55,319 @@ def _safe_slug_local(s: str) -> str:
     s = re.sub(r"[^a-z0-9]+", "_", s.strip().lower())
     return s.strip("_") or "unnamed"
 
-def extract_to_proposals(*, project_dir: str, input_path: str, max_lines_per_chunk: int=80, overlap: int=10, pack_dir: str='content/packs', pack: str='ingest_v1') -> IngestResult:
+# A response cut off at max_output_tokens keeps its complete items; the model is
+# then shown what it wrote and asked for the rest, at most this many times.
+MAX_CONTINUATIONS = 2
+
+CONTINUE_PROMPT = """Your previous reply was cut off before the JSON object was complete.
+Return ONE new JSON object in the same schema containing ONLY the items that come after the
+last complete item you wrote. Do not repeat items already written."""
+
+
+@dataclass
+class _Extraction:
+    outputs: List[str]  # verbatim text of the first response, then of each continuation
+    extracted: ExtractorOutput
+    extracted_dict: Dict[str, Any]
+    truncated: bool = False  # the first response was cut off and salvaged
+    complete: bool = True  # False if the tail was still missing after MAX_CONTINUATIONS
+    continuation_error: str | None = None  # why the last continuation call failed, if it did
+
+
+def _stream_parse(llm: LLMAdapter, messages: List[LLMMessage], model: str, pipe: PackPipeline,
+                  on_delta: Optional[Callable[[str], None]] = None) -> ExtractorStreamParser:
+    parser = ExtractorStreamParser()
+    for delta in generate_stream(llm, messages, model=model, temperature=pipe.temperature, max_output_tokens=pipe.max_output_tokens):
+        parser.feed(delta)
+        if on_delta is not None:
+            on_delta(delta)
+    return parser
+
+
+def _run_extraction(llm: LLMAdapter, model: str, pipe: PackPipeline, messages: List[LLMMessage],
+                    on_delta: Optional[Callable[[str], None]] = None) -> _Extraction:
+    """One extraction call, parsed while it streams; a truncated response is salvaged and continued."""
+    parser = _stream_parse(llm, messages, model, pipe, on_delta)
+    data, complete = parser.result()
+    if complete:
+        return _Extraction(outputs=[parser.text], extracted=ExtractorOutput.model_validate(data), extracted_dict=data)
+
+    outputs = [parser.text]
+    parts = [salvage_extractor_output(data)]
+    history = list(messages)
+    error = None
+    for _ in range(MAX_CONTINUATIONS):
+        history += [LLMMessage(role="assistant", content=outputs[-1]), LLMMessage(role="user", content=CONTINUE_PROMPT)]
+        try:
+            cont = _stream_parse(llm, history, model, pipe)
+        except Exception as e:  # keep what the first response salvaged
+            error = f"{type(e).__name__}: {e}"
+            complete = False
+            break
+        outputs.append(cont.text)
+        try:
+            data, complete = cont.result()
+        except ValueError:
+            complete = False
+            break
+        parts.append(salvage_extractor_output(data))
+        if complete:
+            break
+    extracted = merge_extractor_outputs(parts)
+    return _Extraction(
+        outputs=outputs,
+        extracted=extracted,
+        extracted_dict=extracted.model_dump(exclude_none=True),
+        truncated=True,
+        complete=complete,
+        continuation_error=error,
+    )
+
+
+def _truncation_note(ex: _Extraction) -> str:
+    return (
+        f"response truncated; complete items salvaged, {len(ex.outputs) - 1} continuation call(s), "
+        + ("tail recovered" if ex.complete else "tail still missing")
+        + (f" (continuation failed: {ex.continuation_error})" if ex.continuation_error else "")
+    )
+
+
+def _chunk_prompt(pipe: PackPipeline, filename: str, chunks: List[Chunk]) -> str:
+    chunk_text = "\n\n".join([f"## {c.id} [{c.span.ref(filename)}]\n{c.text}" for c in chunks])
+    return pipe.user_prompt.replace('{{filename}}', filename).replace('{{chunk_text}}', chunk_text)
+
+
+@dataclass
+class _GroupResult:
+    index: int
+    chunk_ids: List[str]
+    user_prompt: str
+    output: str = ""
+    extracted: ExtractorOutput | None = None
+    error: str | None = None
+    reused: bool = False
+    truncation: str | None = None
+    calls: int = 1
+
+
+def _extract_group(
+    llm: LLMAdapter, model: str, pipe: PackPipeline, system_full: str, filename: str, index: int, chunks: List[Chunk]
+) -> _GroupResult:
+    """Map step: one bounded LLM call over a group of chunks. Never raises."""
+    res = _GroupResult(index=index, chunk_ids=[c.id for c in chunks], user_prompt=_chunk_prompt(pipe, filename, chunks))
+    try:
+        messages = [
+            LLMMessage(role='system', content=system_full),
+            LLMMessage(role='user', content=res.user_prompt),
+        ]
+        ex = _run_extraction(llm, model, pipe, messages)
+        res.output = "\n\n--- continuation ---\n\n".join(ex.outputs)
+        res.extracted, res.calls = ex.extracted, len(ex.outputs) + (ex.continuation_error is not None)
+        if ex.truncated:
+            res.truncation = _truncation_note(ex)
+    except Exception as e:
+        res.error = f"{type(e).__name__}: {e}"
+    return res
+
+
+def extract_to_proposals(
+    *,
+    project_dir: str,
+    input_path: str,
+    max_lines_per_chunk: int=80,
+    overlap: int=10,
+    pack_dir: str='content/packs',
+    pack: str='ingest_v1',
+    map_reduce: bool=False,
+    concurrency: int=4,
+    chunks_per_call: int=1,
+    chunker: str='lines',
+    chunk_tokens: int=1500,
+    overlap_tokens: int=150,
+    incremental: bool=False,
+    on_progress: Optional[Callable[[str, int], None]]=None,
+    llm: Any=None,
+) -> IngestResult:
+    """Extract world/timeline/character proposals from one input file.
+
+    By default every chunk is sent in a single LLM call. With ``map_reduce=True``
+    each group of ``chunks_per_call`` chunks is extracted by its own call (at most
+    ``concurrency`` in flight) and the per-group ExtractorOutputs are merged; a
+    failed group is recorded in parse_errors.txt instead of failing the run.
+
+    ``chunker`` picks the strategy from storyos.ingest.chunking.CHUNKERS: "lines"
+    (max_lines_per_chunk/overlap) or "tokens" (chunk_tokens/overlap_tokens,
+    split on paragraph and scene boundaries).
+
+    ``incremental=True`` re-ingests an edited manuscript cheaply: the input is cut
+    into content-defined chunks, each extracted by its own call, and every
+    chunk's result is kept in the ChunkStore. Chunks whose text was extracted
+    before reuse that result (evidence refs moved to the chunk's current lines)
+    instead of calling the LLM. Proposals are tagged [new] or [reused]. This
+    overrides map_reduce, chunks_per_call and chunker.
+
+    on_progress(label, n) reports streamed bytes in single mode and completed
+    calls in map-reduce mode.
+
+    ``llm`` is the adapter to call; by default the process-wide one for the
+    project's llm config (storyos.llm.registry), so repeated runs reuse its
+    pooled connections.
+    """
+    t0 = time.perf_counter()
     cfg = load_project_config(project_dir)
     ws = Workspace.open(project_dir=project_dir, config=cfg)
+    if incremental:
+        map_reduce, chunks_per_call, chunker = True, 1, "content"
+    chunk_fn = get_chunker(chunker)
 
     run_id = make_run_id(prefix="ingest")
     proposals_root = ws.safe_path(f"00_INGEST/proposals/{run_id}")
     proposals_root.mkdir(parents=True, exist_ok=True)
 
     in_path = Path(input_path).expanduser().resolve()
-    raw = in_path.read_text(encoding="utf-8", errors="replace")
-    lines = raw.splitlines(keepends=True)
-    chunks = chunk_by_lines(lines, max_lines=max_lines_per_chunk, overlap=overlap)
-
     filename = in_path.name
-    chunk_text = "\n\n".join([f"## {c.id} [{c.span.ref(filename)}]\n{c.text}" for c in chunks])
 
-    llm = OpenAIAdapter()
+    llm = CachingLLMAdapter(llm if llm is not None else get_adapter(cfg.llm), LLMCache.for_workspace(ws))
     pipe = load_pipeline(pack_dir=pack_dir, pack=pack, pipeline='ingest_extract')
     system_full = ''.join(pipe.guardrails) + '' + pipe.system_prompt
-    user_full = pipe.user_prompt.replace('{{filename}}', filename).replace('{{chunk_text}}', chunk_text)
-    messages: List[LLMMessage] = [
-        LLMMessage(role='system', content=system_full),
-        LLMMessage(role='user', content=user_full),
-    ]
-    out = llm.generate(messages, model=cfg.llm.model, temperature=pipe.temperature, max_output_tokens=pipe.max_output_tokens).text
-
-    m = re.search(r"\{.*\}\s*$", out, flags=re.DOTALL)
-    extracted = ExtractorOutput()
-    if m:
-        try:
-            extracted = ExtractorOutput.model_validate_json(m.group(0))
-        except Exception:
-            extracted = ExtractorOutput()
-
+    store = ChunkStore.for_workspace(ws) if incremental else None
+    prompt_fp = sha256_json({
+        "system": system_full,
+        "user": pipe.user_prompt,
+        "model": cfg.llm.model,
+        # Extractions by the stub or fake adapter must not be reused for a real model.
+        "adapter": llm.cache_namespace,
+        "temperature": pipe.temperature,
+        "max_output_tokens": pipe.max_output_tokens,
+    })
+
+    # Chunks are offsets into the mmapped input; their text is only decoded while
+    # a prompt is built, so map-reduce runs stay bounded in memory on huge inputs.
+    with mapped_file(in_path) as buf:
+        opts = ChunkOptions(
+            max_lines=max_lines_per_chunk,
+            overlap=overlap,
+            max_tokens=chunk_tokens,
+            overlap_tokens=overlap_tokens,
+            model=cfg.llm.model,
+        )
+        chunks = list(chunk_fn(buf, opts))
+
+        if map_reduce:
+            size = max(1, chunks_per_call)
+            groups = [chunks[i:i + size] for i in range(0, len(chunks), size)]
+            calls_dir = proposals_root / "calls"
+            calls_dir.mkdir(exist_ok=True)
+            calls_done = 0
+            progress_lock = threading.Lock()
+
+            def _map(ig: tuple[int, List[Chunk]]) -> _GroupResult:
+                if store is not None:
+                    return _map_incremental(store, ig[0], ig[1][0])
+                r = _extract_group(llm, cfg.llm.model, pipe, system_full, filename, ig[0], ig[1])
+                _record_call(r)
+                return r
+
+            def _map_incremental(store: ChunkStore, index: int, chunk: Chunk) -> _GroupResult:
+                key = ChunkStore.key(chunk.text, prompt_fp)
+                saved = store.get(key)
+                if saved is not None:
+                    start_line, extracted = saved
+                    rebase_evidence(extracted, delta=chunk.span.start_line - start_line, filename=filename)
+                    mark_origin(extracted, "reused")
+                    return _GroupResult(index=index, chunk_ids=[chunk.id], user_prompt="", extracted=extracted, reused=True)
+                r = _extract_group(llm, cfg.llm.model, pipe, system_full, filename, index, [chunk])
+                if r.extracted is not None:
+                    store.put(key, chunk.span.start_line, r.extracted)
+                    mark_origin(r.extracted, "new")
+                _record_call(r)
+                return r
+
+            def _record_call(r: _GroupResult) -> None:
+                nonlocal calls_done
+                (calls_dir / f"group_{r.index:03d}.prompt.md").write_text(r.user_prompt, encoding="utf-8")
+                (calls_dir / f"group_{r.index:03d}.output.txt").write_text(r.output, encoding="utf-8")
+                r.user_prompt = r.output = ""
+                # Calls finish out of order, so report how many are done, not which one.
+                with progress_lock:
+                    calls_done += 1
+                    if on_progress is not None:
+                        on_progress("calls", calls_done)
+
+            with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+                results = list(pool.map(_map, enumerate(groups, start=1)))
+
+            failed = [r for r in results if r.error]
+            noted = [r for r in results if r.error or r.truncation]
+            if noted:
+                (proposals_root / 'parse_errors.txt').write_text(
+                    "".join(f"group_{r.index:03d} ({', '.join(r.chunk_ids)}): {r.error or r.truncation}\n" for r in noted),
+                    encoding='utf-8',
+                )
+            if results and len(failed) == len(results):
+                raise ValueError(f"All {len(results)} extraction calls failed; see {proposals_root / 'parse_errors.txt'}")
+
+            extracted = merge_extractor_outputs(r.extracted for r in results if r.extracted is not None)
+            extracted_dict = extracted.model_dump(exclude_none=True)
+            # approve reads raw_llm_output.txt; in map-reduce mode it holds the reduced JSON
+            # and the verbatim per-call outputs live under calls/.
+            out = json.dumps(extracted_dict, indent=2)
+            reused = sum(1 for r in results if r.reused)
+            truncated = sum(1 for r in results if r.truncation)
+            llm_calls = sum(r.calls for r in results if not r.reused)
+            user_full = f"(map-reduce: {llm_calls} calls, see calls/group_*.prompt.md)"
+        else:
+            user_full = _chunk_prompt(pipe, filename, chunks)
+            messages: List[LLMMessage] = [
+                LLMMessage(role='system', content=system_full),
+                LLMMessage(role='user', content=user_full),
+            ]
+            # Stream into raw_llm_output.txt so a long extraction shows progress and an
+            # interrupted one leaves its partial output for inspection. The parser
+            # follows along, so a response cut off at max_output_tokens still yields
+            # its complete items and only the missing tail is requested again.
+            raw_path = proposals_root / "raw_llm_output.txt"
+            with raw_path.open("w", encoding="utf-8") as raw_fh:
+                def _on_delta(delta: str) -> None:
+                    raw_fh.write(delta)
+                    raw_fh.flush()
+                    if on_progress is not None:
+                        on_progress("bytes", raw_fh.tell())
+
+                try:
+                    ex = _run_extraction(llm, cfg.llm.model, pipe, messages, on_delta=_on_delta)
+                except Exception as e:
+                    (proposals_root / 'parse_errors.txt').write_text(str(e), encoding='utf-8')
+                    raise
+            extracted, extracted_dict = ex.extracted, ex.extracted_dict
+            llm_calls, truncated = len(ex.outputs), int(ex.truncated)
+            out = ex.outputs[0]
+            if ex.truncated:
+                # approve reads raw_llm_output.txt, so it gets the merged JSON; the
+                # verbatim responses are kept next to it.
+                for i, text in enumerate(ex.outputs):
+                    name = "raw_llm_output.truncated.txt" if i == 0 else f"raw_llm_output.continuation_{i}.txt"
+                    (proposals_root / name).write_text(text, encoding="utf-8")
+                (proposals_root / 'parse_errors.txt').write_text(_truncation_note(ex) + "\n", encoding='utf-8')
+                out = json.dumps(extracted_dict, indent=2)
+
+    http_stats = connection_stats()
     (proposals_root / "00_META.md").write_text(
         f"# Ingest run {run_id}\n\n"
         f"- input: {in_path}\n"
         f"- created_utc: {datetime.now(timezone.utc).isoformat()}\n"
-        f"- chunks: {len(chunks)}\n",
+        f"- model: {cfg.llm.model}\n"
+        f"- seconds: {time.perf_counter() - t0:.3f}\n"
+        f"- chunks: {len(chunks)} ({chunker})\n"
+        f"- mode: {'incremental' if incremental else 'map_reduce' if map_reduce else 'single'}\n"
+        f"- llm_calls: {llm_calls}\n"
+        + (f"- reused_chunks: {reused}\n" if incremental else "")
+        + (f"- truncated_responses: {truncated} (salvaged, see parse_errors.txt)\n" if truncated else "")
+        + f"- tokens: prompt={llm.prompt_tokens}, completion={llm.completion_tokens}\n"
+        + f"- llm_cache: {llm.cache.mode} (hits={llm.hits}, misses={llm.misses})\n"
+        + (f"- http (process): {stats_line(http_stats)}\n" if http_stats else ""),
         encoding="utf-8",
     )
-    (proposals_root / "world.md").write_text(render_world_md(extracted.world), encoding="utf-8")
-    (proposals_root / "timeline.md").write_text(render_timeline_md(extracted.timeline), encoding="utf-8")
-
-    chars_dir = proposals_root / "characters"
-    chars_dir.mkdir(exist_ok=True)
-    for ch in extracted.characters:
-        (chars_dir / f"{safe_slug(ch.name)}.md").write_text(render_character_md(ch), encoding="utf-8")
 
     # --- Prompt pack audit artefacts + robust JSON parsing (patch v2) ---
     (proposals_root / "raw_llm_output.txt").write_text(out, encoding="utf-8")
@@ -133,63 +380,45 @@ def extract_to_proposals(*, project_dir: str, input_path: str, max_lines_per_chu
     )
 # --- end patch v2 ---
 
-    extracted = ExtractorOutput()
-    extracted_dict = {}
+    # --- write artefacts (patch v3-fixed) ---
+    (proposals_root / 'parsed.json').write_text(json.dumps(extracted_dict, indent=2), encoding='utf-8')
 
-    # --- parse, validate, and write artefacts (patch v3-fixed) ---
-    extracted_dict = {}
-    try:
-        start = out.find("{")
-        end = out.rfind("}")
-        if start == -1 or end == -1 or end <= start:
-            raise ValueError('No JSON object found in LLM output')
-        json_text = out[start:end+1]
-        extracted_dict = json.loads(json_text)
+    (proposals_root / "world.md").write_text(render_world_md(extracted.world), encoding="utf-8")
+    (proposals_root / "timeline.md").write_text(render_timeline_md(extracted.timeline), encoding="utf-8")
 
-        # normalise confidence fields to match ExtractorOutput pattern (high|med|low)
-        extracted_dict = _normalise_confidence(extracted_dict)
+    # Create human-friendly, browsable artefact folders
+    chars_dir = proposals_root / "characters"
+    ents_dir = proposals_root / "entities"
+    world_dir = proposals_root / "world"
+    tl_dir = proposals_root / "timeline"
+    for d in (chars_dir, ents_dir, world_dir, tl_dir):
+        d.mkdir(parents=True, exist_ok=True)
 
-        extracted = ExtractorOutput.model_validate(extracted_dict)
-    except Exception as e:
-        (proposals_root / 'parse_errors.txt').write_text(str(e) + '', encoding='utf-8')
-        (proposals_root / 'parsed.json').write_text(json.dumps(extracted_dict, indent=2), encoding='utf-8')
-        raise
-    else:
-        (proposals_root / 'parsed.json').write_text(json.dumps(extracted_dict, indent=2), encoding='utf-8')
-
-        # Create human-friendly, browsable artefact folders
-        chars_dir = proposals_root / "characters"
-        ents_dir = proposals_root / "entities"
-        world_dir = proposals_root / "world"
-        tl_dir = proposals_root / "timeline"
-        for d in (chars_dir, ents_dir, world_dir, tl_dir):
-            d.mkdir(parents=True, exist_ok=True)
-
-        def _safe_slug_local(s: str) -> str:
-            import re
-            s = (s or "").strip().lower()
-            s = re.sub(r"[^a-z0-9]+", "-", s).strip("-")
-            return s or "item"
-
-        for i, c in enumerate(extracted_dict.get("characters", []) or [], start=1):
-            name = safe_slug(c.get("name") or f"character-{i}")
-            (chars_dir / f"{i:03d}__{name}.json").write_text(json.dumps(c, indent=2), encoding="utf-8")
-
-        for i, e in enumerate(extracted_dict.get("entities", []) or [], start=1):
-            name = safe_slug(e.get("name") or f"entity-{i}")
-            (ents_dir / f"{i:03d}__{name}.json").write_text(json.dumps(e, indent=2), encoding="utf-8")
-
-        world_obj = extracted_dict.get("world") or {}
-        (world_dir / "world.json").write_text(json.dumps(world_obj, indent=2), encoding="utf-8")
-
-        events = extracted_dict.get("events")
-        if events is None:
-            events = (extracted_dict.get("timeline") or {}).get("events") or []
-        (tl_dir / "timeline.json").write_text(json.dumps({"events": events}, indent=2), encoding="utf-8")
-        for i, ev in enumerate(events or [], start=1):
-            summ = safe_slug(ev.get("summary") or ev.get("title") or f"event-{i}")
-            (tl_dir / f"{i:03d}__{summ}.json").write_text(json.dumps(ev, indent=2), encoding="utf-8")
-    # --- end patch v3-fixed ---
+    for ch in extracted.characters:
+        (chars_dir / f"{safe_slug(ch.name)}.md").write_text(render_character_md(ch), encoding="utf-8")
+
+    for i, c in enumerate(extracted_dict.get("characters", []) or [], start=1):
+        name = safe_slug(c.get("name") or f"character-{i}")
+        (chars_dir / f"{i:03d}__{name}.json").write_text(json.dumps(c, indent=2), encoding="utf-8")
 
+    for i, ent in enumerate(extracted_dict.get("entities", []) or [], start=1):
+        name = safe_slug(ent.get("name") or f"entity-{i}")
+        (ents_dir / f"{i:03d}__{name}.json").write_text(json.dumps(ent, indent=2), encoding="utf-8")
 
+    world_obj = extracted_dict.get("world") or {}
+    (world_dir / "world.json").write_text(json.dumps(world_obj, indent=2), encoding="utf-8")
+
+    events = extracted_dict.get("events")
+    if events is None:
+        events = (extracted_dict.get("timeline") or {}).get("events") or []
+    (tl_dir / "timeline.json").write_text(json.dumps({"events": events}, indent=2), encoding="utf-8")
+    for i, ev in enumerate(events or [], start=1):
+        summ = safe_slug(ev.get("summary") or ev.get("title") or f"event-{i}")
+        (tl_dir / f"{i:03d}__{summ}.json").write_text(json.dumps(ev, indent=2), encoding="utf-8")
+    # --- end patch v3-fixed ---
+
+    try:
+        RunsIndex.for_workspace(ws).record_ingest(proposals_root)
+    except sqlite3.Error:
+        pass  # derived data; `storyos runs` refreshes from 00_META.md
     return IngestResult(run_id=run_id, proposals_dir=str(proposals_root))
@@ -0,0 +1,249 @@
+from __future__ import annotations
+import json
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+
+from storyos.ingest.schemas import (
+    ExtractorOutput,
+    ProposedCharacter,
+    ProposedFact,
+    ProposedQuestion,
+    ProposedTimelineEvent,
+)
+
+CONF_MAP = {"high": "high", "med": "med", "medium": "med", "low": "low"}
+
+# Arrays whose elements are reported (and validated) as soon as they close, by path
+# from the root object; "[]" stands for "any element of the enclosing array".
+ITEM_MODELS: Dict[Tuple[str, ...], Type[BaseModel]] = {
+    ("characters",): ProposedCharacter,
+    ("characters", "[]", "facts"): ProposedFact,
+    ("characters", "[]", "open_questions"): ProposedQuestion,
+    ("world", "facts"): ProposedFact,
+    ("world", "open_questions"): ProposedQuestion,
+    ("timeline", "events"): ProposedTimelineEvent,
+}
+# Items that are only kept whole: a truncated fact/question/event is dropped, whereas
+# a truncated character keeps its name and its complete facts.
+LEAF_PATHS = frozenset(p for p in ITEM_MODELS if p != ("characters",))
+
+
+def normalise_confidence(obj: Any) -> Any:
+    """Walk nested dict/list and normalise confidence fields to high|med|low."""
+    if isinstance(obj, dict):
+        return {
+            k: CONF_MAP.get(v.strip().lower(), v) if k == "confidence" and isinstance(v, str) else normalise_confidence(v)
+            for k, v in obj.items()
+        }
+    if isinstance(obj, list):
+        return [normalise_confidence(x) for x in obj]
+    return obj
+
+
+def _valid_items(items: Any, model: Type[BaseModel]) -> List[Any]:
+    out = []
+    for item in items if isinstance(items, list) else []:
+        try:
+            out.append(model.model_validate(item))
+        except ValidationError:
+            pass
+    return out
+
+
+def salvage_extractor_output(data: Dict[str, Any]) -> ExtractorOutput:
+    """Validate data as an ExtractorOutput, dropping individual items that do not validate."""
+    try:
+        return ExtractorOutput.model_validate(data)
+    except ValidationError:
+        pass
+    out = ExtractorOutput()
+    for ch in data.get("characters") or []:
+        if isinstance(ch, dict) and isinstance(ch.get("name"), str) and ch["name"].strip():
+            out.characters.append(ProposedCharacter(
+                name=ch["name"],
+                facts=_valid_items(ch.get("facts"), ProposedFact),
+                open_questions=_valid_items(ch.get("open_questions"), ProposedQuestion),
+            ))
+    world = data.get("world")
+    if not isinstance(world, dict):
+        world = {}
+    out.world.facts = _valid_items(world.get("facts"), ProposedFact)
+    out.world.open_questions = _valid_items(world.get("open_questions"), ProposedQuestion)
+    timeline = data.get("timeline")
+    if not isinstance(timeline, dict):
+        timeline = {}
+    out.timeline.events = _valid_items(timeline.get("events"), ProposedTimelineEvent)
+    return out
+
+
+@dataclass
+class _Frame:
+    kind: str  # "{" or "["
+    start: int
+    path: Tuple[str, ...]
+    leaf: bool  # inside a fact/question/event: no safe cut points
+    key: Optional[str] = None
+    expect_key: bool = True
+
+
+@dataclass
+class ExtractorStreamParser:
+    """Incremental parser for extractor JSON arriving as text deltas.
+
+    feed() scans each delta once and tracks where the JSON structure stands. When a
+    character, fact, question or event closes, it is validated and passed to
+    ``on_item(path, model)``. The parser also remembers the last point where the
+    document could be cut and closed while keeping only complete items. If the
+    response is truncated, result() returns everything up to that point instead
+    of failing. Text before the first "{" and after the root object closes
+    (prose, code fences) is ignored. Deltas are kept as a list; only the spans
+    that get parsed are joined, so a long stream is not copied on every delta.
+    """
+
+    on_item: Optional[Callable[[Tuple[str, ...], BaseModel], None]] = None
+    items: int = 0
+    _deltas: List[str] = field(default_factory=list)
+    _offsets: List[int] = field(default_factory=list)  # start offset of each delta
+    _len: int = 0
+    _pos: int = 0
+    _stack: List[_Frame] = field(default_factory=list)
+    _root_start: Optional[int] = None
+    _root_end: Optional[int] = None
+    _safe: Optional[Tuple[int, str]] = None  # (cut offset, closing brackets)
+    _in_string: bool = False
+    _escape: bool = False
+    _string_is_key: bool = False
+    _str_start: int = 0
+    _scalar_start: Optional[int] = None
+
+    @property
+    def complete(self) -> bool:
+        return self._root_end is not None
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far."""
+        if len(self._deltas) > 1:
+            self._deltas, self._offsets = ["".join(self._deltas)], [0]
+        return self._deltas[0] if self._deltas else ""
+
+    def _slice(self, start: int, end: int) -> str:
+        first = bisect_right(self._offsets, start) - 1
+        last = bisect_right(self._offsets, end - 1) - 1
+        joined = "".join(self._deltas[first:last + 1])
+        base = self._offsets[first]
+        return joined[start - base:end - base]
+
+    def feed(self, delta: str) -> None:
+        if not delta:
+            return
+        base = self._len
+        self._deltas.append(delta)
+        self._offsets.append(base)
+        self._len += len(delta)
+        i, n = self._pos, self._len
+        while i < n and self._root_end is None:
+            c = delta[i - base]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._string_is_key:
+                        try:
+                            self._stack[-1].key = json.loads(self._slice(self._str_start, i + 1))
+                        except ValueError:
+                            self._stack[-1].key = None
+                    else:
+                        self._value_done(self._str_start, i + 1)
+                i += 1
+                continue
+            if self._scalar_start is not None:
+                if c not in ",]}" and not c.isspace():
+                    i += 1
+                    continue
+                self._value_done(self._scalar_start, i)
+                self._scalar_start = None
+            if not self._stack:
+                if c == "{":
+                    self._root_start = i
+                    self._push("{", i)
+                i += 1
+                continue
+            top = self._stack[-1]
+            if c == '"':
+                self._in_string, self._str_start = True, i
+                self._string_is_key = top.kind == "{" and top.expect_key
+            elif c in "{[":
+                self._push(c, i)
+            elif c in "}]":
+                self._pop(i)
+            elif c == ",":
+                top.expect_key = top.kind == "{"
+            elif c == ":":
+                top.expect_key = False
+            elif not c.isspace():
+                self._scalar_start = i
+            i += 1
+        self._pos = i
+
+    def _closers(self) -> str:
+        return "".join("}" if f.kind == "{" else "]" for f in reversed(self._stack))
+
+    def _push(self, kind: str, i: int) -> None:
+        parent = self._stack[-1] if self._stack else None
+        if parent is None:
+            path: Tuple[str, ...] = ()
+            leaf = False
+        else:
+            path = parent.path + ((parent.key or "",) if parent.kind == "{" else ("[]",))
+            leaf = parent.leaf or (parent.kind == "[" and parent.path in LEAF_PATHS)
+        self._stack.append(_Frame(kind=kind, start=i, path=path, leaf=leaf))
+        if not leaf:
+            self._safe = (i + 1, self._closers())
+
+    def _pop(self, i: int) -> None:
+        frame = self._stack.pop()
+        if not self._stack:
+            self._root_end = i + 1
+        else:
+            self._value_done(frame.start, i + 1)
+
+    def _value_done(self, start: int, end: int) -> None:
+        parent = self._stack[-1]
+        if parent.leaf:
+            return
+        if parent.kind == "[" and parent.path in ITEM_MODELS:
+            try:
+                item = ITEM_MODELS[parent.path].model_validate(normalise_confidence(json.loads(self._slice(start, end))))
+            except (ValueError, ValidationError):
+                item = None
+            if item is not None:
+                self.items += 1
+                if self.on_item is not None:
+                    self.on_item(parent.path, item)
+        self._safe = (end, self._closers())
+
+    def result(self) -> Tuple[Dict[str, Any], bool]:
+        """(extractor dict, complete). A truncated document is cut at the last safe point and closed."""
+        if self._root_start is None:
+            raise ValueError("No JSON object found in LLM output")
+        if self._root_end is not None:
+            data = json.loads(self._slice(self._root_start, self._root_end))
+            if not isinstance(data, dict):
+                raise ValueError("Extractor JSON root must be an object")
+            return normalise_confidence(data), True
+        end, closers = self._safe or (self._root_start + 1, "}")
+        return normalise_confidence(json.loads(self._slice(self._root_start, end) + closers)), False
+
+
+def parse_extractor_text(text: str) -> Tuple[Dict[str, Any], bool]:
+    """Parse a whole (possibly truncated) extractor response; see ExtractorStreamParser.result()."""
+    parser = ExtractorStreamParser()
+    parser.feed(text)
+    return parser.result()
@@ -0,0 +1,117 @@
+from __future__ import annotations
+from typing import Dict, Iterable, List, Tuple
+
+from storyos.ingest.schemas import (
+    Evidence,
+    ExtractorOutput,
+    ProposedCharacter,
+    ProposedFact,
+    ProposedItem,
+    ProposedQuestion,
+    ProposedTimelineEvent,
+)
+
+# Higher wins when the same claim is extracted from several chunks.
+_CONF_RANK = {"low": 0, "med": 1, "high": 2}
+
+
+def _key(text: str) -> str:
+    """Case/whitespace-insensitive identity for names, claims and events."""
+    return " ".join((text or "").lower().split()).rstrip(".")
+
+
+def _union_evidence(into: List[Evidence], more: Iterable[Evidence]) -> None:
+    seen = {(e.source, e.note) for e in into}
+    for e in more:
+        if (e.source, e.note) not in seen:
+            seen.add((e.source, e.note))
+            into.append(e.model_copy())
+
+
+def _merge_origin(cur: ProposedItem, item: ProposedItem) -> None:
+    # A claim extracted from any changed chunk counts as new.
+    if item.origin == "new":
+        cur.origin = "new"
+
+
+def _merge_facts(into: List[ProposedFact], index: Dict[str, ProposedFact], facts: Iterable[ProposedFact]) -> None:
+    for f in facts:
+        k = _key(f.claim)
+        if not k:
+            continue
+        cur = index.get(k)
+        if cur is None:
+            cur = f.model_copy(deep=True)
+            index[k] = cur
+            into.append(cur)
+            continue
+        if _CONF_RANK.get(f.confidence, 0) > _CONF_RANK.get(cur.confidence, 0):
+            cur.confidence = f.confidence
+        _merge_origin(cur, f)
+        _union_evidence(cur.evidence, f.evidence)
+
+
+def _merge_questions(
+    into: List[ProposedQuestion], index: Dict[str, ProposedQuestion], questions: Iterable[ProposedQuestion]
+) -> None:
+    for q in questions:
+        k = _key(q.question)
+        if not k:
+            continue
+        cur = index.get(k)
+        if cur is None:
+            cur = q.model_copy(deep=True)
+            index[k] = cur
+            into.append(cur)
+        else:
+            _merge_origin(cur, q)
+            _union_evidence(cur.evidence, q.evidence)
+
+
+def merge_extractor_outputs(outputs: Iterable[ExtractorOutput]) -> ExtractorOutput:
+    """Reduce per-chunk extractions into one ExtractorOutput.
+
+    Characters are merged by name, facts/questions/events are unioned (deduped on
+    normalised text) and their evidence lists are unioned. Order follows the first
+    occurrence, so merging chunk results in chunk order keeps the output stable.
+    """
+    merged = ExtractorOutput()
+
+    chars: Dict[str, ProposedCharacter] = {}
+    char_facts: Dict[str, Dict[str, ProposedFact]] = {}
+    char_questions: Dict[str, Dict[str, ProposedQuestion]] = {}
+    world_facts: Dict[str, ProposedFact] = {}
+    world_questions: Dict[str, ProposedQuestion] = {}
+    events: Dict[Tuple[str, str], ProposedTimelineEvent] = {}
+
+    for out in outputs:
+        for ch in out.characters:
+            k = _key(ch.name)
+            if not k:
+                continue
+            if k not in chars:
+                chars[k] = ProposedCharacter(name=ch.name.strip())
+                char_facts[k], char_questions[k] = {}, {}
+                merged.characters.append(chars[k])
+            _merge_facts(chars[k].facts, char_facts[k], ch.facts)
+            _merge_questions(chars[k].open_questions, char_questions[k], ch.open_questions)
+
+        _merge_facts(merged.world.facts, world_facts, out.world.facts)
+        _merge_questions(merged.world.open_questions, world_questions, out.world.open_questions)
+
+        for ev in out.timeline.events:
+            k2 = (_key(ev.when), _key(ev.what))
+            if not k2[1]:
+                continue
+            cur = events.get(k2)
+            if cur is None:
+                cur = ev.model_copy(deep=True)
+                events[k2] = cur
+                merged.timeline.events.append(cur)
+                continue
+            if _CONF_RANK.get(ev.confidence, 0) > _CONF_RANK.get(cur.confidence, 0):
+                cur.confidence = ev.confidence
+            _merge_origin(cur, ev)
+            _union_evidence(cur.evidence, ev.evidence)
+
+    return merged
@@ -0,0 +1,146 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import random
+from pathlib import Path
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from storyos.retrieval.canon_index import tokenize
+
+INDEX_DIR = ".storyos/index/near_dup"
+
+# 96 permutations in 32 bands of 3 rows: a pair with Jaccard similarity s shares at
+# least one band with probability 1 - (1 - s^3)^32, i.e. ~0.23 at s=0.2, ~0.88 at
+# s=0.4 and ~0.99 at s=0.5. Candidates are then checked with exact Jaccard.
+NUM_PERM = 96
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(0x5EED)
+_PERMS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+
+NEGATIONS = frozenset("not no never nor none nobody nothing neither nowhere cannot without".split())
+
+
+def _stem(word: str) -> str:
+    # Just enough folding for "loves"/"loved"/"loving" and plurals to meet.
+    for suffix in ("ing", "ed", "es", "s"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[: -len(suffix)]
+    return word
+
+
+def claim_shingles(text: str) -> FrozenSet[str]:
+    """Stemmed content words of a claim (stopwords and punctuation dropped)."""
+    return frozenset(_stem(t) for t in tokenize(text))
+
+
+def is_negated(text: str) -> bool:
+    """True when a claim has an odd number of negations ("not", "never", "isn't", ...)."""
+    return sum(1 for t in tokenize(text) if t in NEGATIONS or t.endswith("n't")) % 2 == 1
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def minhash(shingles: FrozenSet[str]) -> List[int]:
+    hashes = [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little") for s in shingles]
+    if not hashes:
+        return [_PRIME] * NUM_PERM
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMS]
+
+
+class NearDupIndex:
+    """MinHash/LSH index over the claims of one canon file.
+
+    query() only compares a claim with the claims sharing at least one LSH band,
+    so lookups stay fast with tens of thousands of claims. One negation barely
+    moves Jaccard similarity, so claims of opposite polarity ("Pooh is fond of
+    honey" / "Pooh is not fond of honey") are never near-duplicates. The index is saved
+    next to the other project indexes and rebuilt when the canon file's
+    size/mtime no longer match, e.g. after a manual edit.
+    """
+
+    def __init__(self) -> None:
+        self.claims: List[str] = []
+        self.sigs: List[List[int]] = []
+        self._shingles: List[FrozenSet[str]] = []
+        self._negated: List[bool] = []
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = {}
+
+    def add(self, claim: str, sig: Optional[List[int]] = None) -> None:
+        shingles = claim_shingles(claim)
+        sig = sig if sig is not None else minhash(shingles)
+        i = len(self.claims)
+        self.claims.append(claim)
+        self.sigs.append(sig)
+        self._shingles.append(shingles)
+        self._negated.append(is_negated(claim))
+        for band in range(BANDS):
+            self._buckets.setdefault((band, tuple(sig[band * ROWS:(band + 1) * ROWS])), []).append(i)
+
+    def query(self, claim: str, threshold: float) -> Optional[Tuple[str, float]]:
+        """Most similar indexed claim with Jaccard >= threshold, or None."""
+        shingles = claim_shingles(claim)
+        if not shingles:
+            return None
+        sig = minhash(shingles)
+        negated = is_negated(claim)
+        seen: set[int] = set()
+        best: Optional[Tuple[str, float]] = None
+        for band in range(BANDS):
+            for i in self._buckets.get((band, tuple(sig[band * ROWS:(band + 1) * ROWS])), ()):
+                if i in seen:
+                    continue
+                seen.add(i)
+                if self._negated[i] != negated:
+                    continue
+                score = jaccard(shingles, self._shingles[i])
+                if score >= threshold and (best is None or score > best[1]):
+                    best = (self.claims[i], score)
+        return best
+
+    @staticmethod
+    def index_path(project_dir: Path, md_path: Path) -> Path:
+        rel = md_path.resolve().relative_to(project_dir.resolve()).as_posix()
+        return project_dir / INDEX_DIR / (rel.replace("/", "__") + ".json")
+
+    @classmethod
+    def load(cls, index_path: Path, md_path: Path, read_claims: Callable[[], Iterable[str]]) -> "NearDupIndex":
+        """Load the saved index if it matches md_path's current stat, else build it from read_claims()."""
+        idx = cls()
+        stat = _stat(md_path)
+        try:
+            data = json.loads(index_path.read_text(encoding="utf-8"))
+            if data.get("num_perm") == NUM_PERM and data.get("source") == stat:
+                for claim, sig in zip(data["claims"], data["sigs"]):
+                    idx.add(claim, sig)
+                return idx
+        except (OSError, ValueError, KeyError):
+            pass
+        for claim in read_claims():
+            idx.add(claim)
+        return idx
+
+    def save(self, index_path: Path, md_path: Path) -> None:
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = index_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(
+            json.dumps({"num_perm": NUM_PERM, "source": _stat(md_path), "claims": self.claims, "sigs": self.sigs}),
+            encoding="utf-8",
+        )
+        os.replace(tmp, index_path)
+
+
+def _stat(path: Path) -> Optional[List[int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
@@ -1,4 +1,5 @@
 from __future__ import annotations
+from typing import Union
 from pydantic import BaseModel, Field
 
 class Evidence(BaseModel):
@@ -9,10 +10,12 @@ class ProposedFact(BaseModel):
     claim: str
     confidence: str = Field(default="med", pattern="^(high|med|low)$")
     evidence: list[Evidence] = Field(default_factory=list)
+    origin: str | None = Field(default=None, pattern="^(new|reused)$")  # incremental ingest only
 
 class ProposedQuestion(BaseModel):
     question: str
     evidence: list[Evidence] = Field(default_factory=list)
+    origin: str | None = Field(default=None, pattern="^(new|reused)$")
 
 class ProposedCharacter(BaseModel):
     name: str
@@ -28,6 +31,10 @@ class ProposedTimelineEvent(BaseModel):
     what: str
     confidence: str = Field(default="med", pattern="^(high|med|low)$")
     evidence: list[Evidence] = Field(default_factory=list)
+    origin: str | None = Field(default=None, pattern="^(new|reused)$")
+
+# Extracted items that carry an incremental-ingest origin.
+ProposedItem = Union[ProposedFact, ProposedQuestion, ProposedTimelineEvent]
 
 class ProposedTimeline(BaseModel):
     events: list[ProposedTimelineEvent] = Field(default_factory=list)
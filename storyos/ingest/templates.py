@@ -1,6 +1,9 @@
 from __future__ import annotations
 from storyos.ingest.schemas import ProposedCharacter, ProposedWorld, ProposedTimeline
 
+def _origin(item) -> str:
+    return f" [{item.origin}]" if getattr(item, "origin", None) else ""
+
 def _ev(evs):
     if not evs: return ""
     lines=[]
@@ -13,13 +16,13 @@ def render_character_md(ch: ProposedCharacter) -> str:
     lines=[f"# Proposed Character: {ch.name}","", "## Facts (proposed)"]
     if not ch.facts: lines.append("- (none)")
     for f in ch.facts:
-        lines.append(f"- {f.claim}  (confidence: {f.confidence})")
+        lines.append(f"- {f.claim}  (confidence: {f.confidence}){_origin(f)}")
         ev=_ev(f.evidence)
         if ev: lines.append(ev)
     lines += ["", "## Open questions"]
     if not ch.open_questions: lines.append("- (none)")
     for q in ch.open_questions:
-        lines.append(f"- {q.question}")
+        lines.append(f"- {q.question}{_origin(q)}")
         ev=_ev(q.evidence)
         if ev: lines.append(ev)
     lines.append("")
@@ -29,13 +32,13 @@ def render_world_md(world: ProposedWorld) -> str:
     lines=["# Proposed World Facts","", "## Facts (proposed)"]
     if not world.facts: lines.append("- (none)")
     for f in world.facts:
-        lines.append(f"- {f.claim}  (confidence: {f.confidence})")
+        lines.append(f"- {f.claim}  (confidence: {f.confidence}){_origin(f)}")
         ev=_ev(f.evidence)
         if ev: lines.append(ev)
     lines += ["", "## Open questions"]
     if not world.open_questions: lines.append("- (none)")
     for q in world.open_questions:
-        lines.append(f"- {q.question}")
+        lines.append(f"- {q.question}{_origin(q)}")
         ev=_ev(q.evidence)
         if ev: lines.append(ev)
     lines.append("")
@@ -45,7 +48,7 @@ def render_timeline_md(tl: ProposedTimeline) -> str:
     lines=["# Proposed Timeline",""]
     if not tl.events: lines.append("- (none)")
     for e in tl.events:
-        lines.append(f"- **{e.when}** — {e.what}  (confidence: {e.confidence})")
+        lines.append(f"- **{e.when}** — {e.what}  (confidence: {e.confidence}){_origin(e)}")
         ev=_ev(e.evidence)
         if ev: lines.append(ev)
     lines.append("")
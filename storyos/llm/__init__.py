@@ -1,12 +1,38 @@
-from storyos.llm.base import LLMAdapter, LLMMessage, LLMResult
+from storyos.llm.base import (
+    AsyncLLMAdapter,
+    LLMAdapter,
+    LLMMessage,
+    LLMResult,
+    StreamingLLMAdapter,
+    agenerate,
+    generate_stream,
+)
 from storyos.llm.openai_adapter_stub import OpenAIAdapterStub
-from storyos.llm.openai_adapter import OpenAIAdapter, OpenAIAdapterConfig
+from storyos.llm.openai_adapter import AsyncOpenAIAdapter, OpenAIAdapter, OpenAIAdapterConfig
+from storyos.llm.cache import CachingLLMAdapter, LLMCache
+from storyos.llm.fake import FakeAdapter, FakeBackend
+from storyos.llm.ratelimit import RateLimiter, RateLimits
+from storyos.llm.registry import AdapterRegistry, connection_stats, get_adapter
 
 __all__ = [
+    "AsyncLLMAdapter",
     "LLMAdapter",
     "LLMMessage",
     "LLMResult",
+    "StreamingLLMAdapter",
     "OpenAIAdapterStub",
+    "FakeAdapter",
+    "FakeBackend",
     "OpenAIAdapter",
+    "AsyncOpenAIAdapter",
     "OpenAIAdapterConfig",
+    "CachingLLMAdapter",
+    "LLMCache",
+    "RateLimiter",
+    "RateLimits",
+    "AdapterRegistry",
+    "connection_stats",
+    "get_adapter",
+    "agenerate",
+    "generate_stream",
 ]
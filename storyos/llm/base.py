@@ -1,6 +1,7 @@
 from __future__ import annotations
+import asyncio
 from dataclasses import dataclass
-from typing import Protocol, List, Dict, Any
+from typing import Protocol, List, Dict, Any, AsyncIterator, Callable, Iterator, Optional
 
 @dataclass
 class LLMMessage:
@@ -29,3 +30,96 @@ class LLMAdapter(Protocol):
         max_output_tokens: int = 2000,
     ) -> "LLMResult":
         ...
+
+class AsyncLLMAdapter(Protocol):
+    async def agenerate(
+        self,
+        messages: List["LLMMessage"],
+        *,
+        model: str,
+        temperature: float = 0.2,
+        max_output_tokens: int = 2000,
+    ) -> "LLMResult":
+        ...
+
+class StreamingLLMAdapter(Protocol):
+    def generate_stream(
+        self,
+        messages: List["LLMMessage"],
+        *,
+        model: str,
+        temperature: float = 0.2,
+        max_output_tokens: int = 2000,
+    ) -> Iterator[str]:
+        """Yield text deltas as the model produces them."""
+        ...
+
+
+def generate_stream(
+    llm: Any,
+    messages: List[LLMMessage],
+    *,
+    model: str,
+    temperature: float = 0.2,
+    max_output_tokens: int = 2000,
+) -> Iterator[str]:
+    """Stream from ``llm.generate_stream`` when available, else yield the whole ``generate`` text once."""
+    native = getattr(llm, "generate_stream", None)
+    if native is not None:
+        yield from native(messages, model=model, temperature=temperature, max_output_tokens=max_output_tokens)
+        return
+    yield llm.generate(messages, model=model, temperature=temperature, max_output_tokens=max_output_tokens).text
+
+
+async def agenerate_stream(
+    llm: Any,
+    messages: List[LLMMessage],
+    *,
+    model: str,
+    temperature: float = 0.2,
+    max_output_tokens: int = 2000,
+) -> AsyncIterator[str]:
+    """Async twin of generate_stream(): ``llm.agenerate_stream`` when available, else the whole reply once."""
+    native = getattr(llm, "agenerate_stream", None)
+    if native is not None:
+        async for delta in native(messages, model=model, temperature=temperature, max_output_tokens=max_output_tokens):
+            yield delta
+        return
+    result = await agenerate(llm, messages, model=model, temperature=temperature, max_output_tokens=max_output_tokens)
+    yield result.text
+
+
+def adapter_namespace(llm: Any) -> str:
+    """Identity of the adapter behind llm, so one adapter's results are never served for another's.
+
+    Adapters may set ``cache_namespace`` (e.g. to share entries between their sync
+    and async variants); otherwise the adapter's class path is used.
+    """
+    return getattr(llm, "cache_namespace", "") or f"{type(llm).__module__}.{type(llm).__qualname__}"
+
+
+def collect_stream(deltas: Iterator[str], on_delta: Optional[Callable[[str], None]] = None) -> str:
+    """Drain a delta stream into the full text, calling on_delta for each piece."""
+    parts: List[str] = []
+    for d in deltas:
+        parts.append(d)
+        if on_delta is not None:
+            on_delta(d)
+    return "".join(parts)
+
+
+async def agenerate(
+    llm: Any,
+    messages: List[LLMMessage],
+    *,
+    model: str,
+    temperature: float = 0.2,
+    max_output_tokens: int = 2000,
+) -> LLMResult:
+    """Await ``llm.agenerate`` when the adapter has one, else run ``generate`` in a worker thread."""
+    native = getattr(llm, "agenerate", None)
+    if native is not None:
+        return await native(messages, model=model, temperature=temperature, max_output_tokens=max_output_tokens)
+    return await asyncio.to_thread(
+        llm.generate, messages, model=model, temperature=temperature, max_output_tokens=max_output_tokens
+    )
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from storyos.config import ProjectConfig
+from storyos.llm.tokens import context_window, count_tokens, count_tokens_uncached
+
+TRIM_MARKER = "\n[… trimmed to fit the context budget …]"
+
+
+@dataclass(frozen=True)
+class PromptSection:
+    name: str
+    text: str
+    priority: int               # higher survives longer; lowest priority is trimmed first
+    max_tokens: Optional[int] = None  # per-section cap applied before the overall budget
+
+
+@dataclass
+class PackedPrompt:
+    texts: Dict[str, str]
+    tokens: Dict[str, int]
+    fixed_tokens: int
+    budget: int
+    trimmed: List[str] = field(default_factory=list)
+
+    @property
+    def total_tokens(self) -> int:
+        return self.fixed_tokens + sum(self.tokens.values())
+
+
+def trim_to_tokens(text: str, max_tokens: int, model: str = "") -> str:
+    """Longest prefix of text (plus a marker) within max_tokens."""
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    limit = max_tokens - count_tokens(TRIM_MARKER, model)
+    if limit <= 0:
+        return ""
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if count_tokens_uncached(text[:mid], model) <= limit:
+            lo = mid
+        else:
+            hi = mid - 1
+    # Prefer to cut at a line break so passages/bullets stay whole.
+    cut = text.rfind("\n", 0, lo)
+    head = text[: cut if cut > lo // 2 else lo].rstrip()
+    return head + TRIM_MARKER if head else ""
+
+
+class ContextPacker:
+    """Fit prioritised prompt sections into a model's context window.
+
+    The budget is the context window minus the tokens reserved for the completion
+    and the fixed (non-section) prompt text. Sections over budget are trimmed
+    lowest priority first.
+    """
+
+    def __init__(self, model: str, window: int, reserve_output_tokens: int):
+        self.model = model
+        self.window = window
+        self.reserve_output_tokens = reserve_output_tokens
+
+    @classmethod
+    def for_config(cls, cfg: ProjectConfig) -> "ContextPacker":
+        return cls(
+            cfg.llm.model,
+            context_window(cfg.llm.model, cfg.llm.context_window),
+            cfg.llm.reserve_output_tokens,
+        )
+
+    def pack(self, sections: List[PromptSection], fixed: str = "") -> PackedPrompt:
+        fixed_tokens = count_tokens(fixed, self.model)
+        budget = max(0, self.window - self.reserve_output_tokens - fixed_tokens)
+        texts: Dict[str, str] = {}
+        tokens: Dict[str, int] = {}
+        trimmed: List[str] = []
+        for s in sections:
+            text = s.text
+            if s.max_tokens is not None and count_tokens(text, self.model) > s.max_tokens:
+                text = trim_to_tokens(text, s.max_tokens, self.model)
+                trimmed.append(s.name)
+            texts[s.name] = text
+            tokens[s.name] = count_tokens(text, self.model)
+
+        over = sum(tokens.values()) - budget
+        for s in sorted(sections, key=lambda s: s.priority):
+            if over <= 0:
+                break
+            keep = max(0, tokens[s.name] - over)
+            texts[s.name] = trim_to_tokens(texts[s.name], keep, self.model)
+            over -= tokens[s.name] - count_tokens(texts[s.name], self.model)
+            tokens[s.name] = count_tokens(texts[s.name], self.model)
+            if s.name not in trimmed:
+                trimmed.append(s.name)
+        return PackedPrompt(texts=texts, tokens=tokens, fixed_tokens=fixed_tokens, budget=budget, trimmed=trimmed)
+
+
+def pack_prompt(cfg: ProjectConfig, ctx: Dict[str, Any], agent: str, sections: List[PromptSection], fixed: str = "") -> Dict[str, str]:
+    """Pack sections for one agent call and log its estimated prompt tokens to the RunLog."""
+    packed = ContextPacker.for_config(cfg).pack(sections, fixed=fixed)
+    runlog = ctx.get("runlog")
+    if runlog is not None:
+        runlog.prompt_tokens[agent] = packed.total_tokens
+        if packed.trimmed:
+            runlog.prompt_trimmed[agent] = list(packed.trimmed)
+    return packed.texts
@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from storyos.core.hashing import sha256_json
+from storyos.core.runlog import RunLog
+from storyos.core.workspace import Workspace
+from storyos.llm.base import (
+    LLMAdapter, LLMMessage, LLMResult, adapter_namespace, agenerate, agenerate_stream, generate_stream,
+)
+from storyos.llm.tokens import count_tokens
+
+CACHE_MODES = ("read_write", "read_only", "bypass")
+
+
+class LLMCache:
+    """Content-addressed on-disk store of LLM results with a size cap and LRU eviction.
+
+    Entries live at <root>/<key[:2]>/<key>.json. Recency is the file mtime, which is
+    bumped on every hit, so LRU order survives across processes.
+    """
+
+    def __init__(self, root: Path, *, max_bytes: int, mode: str = "read_write"):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown LLM cache mode: {mode!r} (expected one of {', '.join(CACHE_MODES)})")
+        self.root = root
+        self.max_bytes = max_bytes
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # key -> size, oldest first
+        self._total = 0
+        if mode != "bypass":
+            self._scan()
+
+    @classmethod
+    def for_workspace(cls, ws: Workspace) -> "LLMCache":
+        c = ws.config.cache.llm
+        return cls(ws.safe_path(c.dir), max_bytes=c.max_mb * 1024 * 1024, mode=c.mode)
+
+    @property
+    def readable(self) -> bool:
+        return self.mode in ("read_write", "read_only")
+
+    @property
+    def writable(self) -> bool:
+        return self.mode == "read_write"
+
+    @staticmethod
+    def key(messages: List[LLMMessage], *, model: str, temperature: float, max_output_tokens: int, namespace: str) -> str:
+        """Cache key of a request; namespace is the adapter identity (see adapter_namespace)."""
+        return sha256_json({
+            "namespace": namespace,
+            "messages": [asdict(m) for m in messages],
+            "model": model,
+            "temperature": temperature,
+            "max_output_tokens": max_output_tokens,
+        })
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def _scan(self) -> None:
+        if not self.root.exists():
+            return
+        found = []
+        for p in self.root.glob("*/*.json"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            found.append((st.st_mtime_ns, p.stem, st.st_size))
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._total += size
+
+    def get(self, key: str) -> Optional[LLMResult]:
+        if not self.readable:
+            return None
+        path = self._path(key)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return LLMResult(text=data.get("text", ""), raw=data.get("raw") or {})
+
+    def put(self, key: str, result: LLMResult) -> None:
+        if not self.writable:
+            return
+        payload = json.dumps({"text": result.text, "raw": result.raw}, ensure_ascii=False, default=str).encode("utf-8")
+        if len(payload) > self.max_bytes:
+            return
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(payload)
+        os.replace(tmp, path)
+        with self._lock:
+            self._total += len(payload) - self._entries.pop(key, 0)
+            self._entries[key] = len(payload)
+            self._evict()
+
+    def _evict(self) -> None:
+        while self._total > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._total -= size
+            try:
+                self._path(key).unlink()
+            except OSError:
+                pass
+
+
+def _usage_tokens(raw: Any) -> Tuple[Optional[int], Optional[int]]:
+    """(prompt, completion) tokens from a Responses or Chat Completions usage block, if raw has one."""
+    usage = raw.get("usage") if isinstance(raw, dict) else None
+    if not isinstance(usage, dict):
+        return None, None
+    prompt = usage.get("input_tokens", usage.get("prompt_tokens"))
+    completion = usage.get("output_tokens", usage.get("completion_tokens"))
+    return (prompt if isinstance(prompt, int) else None), (completion if isinstance(completion, int) else None)
+
+
+class CachingLLMAdapter(LLMAdapter):
+    """Wrap any adapter/client with an LLMCache; hit/miss counts and a span per call go to the RunLog if given."""
+
+    def __init__(self, inner: LLMAdapter, cache: LLMCache, runlog: RunLog | None = None):
+        self.inner = inner
+        self.cache = cache
+        # Exposed under the adapter attribute name so checkpoints see the inner adapter's identity.
+        self.cache_namespace = adapter_namespace(inner)
+        self.runlog = runlog
+        self.hits = 0
+        self.misses = 0
+        self.prompt_tokens = 0  # totals over every call, hits included, as in the run log
+        self.completion_tokens = 0
+
+    def _count(self, what: str) -> None:
+        with self.cache._lock:
+            if what == "hits":
+                self.hits += 1
+            else:
+                self.misses += 1
+            if self.runlog is not None:
+                self.runlog.llm_cache[what] = self.runlog.llm_cache.get(what, 0) + 1
+
+    @contextmanager
+    def _span(self, model: str, stream: bool) -> Iterator[Dict[str, Any]]:
+        if self.runlog is None:
+            yield {}
+            return
+        with self.runlog.span(f"llm {model}", "llm", model=model, stream=stream) as span:
+            yield span.attrs
+
+    def _tokens(self, attrs: Dict[str, Any], messages: List[LLMMessage], model: str, raw: Any, text: str) -> None:
+        """Token counts from the response usage, else estimated (streams and stubs carry no usage)."""
+        prompt, completion = _usage_tokens(raw)
+        attrs["tokens_from"] = "usage" if prompt is not None else "estimate"
+        if prompt is None:
+            prompt = sum(count_tokens(m.content, model) for m in messages)
+        if completion is None:
+            completion = count_tokens(text, model)
+        attrs["prompt_tokens"] = prompt
+        attrs["completion_tokens"] = completion
+        with self.cache._lock:
+            self.prompt_tokens += prompt
+            self.completion_tokens += completion
+
+    def generate(
+        self,
+        messages: List[LLMMessage],
+        *,
+        model: str,
+        temperature: float = 0.2,
+        max_output_tokens: int = 2000,
+    ) -> LLMResult:
+        with self._span(model, stream=False) as attrs:
+            if self.cache.mode == "bypass":
+                attrs["cache"] = "bypass"
+                result = self.inner.generate(messages, model=model, temperature=temperature, max_output_tokens=max_output_tokens)
+            else:
+                key = LLMCache.key(messages, model=model, temperature=temperature, max_output_tokens=max_output_tokens, namespace=self.cache_namespace)
+                cached = self.cache.get(key)
+                attrs["cache"] = "hit" if cached is not None else "miss"
+                if cached is not None:
+                    self._count("hits")
+                    result = cached
+                else:
+                    self._count("misses")
+                    result = self.inner.generate(messages, model=model, temperature=temperature, max_output_tokens=max_output_tokens)
+                    self.cache.put(key, result)
+            self._tokens(attrs, messages, model, result.raw, result.text)
+            return result
+
+    def generate_stream(
+        self,
+        messages: List[LLMMessage],
+        *,
+        model: str,
+        temperature: float = 0.2,
+        max_output_tokens: int = 2000,
+    ) -> Iterator[str]:
+        """Stream from the inner adapter; a hit is yielded in one piece, a complete miss is stored."""
+        with self._span(model, stream=True) as attrs:
+            if self.cache.mode == "bypass":
+                attrs["cache"] = "bypass"
+                parts: List[str] = []
+                for delta in generate_stream(self.inner, messages, model=model, temperature=temperature, max_output_tokens=max_output_tokens):
+                    parts.append(delta)
+                    yield delta
+                self._tokens(attrs, messages, model, None, "".join(parts))
+                return
+            key = LLMCache.key(messages, model=model, temperature=temperature, max_output_tokens=max_output_tokens, namespace=self.cache_namespace)
+            hit = self.cache.get(key)
+            if hit is not None:
+                attrs["cache"] = "hit"
+                self._count("hits")
+                self._tokens(attrs, messages, model, hit.raw, hit.text)
+                yield hit.text
+                return
+            attrs["cache"] = "miss"
+            self._count("misses")
+            parts = []
+            for delta in generate_stream(self.inner, messages, model=model, temperature=temperature, max_output_tokens=max_output_tokens):
+                parts.append(delta)
+                yield delta
+            # Only reached when the consumer drained the stream, so partial output is never cached.
+            self.cache.put(key, LLMResult(text="".join(parts), raw={"stream": True}))
+            self._tokens(attrs, messages, model, None, "".join(parts))
+
+    async def agenerate_stream(
+        self,
+        messages: List[LLMMessage],
+        *,
+        model: str,
+        temperature: float = 0.2,
+        max_output_tokens: int = 2000,
+    ) -> AsyncIterator[str]:
+        """Async twin of generate_stream()."""
+        with self._span(model, stream=True) as attrs:
+            if self.cache.mode == "bypass":
+                attrs["cache"] = "bypass"
+                parts: List[str] = []
+                async for delta in agenerate_stream(self.inner, messages, model=model, temperature=temperature, max_output_tokens=max_output_tokens):
+                    parts.append(delta)
+                    yield delta
+                self._tokens(attrs, messages, model, None, "".join(parts))
+                return
+            key = LLMCache.key(messages, model=model, temperature=temperature, max_output_tokens=max_output_tokens, namespace=self.cache_namespace)
+            hit = self.cache.get(key)
+            if hit is not None:
+                attrs["cache"] = "hit"
+                self._count("hits")
+                self._tokens(attrs, messages, model, hit.raw, hit.text)
+                yield hit.text
+                return
+            attrs["cache"] = "miss"
+            self._count("misses")
+            parts = []
+            async for delta in agenerate_stream(self.inner, messages, model=model, temperature=temperature, max_output_tokens=max_output_tokens):
+                parts.append(delta)
+                yield delta
+            self.cache.put(key, LLMResult(text="".join(parts), raw={"stream": True}))
+            self._tokens(attrs, messages, model, None, "".join(parts))
+
+    async def agenerate(
+        self,
+        messages: List[LLMMessage],
+        *,
+        model: str,
+        temperature: float = 0.2,
+        max_output_tokens: int = 2000,
+    ) -> LLMResult:
+        with self._span(model, stream=False) as attrs:
+            if self.cache.mode == "bypass":
+                attrs["cache"] = "bypass"
+                result = await agenerate(self.inner, messages, model=model, temperature=temperature, max_output_tokens=max_output_tokens)
+            else:
+                key = LLMCache.key(messages, model=model, temperature=temperature, max_output_tokens=max_output_tokens, namespace=self.cache_namespace)
+                cached = self.cache.get(key)
+                attrs["cache"] = "hit" if cached is not None else "miss"
+                if cached is not None:
+                    self._count("hits")
+                    result = cached
+                else:
+                    self._count("misses")
+                    result = await agenerate(self.inner, messages, model=model, temperature=temperature, max_output_tokens=max_output_tokens)
+                    self.cache.put(key, result)
+            self._tokens(attrs, messages, model, result.raw, result.text)
+            return result
@@ -0,0 +1,304 @@
+from __future__ import annotations
+import asyncio
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+from storyos.config import FakeLLMConfig
+from storyos.core.hashing import sha256_json
+from storyos.llm.base import LLMMessage, LLMResult
+from storyos.llm.ratelimit import RateLimits, acall_with_retry, call_with_retry, shared_limiter
+
+# (mean, standard deviation) of the output length in tokens.
+SIZE_PROFILES = {"small": (60, 20), "medium": (400, 120), "large": (1500, 400)}
+CHARS_PER_TOKEN = 4
+# Prompts whose attempts are tracked while they keep failing; the oldest are forgotten past this.
+MAX_TRACKED_PROMPTS = 4096
+
+_chunk_rx = re.compile(r"^## (\S+) \[(\S+:L\d+-L\d+)\]\n", re.MULTILINE)
+_name_rx = re.compile(r"\b[A-Z][a-z]{2,}\b")
+_sentence_rx = re.compile(r"[^.!?\n]+[.!?]")
+_NOT_NAMES = frozenset(
+    "The And But Then When What Where Who Why How This That There They She His Her Its "
+    "Chapter One Two Three After Before Once Now Not For With From Into".split()
+)
+_WORDS = (
+    "the a and of to in was he she it that on with as at his her they had said for but "
+    "not from by one all were there when what up out into down over back would could "
+    "light door road river wind night morning house garden stone voice hand eyes window "
+    "quiet slowly again still almost never always long old small dark warm cold bright "
+    "walked turned looked waited listened remembered smiled answered opened closed"
+).split()
+
+
+class FakeHTTPError(Exception):
+    """Injected API failure, shaped like the SDK's errors (status_code, response.headers)."""
+
+    def __init__(self, status_code: int, message: str, retry_after: Optional[float] = None):
+        super().__init__(f"{status_code} {message}")
+        self.status_code = status_code
+        headers = {"retry-after": f"{retry_after:g}"} if retry_after is not None else {}
+        self.response = SimpleNamespace(status_code=status_code, headers=headers)
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """Latency sampler in seconds for "fixed:<ms>", "uniform:<lo>,<hi>" or "lognormal:<median>,<sigma>"."""
+    kind, _, args = spec.partition(":")
+    vals = [float(v) for v in args.split(",")]
+    if kind == "fixed":
+        return lambda rng: vals[0] / 1000.0
+    if kind == "uniform":
+        return lambda rng: rng.uniform(vals[0], vals[1]) / 1000.0
+    if kind == "lognormal":
+        return lambda rng: vals[0] / 1000.0 * math.exp(rng.gauss(0.0, vals[1]))
+    raise ValueError(f"Unknown latency distribution: {spec!r}")
+
+
+@dataclass
+class FakeReply:
+    text: str
+    latency: float  # seconds until the full reply (or the error) is sent
+    error: Optional[FakeHTTPError] = None
+
+
+class FakeBackend:
+    """Deterministic replies, latencies and injected errors for the fake adapter and server.
+
+    The reply text depends only on the seed, model and messages. Prose prompts
+    get filler text sized by the output profile, so drafts do not grow from
+    step to step. Extraction prompts (chunks headed "## <id> [<file>:L<a>-L<b>]")
+    get extractor JSON built from the chunks, or the extraction_json file. A
+    follow-up asking for the rest gets the items not yet written. Replies longer
+    than max_output_tokens are cut off, as a real model's would be. Latency and
+    error injection are drawn per attempt, so a retried call can succeed. The
+    attempt count resets once a prompt succeeds, so a rerun sees the same errors.
+    """
+
+    def __init__(self, cfg: FakeLLMConfig):
+        self.cfg = cfg
+        self._latency = parse_latency(cfg.latency)
+        self._attempts: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.injected = {"429": 0, "500": 0}
+
+    def reply(self, messages: List[LLMMessage], *, model: str, max_output_tokens: int) -> FakeReply:
+        key = sha256_json({"seed": self.cfg.seed, "model": model, "messages": [[m.role, m.content] for m in messages]})
+        with self._lock:
+            n = self._attempts.pop(key, 0) + 1
+            self._attempts[key] = n
+            if len(self._attempts) > MAX_TRACKED_PROMPTS:
+                self._attempts.popitem(last=False)
+            self.calls += 1
+        rng = random.Random(f"{key}:{n}")
+        latency = self._latency(rng)
+        roll = rng.random()
+        if roll < self.cfg.rate_limit_rate:
+            with self._lock:
+                self.injected["429"] += 1
+            return FakeReply("", latency * 0.1, FakeHTTPError(429, "Rate limit reached (injected)", self.cfg.retry_after))
+        if roll < self.cfg.rate_limit_rate + self.cfg.error_rate:
+            with self._lock:
+                self.injected["500"] += 1
+            return FakeReply("", latency, FakeHTTPError(500, "Internal server error (injected)"))
+        with self._lock:
+            self._attempts.pop(key, None)
+        text = self._text(messages, random.Random(key), max_output_tokens)
+        return FakeReply(text[: max_output_tokens * CHARS_PER_TOKEN], latency)
+
+    def _text(self, messages: List[LLMMessage], rng: random.Random, max_output_tokens: int) -> str:
+        users = [m.content for m in messages if m.role == "user"]
+        if users and _chunk_rx.search(users[0]):
+            return self._extraction(users[0], [m.content for m in messages if m.role == "assistant"])
+        return self._prose(rng, max_output_tokens)
+
+    def _prose(self, rng: random.Random, max_output_tokens: int) -> str:
+        if self.cfg.output in SIZE_PROFILES:
+            mean, sd = SIZE_PROFILES[self.cfg.output]
+            tokens = int(rng.gauss(mean, sd))
+        else:
+            tokens = int(self.cfg.output)
+        tokens = max(1, min(tokens, max_output_tokens))
+        paras, sentence, para = [], [], []
+        for _ in range(tokens):
+            sentence.append(rng.choice(_WORDS))
+            if len(sentence) >= rng.randint(8, 16):
+                para.append(" ".join(sentence).capitalize() + ".")
+                sentence = []
+                if len(para) == 4:
+                    paras.append(" ".join(para))
+                    para = []
+        if sentence:
+            para.append(" ".join(sentence).capitalize() + ".")
+        if para:
+            paras.append(" ".join(para))
+        return "\n\n".join(paras) + "\n"
+
+    def _extraction(self, prompt: str, already_sent: List[str]) -> str:
+        if self.cfg.extraction_json:
+            return Path(self.cfg.extraction_json).read_text(encoding="utf-8")
+        chunks = []
+        for m in _chunk_rx.finditer(prompt):
+            # The ref's line range says how much text follows the header; the rest is prompt.
+            start, end = (int(x) for x in re.findall(r"L(\d+)", m.group(2))[-2:])
+            lines = prompt[m.end():].split("\n", end - start + 1)[: end - start + 1]
+            chunks.append((m.group(2), "\n".join(lines)))
+
+        def first_sentence(text: str) -> str:
+            line = next((ln for ln in text.splitlines() if ln.strip()), "")
+            m = _sentence_rx.search(line)
+            return " ".join((m.group(0) if m else line).split())[:160]
+
+        names = Counter(w for _, text in chunks for w in _name_rx.findall(text) if w not in _NOT_NAMES)
+        characters = []
+        for name, _count in names.most_common(3):
+            ref = next(r for r, text in chunks if name in text)
+            characters.append({"name": name, "facts": [
+                {"claim": f"{name} appears in {ref}.", "confidence": "med", "evidence": [{"source": ref, "note": ""}]},
+            ], "open_questions": []})
+        facts = [{"claim": first_sentence(text), "confidence": "med", "evidence": [{"source": ref, "note": ""}]}
+                 for ref, text in chunks if text.strip()]
+        events = [{"when": f"scene {i}", "what": first_sentence(text), "confidence": "low",
+                   "evidence": [{"source": ref, "note": ""}]}
+                  for i, (ref, text) in enumerate(chunks, start=1) if text.strip()]
+        doc: Dict[str, Any] = {"characters": characters, "world": {"facts": facts, "open_questions": []},
+                               "timeline": {"events": events}}
+        if already_sent:
+            # A continuation: only the items no earlier (cut-off) reply contains in full.
+            sent = re.sub(r"\s+", "", "".join(already_sent))
+
+            def new(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+                return [x for x in items if re.sub(r"\s+", "", json.dumps(x)) not in sent]
+
+            doc = {"characters": new(characters), "world": {"facts": new(facts), "open_questions": []},
+                   "timeline": {"events": new(events)}}
+        return json.dumps(doc, indent=1)
+
+
+class FakeAdapter:
+    """Offline, deterministic LLM adapter (provider "fake") for load tests.
+
+    It behaves like OpenAIAdapter as seen from the caller. Calls wait the
+    sampled latency, pass through the shared rate limiter and retry injected
+    429/500s with the same backoff. Streams arrive in stream_chunk_chars pieces
+    spread over the latency.
+    """
+
+    def __init__(self, backend: FakeBackend, limits: RateLimits | None = None):
+        self.backend = backend
+        self.limits = limits or RateLimits()
+        self.limiter = shared_limiter("fake", self.limits)
+        # Keeps fake replies in the LLM cache apart from real ones (see CachingLLMAdapter).
+        self.cache_namespace = "fake:" + sha256_json(backend.cfg.model_dump())[:16]
+
+    def _raw(self, messages: List[LLMMessage], r: FakeReply) -> Dict[str, Any]:
+        prompt = sum(len(m.content) for m in messages) // CHARS_PER_TOKEN
+        completion = len(r.text) // CHARS_PER_TOKEN
+        return {"fake": True, "latency_s": r.latency,
+                "usage": {"input_tokens": prompt, "output_tokens": completion, "total_tokens": prompt + completion}}
+
+    def _est(self, messages: List[LLMMessage], max_output_tokens: int) -> int:
+        return sum(len(m.content) for m in messages) // CHARS_PER_TOKEN + max_output_tokens
+
+    def generate(
+        self,
+        messages: List[LLMMessage],
+        *,
+        model: str,
+        temperature: float = 0.2,
+        max_output_tokens: int = 2000,
+    ) -> LLMResult:
+        def attempt() -> FakeReply:
+            with self.limiter.slot(self._est(messages, max_output_tokens)):
+                r = self.backend.reply(messages, model=model, max_output_tokens=max_output_tokens)
+                time.sleep(r.latency)
+            if r.error is not None:
+                raise r.error
+            return r
+
+        r = call_with_retry(attempt, self.limits)
+        return LLMResult(text=r.text, raw=self._raw(messages, r))
+
+    def generate_stream(
+        self,
+        messages: List[LLMMessage],
+        *,
+        model: str,
+        temperature: float = 0.2,
+        max_output_tokens: int = 2000,
+    ) -> Iterator[str]:
+        def attempt() -> FakeReply:
+            self.limiter.acquire(self._est(messages, max_output_tokens))
+            r = self.backend.reply(messages, model=model, max_output_tokens=max_output_tokens)
+            if r.error is not None:
+                time.sleep(r.latency)
+                self.limiter.release()
+                raise r.error
+            return r
+
+        r = call_with_retry(attempt, self.limits)
+        try:
+            step = max(1, self.backend.cfg.stream_chunk_chars)
+            pieces = [r.text[i:i + step] for i in range(0, len(r.text), step)] or [""]
+            # A third of the latency before the first delta, the rest spread over the stream.
+            time.sleep(r.latency / 3)
+            for piece in pieces:
+                time.sleep(r.latency * 2 / 3 / len(pieces))
+                yield piece
+        finally:
+            self.limiter.release()
+
+    async def agenerate(
+        self,
+        messages: List[LLMMessage],
+        *,
+        model: str,
+        temperature: float = 0.2,
+        max_output_tokens: int = 2000,
+    ) -> LLMResult:
+        async def attempt() -> FakeReply:
+            async with self.limiter.aslot(self._est(messages, max_output_tokens)):
+                r = self.backend.reply(messages, model=model, max_output_tokens=max_output_tokens)
+                await asyncio.sleep(r.latency)
+            if r.error is not None:
+                raise r.error
+            return r
+
+        r = await acall_with_retry(attempt, self.limits)
+        return LLMResult(text=r.text, raw=self._raw(messages, r))
+
+    async def agenerate_stream(
+        self,
+        messages: List[LLMMessage],
+        *,
+        model: str,
+        temperature: float = 0.2,
+        max_output_tokens: int = 2000,
+    ) -> AsyncIterator[str]:
+        async def attempt() -> FakeReply:
+            await self.limiter.aacquire(self._est(messages, max_output_tokens))
+            r = self.backend.reply(messages, model=model, max_output_tokens=max_output_tokens)
+            if r.error is not None:
+                await asyncio.sleep(r.latency)
+                self.limiter.release()
+                raise r.error
+            return r
+
+        r = await acall_with_retry(attempt, self.limits)
+        try:
+            step = max(1, self.backend.cfg.stream_chunk_chars)
+            pieces = [r.text[i:i + step] for i in range(0, len(r.text), step)] or [""]
+            await asyncio.sleep(r.latency / 3)
+            for piece in pieces:
+                await asyncio.sleep(r.latency * 2 / 3 / len(pieces))
+                yield piece
+        finally:
+            self.limiter.release()
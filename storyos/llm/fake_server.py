@@ -0,0 +1,156 @@
+from __future__ import annotations
+import json
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Tuple
+
+from storyos.config import FakeLLMConfig
+from storyos.llm.base import LLMMessage
+from storyos.llm.fake import CHARS_PER_TOKEN, FakeBackend
+
+
+def _content_text(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    return "".join(part.get("text", "") for part in content or [] if isinstance(part, dict))
+
+
+def _request_messages(path: str, body: Dict[str, Any]) -> Tuple[List[LLMMessage], int]:
+    if path.endswith("/responses"):
+        items = body.get("input") or []
+        if isinstance(items, str):
+            items = [{"role": "user", "content": items}]
+        if body.get("instructions"):
+            items = [{"role": "system", "content": body["instructions"]}, *items]
+        limit = body.get("max_output_tokens") or 2000
+    else:
+        items = body.get("messages") or []
+        limit = body.get("max_tokens") or body.get("max_completion_tokens") or 2000
+    return [LLMMessage(role=i.get("role", "user"), content=_content_text(i.get("content"))) for i in items], int(limit)
+
+
+def _usage(messages: List[LLMMessage], text: str, chat: bool) -> Dict[str, int]:
+    prompt = sum(len(m.content) for m in messages) // CHARS_PER_TOKEN
+    completion = len(text) // CHARS_PER_TOKEN
+    if chat:
+        return {"prompt_tokens": prompt, "completion_tokens": completion, "total_tokens": prompt + completion}
+    return {"input_tokens": prompt, "output_tokens": completion, "total_tokens": prompt + completion}
+
+
+def _response_obj(rid: str, model: str, text: str, usage: Dict[str, int], status: str = "completed") -> Dict[str, Any]:
+    content = [{"type": "output_text", "text": text, "annotations": []}] if status == "completed" else []
+    return {
+        "id": rid, "object": "response", "created_at": int(time.time()), "model": model, "status": status,
+        "output": [{"type": "message", "id": f"msg_{rid}", "role": "assistant", "status": status, "content": content}],
+        "usage": usage if status == "completed" else None,
+    }
+
+
+def _chat_obj(rid: str, model: str, text: str, usage: Dict[str, int]) -> Dict[str, Any]:
+    return {
+        "id": rid, "object": "chat.completion", "created": int(time.time()), "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+        "usage": usage,
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so client connection pooling is exercised
+    server: "FakeAPIServer"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _send_json(self, status: int, obj: Any, headers: Dict[str, str] | None = None) -> None:
+        data = json.dumps(obj).encode("utf-8")
+        self.send_response(status)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _sse(self, event: Dict[str, Any] | str) -> None:
+        data = event if isinstance(event, str) else json.dumps(event)
+        prefix = f"event: {event['type']}\n" if isinstance(event, dict) and "type" in event else ""
+        chunk = f"{prefix}data: {data}\n\n".encode("utf-8")
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))  # one chunked-encoding frame
+        self.wfile.flush()
+
+    def do_POST(self) -> None:
+        path = self.path.split("?")[0].rstrip("/")
+        if not (path.endswith("/responses") or path.endswith("/chat/completions")):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get("content-length") or 0)) or b"{}")
+        messages, limit = _request_messages(path, body)
+        model = body.get("model", "fake")
+        chat = path.endswith("/chat/completions")
+        backend = self.server.backend
+        reply = backend.reply(messages, model=model, max_output_tokens=limit)
+
+        if reply.error is not None:
+            time.sleep(reply.latency)
+            headers = {k: v for k, v in reply.error.response.headers.items()}
+            kind = "rate_limit_error" if reply.error.status_code == 429 else "server_error"
+            self._send_json(reply.error.status_code, {"error": {"message": str(reply.error), "type": kind}}, headers)
+            return
+
+        rid = f"{'chatcmpl' if chat else 'resp'}_{uuid.uuid4().hex[:12]}"
+        usage = _usage(messages, reply.text, chat)
+        if not body.get("stream"):
+            time.sleep(reply.latency)
+            self._send_json(200, _chat_obj(rid, model, reply.text, usage) if chat else _response_obj(rid, model, reply.text, usage))
+            return
+
+        step = max(1, backend.cfg.stream_chunk_chars)
+        pieces = [reply.text[i:i + step] for i in range(0, len(reply.text), step)] or [""]
+        self.send_response(200)
+        self.send_header("content-type", "text/event-stream")
+        self.send_header("transfer-encoding", "chunked")
+        self.end_headers()
+        time.sleep(reply.latency / 3)
+        if not chat:
+            self._sse({"type": "response.created", "sequence_number": 0,
+                       "response": _response_obj(rid, model, "", usage, status="in_progress")})
+        for seq, piece in enumerate(pieces, start=1):
+            time.sleep(reply.latency * 2 / 3 / len(pieces))
+            if chat:
+                self._sse({"id": rid, "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+                           "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]})
+            else:
+                self._sse({"type": "response.output_text.delta", "item_id": f"msg_{rid}", "output_index": 0,
+                           "content_index": 0, "delta": piece, "sequence_number": seq, "logprobs": []})
+        if chat:
+            self._sse({"id": rid, "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+                       "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+            self._sse("[DONE]")
+        else:
+            self._sse({"type": "response.completed", "sequence_number": len(pieces) + 1,
+                       "response": _response_obj(rid, model, reply.text, usage)})
+        self.wfile.write(b"0\r\n\r\n")
+
+
+class FakeAPIServer(ThreadingHTTPServer):
+    """Local stand-in for the OpenAI API (POST /v1/responses and /v1/chat/completions, streaming or not).
+
+    Replies come from FakeBackend, so latency, 429/500 injection and output
+    sizes follow the FakeLLMConfig. Point the real adapter at it with
+    OPENAI_BASE_URL=http://<host>:<port>/v1 to load-test the whole client stack
+    (rate limiter, retries, connection pool) without network access.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, cfg: FakeLLMConfig, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _Handler)
+        self.backend = FakeBackend(cfg)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        if isinstance(host, bytes):
+            host = host.decode("ascii")
+        return f"http://{host}:{port}/v1"
@@ -2,9 +2,11 @@ from __future__ import annotations
 
 import os
 from dataclasses import dataclass
-from typing import List
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional
 
-from storyos.llm.base import LLMAdapter, LLMMessage, LLMResult
+from storyos.llm.base import AsyncLLMAdapter, LLMAdapter, LLMMessage, LLMResult
+from storyos.llm.ratelimit import RateLimiter, RateLimits, acall_with_retry, call_with_retry, shared_limiter
+from storyos.llm.tokens import count_tokens
 
 
 @dataclass(frozen=True)
@@ -14,6 +16,77 @@ class OpenAIAdapterConfig:
     organization_env: str = "OPENAI_ORG_ID"  # optional
 
 
+def _client_kwargs(cfg: OpenAIAdapterConfig, http_client: Any = None, timeout: Any = None) -> Dict[str, Any]:
+    api_key = os.getenv(cfg.api_key_env)
+    if not api_key:
+        raise RuntimeError(f"Missing API key. Set {cfg.api_key_env} in your environment.")
+
+    base_url = os.getenv(cfg.base_url_env)
+    org = os.getenv(cfg.organization_env)
+
+    # Retries are done by call_with_retry so they go through the shared limiter.
+    kwargs: Dict[str, Any] = {"api_key": api_key, "max_retries": 0}
+    if base_url:
+        kwargs["base_url"] = base_url
+    if org:
+        kwargs["organization"] = org
+    if http_client is not None:
+        kwargs["http_client"] = http_client
+    if timeout is not None:
+        kwargs["timeout"] = timeout
+    return kwargs
+
+
+def _endpoint(kwargs: Dict[str, Any]) -> str:
+    return str(kwargs.get("base_url") or "https://api.openai.com")
+
+
+def _limiter(kwargs: Dict[str, Any], limits: RateLimits) -> RateLimiter:
+    return shared_limiter(_endpoint(kwargs), limits)
+
+
+def _estimate_tokens(messages: List[LLMMessage], model: str, max_output_tokens: int) -> int:
+    return sum(count_tokens(m.content, model) for m in messages) + max_output_tokens
+
+
+def _used_tokens(resp: Any) -> Optional[int]:
+    total = getattr(getattr(resp, "usage", None), "total_tokens", None)
+    return total if isinstance(total, int) else None
+
+
+def _responses_input(messages: List[LLMMessage]) -> List[Any]:
+    # The Responses API takes assistant turns (e.g. a reply being continued) as output_text only.
+    return [
+        {"role": m.role, "content": [{"type": "output_text" if m.role == "assistant" else "input_text", "text": m.content}]}
+        for m in messages
+    ]
+
+
+def _chat_input(messages: List[LLMMessage]) -> List[Any]:
+    return [{"role": m.role, "content": m.content} for m in messages]
+
+
+def _result_from_response(resp: Any) -> LLMResult:
+    text = getattr(resp, "output_text", None)
+    if not text:
+        parts: list[str] = []
+        for o in (getattr(resp, "output", None) or []):
+            for c in (getattr(o, "content", None) or []):
+                if getattr(c, "type", None) == "output_text":
+                    parts.append(getattr(c, "text", ""))
+        text = "\n".join([p for p in parts if p]).strip()
+    raw = getattr(resp, "model_dump", lambda: resp)()
+    return LLMResult(text=text or "", raw=raw)
+
+
+def _result_from_chat(resp: Any) -> LLMResult:
+    text = ""
+    if getattr(resp, "choices", None):
+        text = (resp.choices[0].message.content or "").strip()
+    raw = getattr(resp, "model_dump", lambda: resp)()
+    return LLMResult(text=text or "", raw=raw)
+
+
 class OpenAIAdapter(LLMAdapter):
     """Real OpenAI adapter using the Responses API via the official Python SDK.
 
@@ -21,27 +94,42 @@ class OpenAIAdapter(LLMAdapter):
       - Reads API key from env var (default OPENAI_API_KEY)
       - Optional OPENAI_BASE_URL for proxies/gateways
       - Optional OPENAI_ORG_ID if you use org scoping
+
+    Every call goes through the process-wide RateLimiter for its base URL
+    (requests/tokens per minute, max in flight; see RateLimits and LLMConfig),
+    and 429/5xx/connection errors are retried with jittered exponential backoff
+    that honours retry-after. Streams are only retried before the first delta.
+
+    Pass ``http_client`` (an httpx.Client) to share a keep-alive pool between
+    adapters; storyos.llm.registry.get_adapter does this per process.
     """
 
-    def __init__(self, cfg: OpenAIAdapterConfig | None = None):
+    def __init__(
+        self,
+        cfg: OpenAIAdapterConfig | None = None,
+        limits: RateLimits | None = None,
+        http_client: Any = None,
+        timeout: Any = None,
+    ):
         self.cfg = cfg or OpenAIAdapterConfig()
+        self.limits = limits or RateLimits()
+        kwargs = _client_kwargs(self.cfg, http_client, timeout)
+        self.limiter = _limiter(kwargs, self.limits)
+        # Sync and async adapters share cache entries per endpoint.
+        self.cache_namespace = "openai:" + _endpoint(kwargs)
 
-        api_key = os.getenv(self.cfg.api_key_env)
-        if not api_key:
-            raise RuntimeError(f"Missing API key. Set {self.cfg.api_key_env} in your environment.")
-
-        base_url = os.getenv(self.cfg.base_url_env)
-        org = os.getenv(self.cfg.organization_env)
+        from openai import OpenAI
 
-        from openai import OpenAI  # type: ignore
+        self.client = OpenAI(**kwargs)
 
-        kwargs = {"api_key": api_key}
-        if base_url:
-            kwargs["base_url"] = base_url
-        if org:
-            kwargs["organization"] = org
+    def _call(self, est: int, create: Callable[[], Any]) -> Any:
+        def attempt() -> Any:
+            with self.limiter.slot(est):
+                resp = create()
+            self.limiter.settle(est, _used_tokens(resp))
+            return resp
 
-        self.client = OpenAI(**kwargs)
+        return call_with_retry(attempt, self.limits)
 
     def generate(
         self,
@@ -51,37 +139,191 @@ class OpenAIAdapter(LLMAdapter):
         temperature: float = 0.2,
         max_output_tokens: int = 2000,
     ) -> LLMResult:
-        input_msgs = [
-            {"role": m.role, "content": [{"type": "input_text", "text": m.content}]}
-            for m in messages
-        ]
+        est = _estimate_tokens(messages, model, max_output_tokens)
+        if hasattr(self.client, "responses"):
+            resp = self._call(est, lambda: self.client.responses.create(
+                model=model,
+                input=_responses_input(messages),
+                temperature=temperature,
+                max_output_tokens=max_output_tokens,
+            ))
+            return _result_from_response(resp)
+
+        resp = self._call(est, lambda: self.client.chat.completions.create(
+            model=model,
+            messages=_chat_input(messages),
+            temperature=temperature,
+            max_tokens=max_output_tokens,
+        ))
+        return _result_from_chat(resp)
+
+    def _open_stream(self, est: int, create: Callable[[], Any]) -> Any:
+        # The in-flight slot stays taken until the caller has drained the stream.
+        def attempt() -> Any:
+            self.limiter.acquire(est)
+            try:
+                return create()
+            except BaseException:
+                self.limiter.release()
+                raise
+
+        return call_with_retry(attempt, self.limits)
+
+    def generate_stream(
+        self,
+        messages: List[LLMMessage],
+        *,
+        model: str,
+        temperature: float = 0.2,
+        max_output_tokens: int = 2000,
+    ) -> Iterator[str]:
+        """Yield output text deltas as they arrive (Responses API events, or chat chunks)."""
+        est = _estimate_tokens(messages, model, max_output_tokens)
+        if hasattr(self.client, "responses"):
+            stream = self._open_stream(est, lambda: self.client.responses.create(
+                model=model,
+                input=_responses_input(messages),
+                temperature=temperature,
+                max_output_tokens=max_output_tokens,
+                stream=True,
+            ))
+            try:
+                for event in stream:
+                    kind = getattr(event, "type", None)
+                    if kind == "response.output_text.delta":
+                        yield getattr(event, "delta", "") or ""
+                    elif kind == "response.completed":
+                        self.limiter.settle(est, _used_tokens(getattr(event, "response", None)))
+            finally:
+                self.limiter.release()
+            return
+
+        stream = self._open_stream(est, lambda: self.client.chat.completions.create(
+            model=model,
+            messages=_chat_input(messages),
+            temperature=temperature,
+            max_tokens=max_output_tokens,
+            stream=True,
+        ))
+        try:
+            for chunk in stream:
+                if getattr(chunk, "choices", None):
+                    yield chunk.choices[0].delta.content or ""
+        finally:
+            self.limiter.release()
+
 
+class AsyncOpenAIAdapter(AsyncLLMAdapter):
+    """asyncio-native counterpart of OpenAIAdapter (same auth env vars).
+
+    Uses the SDK's AsyncOpenAI client, so many calls can be in flight on one
+    event loop without a thread per request. Shares the rate limiter of
+    OpenAIAdapter, so threads and tasks draw on the same budgets.
+    """
+
+    def __init__(
+        self,
+        cfg: OpenAIAdapterConfig | None = None,
+        limits: RateLimits | None = None,
+        http_client: Any = None,
+        timeout: Any = None,
+    ):
+        self.cfg = cfg or OpenAIAdapterConfig()
+        self.limits = limits or RateLimits()
+        kwargs = _client_kwargs(self.cfg, http_client, timeout)
+        self.limiter = _limiter(kwargs, self.limits)
+        self.cache_namespace = "openai:" + _endpoint(kwargs)
+
+        from openai import AsyncOpenAI
+
+        self.client = AsyncOpenAI(**kwargs)
+
+    async def _call(self, est: int, create: Callable[[], Any]) -> Any:
+        async def attempt() -> Any:
+            async with self.limiter.aslot(est):
+                resp = await create()
+            self.limiter.settle(est, _used_tokens(resp))
+            return resp
+
+        return await acall_with_retry(attempt, self.limits)
+
+    async def agenerate(
+        self,
+        messages: List[LLMMessage],
+        *,
+        model: str,
+        temperature: float = 0.2,
+        max_output_tokens: int = 2000,
+    ) -> LLMResult:
+        est = _estimate_tokens(messages, model, max_output_tokens)
         if hasattr(self.client, "responses"):
-            resp = self.client.responses.create(
+            resp = await self._call(est, lambda: self.client.responses.create(
                 model=model,
-                input=input_msgs,
+                input=_responses_input(messages),
                 temperature=temperature,
                 max_output_tokens=max_output_tokens,
-            )
-            text = getattr(resp, "output_text", None)
-            if not text:
-                parts: list[str] = []
-                for o in (getattr(resp, "output", None) or []):
-                    for c in (getattr(o, "content", None) or []):
-                        if getattr(c, "type", None) == "output_text":
-                            parts.append(getattr(c, "text", ""))
-                text = "\n".join([p for p in parts if p]).strip()
-            raw = getattr(resp, "model_dump", lambda: resp)()
-        else:
-            resp = self.client.chat.completions.create(
+            ))
+            return _result_from_response(resp)
+
+        resp = await self._call(est, lambda: self.client.chat.completions.create(
+            model=model,
+            messages=_chat_input(messages),
+            temperature=temperature,
+            max_tokens=max_output_tokens,
+        ))
+        return _result_from_chat(resp)
+
+    async def _open_stream(self, est: int, create: Callable[[], Awaitable[Any]]) -> Any:
+        # As in OpenAIAdapter, the in-flight slot is held until the stream is drained.
+        async def attempt() -> Any:
+            await self.limiter.aacquire(est)
+            try:
+                return await create()
+            except BaseException:
+                self.limiter.release()
+                raise
+
+        return await acall_with_retry(attempt, self.limits)
+
+    async def agenerate_stream(
+        self,
+        messages: List[LLMMessage],
+        *,
+        model: str,
+        temperature: float = 0.2,
+        max_output_tokens: int = 2000,
+    ) -> AsyncIterator[str]:
+        """Async twin of OpenAIAdapter.generate_stream()."""
+        est = _estimate_tokens(messages, model, max_output_tokens)
+        if hasattr(self.client, "responses"):
+            stream = await self._open_stream(est, lambda: self.client.responses.create(
                 model=model,
-                messages=[{"role": m.role, "content": m.content} for m in messages],
+                input=_responses_input(messages),
                 temperature=temperature,
-                max_tokens=max_output_tokens,
-            )
-            text = ""
-            if getattr(resp, "choices", None):
-                text = (resp.choices[0].message.content or "").strip()
-            raw = getattr(resp, "model_dump", lambda: resp)()
-
-        return LLMResult(text=text or "", raw=raw)
+                max_output_tokens=max_output_tokens,
+                stream=True,
+            ))
+            try:
+                async for event in stream:
+                    kind = getattr(event, "type", None)
+                    if kind == "response.output_text.delta":
+                        yield getattr(event, "delta", "") or ""
+                    elif kind == "response.completed":
+                        self.limiter.settle(est, _used_tokens(getattr(event, "response", None)))
+            finally:
+                self.limiter.release()
+            return
+
+        stream = await self._open_stream(est, lambda: self.client.chat.completions.create(
+            model=model,
+            messages=_chat_input(messages),
+            temperature=temperature,
+            max_tokens=max_output_tokens,
+            stream=True,
+        ))
+        try:
+            async for chunk in stream:
+                if getattr(chunk, "choices", None):
+                    yield chunk.choices[0].delta.content or ""
+        finally:
+            self.limiter.release()
@@ -1,9 +1,17 @@
 from __future__ import annotations
-from typing import List
+from typing import Iterator, List
 from storyos.llm.base import LLMClient, LLMMessage, LLMResult
 
 class OpenAIAdapterStub(LLMClient):
-    def generate(self, messages: List[LLMMessage], *, model: str, temperature: float) -> LLMResult:
+    cache_namespace = "stub"
+
+    def generate(self, messages: List[LLMMessage], *, model: str, temperature: float = 0.2, max_output_tokens: int = 2000) -> LLMResult:
         joined = "\n\n".join([f"[{m.role}] {m.content}" for m in messages])
         fake = f"(STUB LLM OUTPUT)\nModel={model} temp={temperature}\n\n{joined}\n"
         return LLMResult(text=fake, raw={"stub": True})
+
+    async def agenerate(self, messages: List[LLMMessage], *, model: str, temperature: float = 0.2, max_output_tokens: int = 2000) -> LLMResult:
+        return self.generate(messages, model=model, temperature=temperature, max_output_tokens=max_output_tokens)
+
+    def generate_stream(self, messages: List[LLMMessage], *, model: str, temperature: float = 0.2, max_output_tokens: int = 2000) -> Iterator[str]:
+        yield from self.generate(messages, model=model, temperature=temperature, max_output_tokens=max_output_tokens).text.splitlines(keepends=True)
@@ -0,0 +1,215 @@
+from __future__ import annotations
+import asyncio
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+RETRY_STATUS = frozenset({408, 409, 429, 500, 502, 503, 504})
+# openai SDK exceptions without an HTTP status that are still worth retrying.
+RETRY_ERRORS = frozenset({"APIConnectionError", "APITimeoutError", "InternalServerError", "RateLimitError"})
+
+
+@dataclass(frozen=True)
+class RateLimits:
+    """Client-side limits for one API endpoint; 0 disables a limit."""
+
+    requests_per_minute: int = 0
+    tokens_per_minute: int = 0
+    max_in_flight: int = 8
+    max_retries: int = 5
+    retry_base_delay: float = 1.0
+    retry_max_delay: float = 60.0
+
+    @classmethod
+    def from_llm_config(cls, llm_cfg: Any) -> "RateLimits":
+        return cls(**{k: getattr(llm_cfg, k) for k in cls.__dataclass_fields__})
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at ``per_minute`` with a one-minute burst.
+
+    reserve() always succeeds and returns how long the caller must wait: a
+    request the bucket cannot cover drives it negative, so later callers queue
+    behind it instead of starving it. Waiting happens outside the lock, which
+    lets threads and asyncio tasks share one bucket.
+    """
+
+    def __init__(self, per_minute: int):
+        self.rate = per_minute / 60.0
+        self.capacity = float(per_minute)
+        self._level = float(per_minute)
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._level = min(self.capacity, self._level + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def reserve(self, n: float) -> float:
+        with self._lock:
+            self._refill(time.monotonic())
+            self._level -= n
+            return 0.0 if self._level >= 0 else -self._level / self.rate
+
+    def refund(self, n: float) -> None:
+        """Give back tokens reserved for a request that used fewer than estimated."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._level = min(self.capacity, self._level + n)
+
+
+class RateLimiter:
+    """Requests/tokens per minute and max in-flight calls for one endpoint.
+
+    Use slot() from threads or aslot() from asyncio tasks (or acquire()/release()
+    around a stream). Both draw on the same buckets and in-flight count.
+    """
+
+    def __init__(self, limits: RateLimits):
+        self.limits = limits
+        self.requests = TokenBucket(limits.requests_per_minute) if limits.requests_per_minute > 0 else None
+        self.tokens = TokenBucket(limits.tokens_per_minute) if limits.tokens_per_minute > 0 else None
+        self._in_flight = 0
+        self._cond = threading.Condition()
+
+    def _reserve(self, est_tokens: int) -> float:
+        wait = self.requests.reserve(1) if self.requests else 0.0
+        if self.tokens:
+            wait = max(wait, self.tokens.reserve(est_tokens))
+        return wait
+
+    def _try_enter(self) -> bool:
+        with self._cond:
+            if self.limits.max_in_flight > 0 and self._in_flight >= self.limits.max_in_flight:
+                return False
+            self._in_flight += 1
+            return True
+
+    def settle(self, est_tokens: int, used_tokens: Optional[int]) -> None:
+        if self.tokens and used_tokens is not None and used_tokens < est_tokens:
+            self.tokens.refund(est_tokens - used_tokens)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def acquire(self, est_tokens: int = 0) -> None:
+        """Block until the budgets allow a request of est_tokens and an in-flight slot is free."""
+        time.sleep(self._reserve(est_tokens))
+        with self._cond:
+            while self.limits.max_in_flight > 0 and self._in_flight >= self.limits.max_in_flight:
+                self._cond.wait()
+            self._in_flight += 1
+
+    async def aacquire(self, est_tokens: int = 0) -> None:
+        await asyncio.sleep(self._reserve(est_tokens))
+        delay = 0.005
+        while not self._try_enter():
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.1)
+
+    def release(self) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def slot(self, est_tokens: int = 0) -> Iterator[None]:
+        self.acquire(est_tokens)
+        try:
+            yield
+        finally:
+            self.release()
+
+    @asynccontextmanager
+    async def aslot(self, est_tokens: int = 0) -> AsyncIterator[None]:
+        await self.aacquire(est_tokens)
+        try:
+            yield
+        finally:
+            self.release()
+
+
+_limiters: Dict[Tuple[str, RateLimits], RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def shared_limiter(endpoint: str, limits: RateLimits) -> RateLimiter:
+    """The process-wide limiter for endpoint (e.g. a base URL) under these limits."""
+    with _limiters_lock:
+        lim = _limiters.get((endpoint, limits))
+        if lim is None:
+            lim = _limiters[(endpoint, limits)] = RateLimiter(limits)
+        return lim
+
+
+def _status(exc: BaseException) -> Optional[int]:
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    status = _status(exc)
+    if status is not None:
+        return status in RETRY_STATUS
+    return type(exc).__name__ in RETRY_ERRORS
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """Server-requested wait from retry-after-ms / retry-after (seconds or HTTP date) headers."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        ms = headers.get("retry-after-ms")
+        if ms is not None:
+            return float(ms) / 1000.0
+        value = headers.get("retry-after")
+        if value is None:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, limits: RateLimits, retry_after: Optional[float] = None) -> float:
+    """Full-jitter exponential backoff, never shorter than the server's retry-after."""
+    delay = random.uniform(0, min(limits.retry_max_delay, limits.retry_base_delay * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, limits.retry_max_delay))
+    return delay
+
+
+def call_with_retry(fn: Callable[[], T], limits: RateLimits, sleep: Callable[[float], None] = time.sleep) -> T:
+    attempt = 0
+    while True:
+        try:
+            return fn()
+        except Exception as e:
+            if attempt >= limits.max_retries or not is_retryable(e):
+                raise
+            sleep(backoff_delay(attempt, limits, retry_after_seconds(e)))
+            attempt += 1
+
+
+async def acall_with_retry(fn: Callable[[], Awaitable[T]], limits: RateLimits) -> T:
+    attempt = 0
+    while True:
+        try:
+            return await fn()
+        except Exception as e:
+            if attempt >= limits.max_retries or not is_retryable(e):
+                raise
+            await asyncio.sleep(backoff_delay(attempt, limits, retry_after_seconds(e)))
+            attempt += 1
@@ -0,0 +1,183 @@
+from __future__ import annotations
+import asyncio
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from storyos.config import LLMConfig, LLMHTTPConfig
+from storyos.llm.fake import FakeAdapter, FakeBackend
+from storyos.llm.openai_adapter import AsyncOpenAIAdapter, OpenAIAdapter
+from storyos.llm.openai_adapter_stub import OpenAIAdapterStub
+from storyos.llm.ratelimit import RateLimits
+
+
+class ConnectionStats:
+    """Requests vs. TCP/TLS connections opened by one pooled HTTP client.
+
+    Connections are told apart by the network stream httpx attaches to each
+    response, so a request on a kept-alive connection counts as reused.
+    """
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self._streams: set[int] = set()
+        self._lock = threading.Lock()
+
+    def record(self, response: Any) -> None:
+        stream = response.extensions.get("network_stream")
+        with self._lock:
+            self.requests += 1
+            if stream is not None:
+                self._streams.add(id(stream))
+
+    async def arecord(self, response: Any) -> None:
+        self.record(response)
+
+    @property
+    def connections(self) -> int:
+        return len(self._streams)
+
+    def as_dict(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "connections": len(self._streams),
+                "reused": max(0, self.requests - len(self._streams)),
+            }
+
+
+def _httpx_options(http: LLMHTTPConfig) -> Dict[str, Any]:
+    import httpx
+
+    return {
+        "limits": httpx.Limits(
+            max_connections=http.max_connections,
+            max_keepalive_connections=http.max_keepalive_connections,
+            keepalive_expiry=http.keepalive_expiry,
+        ),
+        "timeout": httpx.Timeout(
+            connect=http.connect_timeout,
+            read=http.read_timeout,
+            write=http.write_timeout,
+            pool=http.pool_timeout,
+        ),
+    }
+
+
+@dataclass
+class _Entry:
+    adapter: Any
+    client: Any = None  # the pooled httpx client, closed by AdapterRegistry.close()
+    stats: Optional[ConnectionStats] = None
+
+
+class AdapterRegistry:
+    """Process-level LLM adapters, one per provider/config, each with a pooled HTTP client.
+
+    Adapters are built on first use and then reused by every ingest run, workflow
+    engine and eval case in the process. As a result, TLS handshakes and
+    keep-alive connections are paid once rather than per call site. Async
+    adapters are kept per event loop, since their connections belong to the
+    loop that opened them; they are dropped with the loop.
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[Tuple[Any, ...], _Entry] = {}
+        self._loop_entries: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[Any, ...], _Entry]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(llm_cfg: LLMConfig, asynchronous: bool) -> Tuple[Any, ...]:
+        return (
+            llm_cfg.provider,
+            asynchronous,
+            RateLimits.from_llm_config(llm_cfg),
+            tuple(llm_cfg.http.model_dump().items()),
+            tuple(llm_cfg.fake.model_dump().items()),
+        )
+
+    def get(self, llm_cfg: LLMConfig, *, asynchronous: bool = False) -> Any:
+        key = self._key(llm_cfg, asynchronous)
+        loop = None
+        if asynchronous:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                pass
+        with self._lock:
+            # Keyed on the loop object, not its id: ids are reused once a closed loop is collected.
+            entries = self._entries if loop is None else self._loop_entries.setdefault(loop, {})
+            entry = entries.get(key)
+            if entry is None:
+                entry = entries[key] = self._build(llm_cfg, asynchronous)
+            return entry.adapter
+
+    def _build(self, llm_cfg: LLMConfig, asynchronous: bool) -> _Entry:
+        if llm_cfg.provider == "stub":
+            return _Entry(adapter=OpenAIAdapterStub())
+        if llm_cfg.provider == "fake":
+            return _Entry(adapter=FakeAdapter(FakeBackend(llm_cfg.fake), RateLimits.from_llm_config(llm_cfg)))
+        if llm_cfg.provider != "openai":
+            raise ValueError(f"Unknown LLM provider: {llm_cfg.provider!r} (expected 'openai', 'fake' or 'stub')")
+
+        limits = RateLimits.from_llm_config(llm_cfg)
+        try:
+            import httpx
+        except ImportError:
+            # No pooled client of our own: the SDK's default client (and its pool) is used.
+            adapter_cls: Any = AsyncOpenAIAdapter if asynchronous else OpenAIAdapter
+            return _Entry(adapter=adapter_cls(limits=limits))
+        opts = _httpx_options(llm_cfg.http)
+        stats = ConnectionStats()
+        if asynchronous:
+            client = httpx.AsyncClient(**opts, event_hooks={"response": [stats.arecord]})
+            adapter: Any = AsyncOpenAIAdapter(limits=limits, http_client=client, timeout=opts["timeout"])
+        else:
+            client = httpx.Client(**opts, event_hooks={"response": [stats.record]})
+            adapter = OpenAIAdapter(limits=limits, http_client=client, timeout=opts["timeout"])
+        return _Entry(adapter=adapter, client=client, stats=stats)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Connection reuse per pooled adapter, e.g. {"openai": {"requests": 40, "connections": 2, "reused": 38}}."""
+        out: Dict[str, Dict[str, int]] = {}
+        with self._lock:
+            items = list(self._entries.items())
+            for entries in self._loop_entries.values():
+                items += entries.items()
+            for (provider, asynchronous, *_), entry in items:
+                if entry.stats is None:
+                    continue
+                totals = out.setdefault(provider + (":async" if asynchronous else ""), dict.fromkeys(("requests", "connections", "reused"), 0))
+                for k, v in entry.stats.as_dict().items():
+                    totals[k] += v
+        return out
+
+    def close(self) -> None:
+        """Close pooled sync clients and forget all adapters (async clients are left to their loop)."""
+        with self._lock:
+            entries, self._entries = list(self._entries.values()), {}
+            self._loop_entries.clear()
+        for entry in entries:
+            close = getattr(entry.client, "close", None)
+            if close is not None:
+                close()
+
+
+default_registry = AdapterRegistry()
+
+
+def get_adapter(llm_cfg: LLMConfig, *, asynchronous: bool = False) -> Any:
+    """Shared adapter for llm_cfg from the process-wide registry."""
+    return default_registry.get(llm_cfg, asynchronous=asynchronous)
+
+
+def connection_stats() -> Dict[str, Dict[str, int]]:
+    return default_registry.stats()
+
+
+def stats_line(stats: Dict[str, Dict[str, int]]) -> str:
+    return ", ".join(f"{name}: {s['requests']} requests over {s['connections']} connections" for name, s in stats.items())
+
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import math
+import re
+from functools import lru_cache
+from typing import Any, Optional
+
+# Context windows (prompt + completion) by model prefix; longest matching prefix wins.
+MODEL_CONTEXT_WINDOWS = {
+    "gpt-4.1": 1_047_576,
+    "gpt-4o": 128_000,
+    "gpt-4-turbo": 128_000,
+    "gpt-4": 8_192,
+    "gpt-3.5-turbo": 16_385,
+    "gpt-5": 400_000,
+    "o1": 200_000,
+    "o3": 200_000,
+    "o4-mini": 200_000,
+}
+DEFAULT_CONTEXT_WINDOW = 128_000
+
+_piece_rx = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+
+def context_window(model: str, override: Optional[int] = None) -> int:
+    if override:
+        return override
+    best = ""
+    for prefix in MODEL_CONTEXT_WINDOWS:
+        if model.startswith(prefix) and len(prefix) > len(best):
+            best = prefix
+    return MODEL_CONTEXT_WINDOWS[best] if best else DEFAULT_CONTEXT_WINDOW
+
+
+@lru_cache(maxsize=None)
+def _encoding(model: str) -> Any:
+    """tiktoken encoding for model, or None when tiktoken is not installed."""
+    try:
+        import tiktoken  # type: ignore
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def _approx_tokens(text: str) -> int:
+    # BPE tokenizers spend about one token per short word or punctuation mark and
+    # roughly one per four characters of longer words.
+    return sum(max(1, math.ceil(len(p) / 4)) for p in _piece_rx.findall(text))
+
+
+def count_tokens_uncached(text: str, model: str = "") -> int:
+    """Token count for text under model's tokenizer.
+
+    Uses tiktoken when it is installed, otherwise a local approximation.
+    """
+    if not text:
+        return 0
+    enc = _encoding(model)
+    if enc is None:
+        return _approx_tokens(text)
+    return len(enc.encode(text, disallowed_special=()))
+
+
+@lru_cache(maxsize=8192)
+def count_tokens(text: str, model: str = "") -> int:
+    """Cached count_tokens_uncached; prompt sections recur across agents and beats."""
+    return count_tokens_uncached(text, model)
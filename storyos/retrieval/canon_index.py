@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, ClassVar, Dict, Iterable, List, Tuple
+
+from storyos.core.hashing import sha256_bytes
+from storyos.core.workspace import Workspace
+
+INDEX_VERSION = 1
+
+_word_rx = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+_heading_rx = re.compile(r"^(#{1,6})\s+(.*)$")
+_bullet_rx = re.compile(r"^[-*+]\s+|^\d+[.)]\s+")
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have he her his i if in into is it its of on or she so "
+    "than that the their them then there they this to was were what when which who will with you".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _word_rx.findall(text.lower()) if t not in STOPWORDS]
+
+
+@dataclass(frozen=True)
+class Passage:
+    path: str       # workspace-relative file
+    heading: str    # "Title › Section" the passage sits under
+    line: int       # 1-based first line
+    text: str
+
+    def render(self) -> str:
+        where = f"{self.path} › {self.heading}" if self.heading else self.path
+        return f"[{where}, L{self.line}]\n{self.text}"
+
+
+def split_passages(rel_path: str, text: str) -> List[Passage]:
+    """Split markdown at headings, top-level bullets and blank-line paragraphs.
+
+    Indented lines stay with the bullet above them (evidence, sub-points). Italic
+    stamp lines such as "_Approved: ..._" carry no content and are dropped.
+    """
+    out: List[Passage] = []
+    title, section = "", ""
+    buf: List[str] = []
+    start = 0
+
+    def flush() -> None:
+        body = "".join(buf).strip()
+        if body and not (body.startswith("_") and body.endswith("_") and "\n" not in body):
+            heading = " › ".join(h for h in (title, section) if h)
+            out.append(Passage(rel_path, heading, start, body))
+        buf.clear()
+
+    for i, line in enumerate(text.splitlines(keepends=True), start=1):
+        stripped = line.strip()
+        m = _heading_rx.match(stripped)
+        if m:
+            flush()
+            if len(m.group(1)) == 1:
+                title, section = m.group(2).strip(), ""
+            else:
+                section = m.group(2).strip()
+            continue
+        if not stripped:
+            flush()
+            continue
+        if _bullet_rx.match(line) or not buf:
+            flush()
+            start = i
+        buf.append(line)
+    flush()
+    return out
+
+
+class CanonIndex:
+    """On-disk BM25 index over canon and character markdown.
+
+    Files are tracked by (mtime_ns, size) and then sha256, so refresh() only re-splits
+    files whose content changed. One instance per workspace root is shared in-process
+    (see for_workspace), so concurrent runs reuse the loaded postings.
+    """
+
+    k1 = 1.5
+    b = 0.75
+
+    _instances: ClassVar[Dict[Path, "CanonIndex"]] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, root: Path, index_path: Path, sources: List[str]):
+        self.root = root
+        self.index_path = index_path
+        self.sources = sources
+        self._lock = threading.Lock()
+        self._files: Dict[str, Dict[str, Any]] = {}
+        self._passages: List[Passage] = []
+        self._lengths: List[int] = []
+        self._sizes: List[int] = []  # UTF-8 bytes of each passage's render()
+        self._file_bytes: Dict[str, int] = {}  # rendered bytes of all of a file's passages
+        self._total_bytes = 0
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        self._avgdl = 0.0
+        self._load()
+
+    @classmethod
+    def for_workspace(cls, ws: Workspace) -> "CanonIndex":
+        r = ws.config.retrieval
+        with cls._instances_lock:
+            inst = cls._instances.get(ws.root)
+            if inst is None or inst.sources != list(r.sources):
+                inst = cls(ws.root, ws.safe_path(r.index_path), list(r.sources))
+                cls._instances[ws.root] = inst
+        return inst
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if data.get("version") == INDEX_VERSION:
+            self._files = data.get("files") or {}
+            self._rebuild_postings()
+
+    def _save(self) -> None:
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"version": INDEX_VERSION, "files": self._files}, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.index_path)
+
+    def _rebuild_postings(self) -> None:
+        passages: List[Passage] = []
+        lengths: List[int] = []
+        sizes: List[int] = []
+        file_bytes: Dict[str, int] = {}
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        for rel in sorted(self._files):
+            for p in self._files[rel]["passages"]:
+                pid = len(passages)
+                passages.append(Passage(rel, p["heading"], p["line"], p["text"]))
+                lengths.append(p["len"])
+                sizes.append(len(passages[pid].render().encode("utf-8")))
+                file_bytes[rel] = file_bytes.get(rel, 0) + sizes[pid]
+                for term, tf in p["tf"].items():
+                    postings.setdefault(term, []).append((pid, tf))
+        self._passages, self._lengths, self._postings = passages, lengths, postings
+        self._sizes, self._file_bytes, self._total_bytes = sizes, file_bytes, sum(sizes)
+        self._avgdl = (sum(lengths) / len(lengths)) if lengths else 0.0
+
+    def refresh(self) -> bool:
+        """Bring the index up to date with the source files; returns True if anything changed."""
+        with self._lock:
+            seen: Dict[str, Path] = {}
+            for pattern in self.sources:
+                for path in sorted(self.root.glob(pattern)):
+                    if path.is_file():
+                        seen[path.relative_to(self.root).as_posix()] = path
+
+            changed = False
+            for rel in list(self._files):
+                if rel not in seen:
+                    del self._files[rel]
+                    changed = True
+
+            for rel, path in seen.items():
+                st = path.stat()
+                entry = self._files.get(rel)
+                if entry and entry["mtime_ns"] == st.st_mtime_ns and entry["size"] == st.st_size:
+                    continue
+                data = path.read_bytes()
+                digest = sha256_bytes(data)
+                if entry and entry["sha256"] == digest:
+                    entry["mtime_ns"], entry["size"] = st.st_mtime_ns, st.st_size
+                    changed = True
+                    continue
+                passages = []
+                for p in split_passages(rel, data.decode("utf-8", errors="replace")):
+                    terms = tokenize(f"{p.heading} {p.text}")
+                    passages.append({
+                        "heading": p.heading, "line": p.line, "text": p.text,
+                        "len": len(terms), "tf": dict(Counter(terms)),
+                    })
+                self._files[rel] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "sha256": digest, "passages": passages}
+                changed = True
+
+            if changed:
+                self._rebuild_postings()
+                self._save()
+            return changed
+
+    def search(
+        self, query: str, *, top_k: int = 12, max_bytes: int = 24 * 1024, exclude: Iterable[str] = ()
+    ) -> List[Passage]:
+        """Top-k BM25 passages for query whose rendered text fits within max_bytes, best first.
+
+        Passages from files listed in exclude (workspace-relative) are skipped.
+        """
+        skip = set(exclude)
+        with self._lock:
+            n = len(self._passages)
+            if not n:
+                return []
+            if self._total_bytes - sum(self._file_bytes.get(rel, 0) for rel in skip) <= max_bytes:
+                # Small canon: everything fits, so keep it all in document order.
+                return [p for p in self._passages if p.path not in skip]
+            scores: Dict[int, float] = {}
+            for term in dict.fromkeys(tokenize(query)):  # BM25 ignores query term frequency
+                plist = self._postings.get(term)
+                if not plist:
+                    continue
+                idf = math.log(1 + (n - len(plist) + 0.5) / (len(plist) + 0.5))
+                for pid, tf in plist:
+                    norm = tf + self.k1 * (1 - self.b + self.b * self._lengths[pid] / (self._avgdl or 1.0))
+                    scores[pid] = scores.get(pid, 0.0) + idf * tf * (self.k1 + 1) / norm
+            ranked = sorted(scores, key=lambda pid: (-scores[pid], pid))
+            hits: List[Passage] = []
+            used = 0
+            for pid in ranked:
+                if len(hits) >= top_k:
+                    break
+                if self._passages[pid].path in skip:
+                    continue
+                size = self._sizes[pid]
+                if used + size > max_bytes:
+                    continue
+                hits.append(self._passages[pid])
+                used += size
+            return hits
@@ -1,22 +1,275 @@
 from __future__ import annotations
+import mmap
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from types import TracebackType
+from typing import Any, BinaryIO, Callable, Dict, Iterator, Optional, Union
 from storyos.tools.base import ToolError
+from storyos.core.file_cache import FileContentCache, FileTooLarge
+from storyos.core.runlog import FileAccessRecord, RunLog, ToolInvocationRecord
 from storyos.core.workspace import Workspace
 
+# Uncached reads of files at least this big are memory-mapped instead of read into a buffer.
+MMAP_MIN_BYTES = 1024 * 1024
+# write_file encodes and writes content in slices of this many characters.
+WRITE_CHUNK_CHARS = 256 * 1024
+
+Buffer = Union[bytes, mmap.mmap]
+
+class StreamWriter:
+    """Incremental text writer that enforces a byte limit as it goes.
+
+    By default it writes the file in place and flushes each write, so the file
+    can be tailed. With ``commit_to`` set it writes a temp file instead, which
+    is fsynced and renamed over ``commit_to`` when the writer closes cleanly and
+    deleted when it closes on an exception. Readers see either the old file or
+    the complete new one; the new one keeps the old one's permissions.
+    """
+
+    def __init__(
+        self,
+        fh: BinaryIO,
+        rel_path: str,
+        max_bytes: int,
+        on_close: Optional[Callable[["StreamWriter"], None]] = None,
+        commit_to: Optional[Path] = None,
+    ):
+        self._fh = fh
+        self.rel_path = rel_path
+        self.max_bytes = max_bytes
+        self.bytes_written = 0
+        self._on_close = on_close
+        self._commit_to = commit_to
+        self.error: BaseException | None = None  # set when the with-block exits on an exception
+
+    def write(self, text: str) -> None:
+        data = text.encode("utf-8")
+        if self.bytes_written + len(data) > self.max_bytes:
+            raise ToolError(f"write_file too large: {self.rel_path} (over {self.max_bytes} bytes)")
+        self._fh.write(data)
+        if self._commit_to is None:
+            self._fh.flush()
+        self.bytes_written += len(data)
+
+    def close(self) -> None:
+        if self._fh.closed:
+            return
+        if self._commit_to is None:
+            self._fh.close()
+        else:
+            tmp = Path(self._fh.name)
+            try:
+                if self.error is None:
+                    self._fh.flush()
+                    os.fsync(self._fh.fileno())
+            finally:
+                self._fh.close()
+            if self.error is None:
+                try:
+                    if self._commit_to.exists():
+                        shutil.copymode(self._commit_to, tmp)
+                    os.replace(tmp, self._commit_to)
+                except BaseException:
+                    tmp.unlink(missing_ok=True)
+                    raise
+                _fsync_dir(self._commit_to.parent)
+            else:
+                tmp.unlink(missing_ok=True)
+        if self._on_close is not None:
+            on_close, self._on_close = self._on_close, None
+            on_close(self)
+
+    def __enter__(self) -> "StreamWriter":
+        return self
+
+    def __exit__(
+        self, exc_type: type[BaseException] | None, exc: BaseException | None, tb: TracebackType | None
+    ) -> None:
+        self.error = exc
+        self.close()
+
+
+def _fsync_dir(path: Path) -> None:
+    # Makes the rename itself durable; directories can't be opened for fsync on Windows.
+    if os.name != "posix":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+@contextmanager
+def _mapped(path: Path, size: int) -> Iterator[Buffer]:
+    with open(path, "rb") as fh:
+        if size == 0:  # mmap rejects empty files
+            yield b""
+            return
+        mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield mm
+        finally:
+            mm.close()
+
 class FileTools:
-    def __init__(self, ws: Workspace):
+    """Workspace file operations; with a runlog, each one is recorded as a span and a tool invocation.
+
+    Reads stat the file first, so anything over the limit is rejected before a
+    byte is read. Files small enough go through the workspace's
+    FileContentCache (unless cache.files.max_mb is 0), so every FileTools for
+    the same project shares one copy of each. Bigger files are memory-mapped and
+    decoded straight from the map. Writes are atomic: a temp file is renamed
+    over the target once complete.
+    """
+
+    def __init__(self, ws: Workspace, runlog: RunLog | None = None):
         self.ws = ws
+        self.runlog = runlog
+        self.cache = FileContentCache.for_workspace(ws) if ws.config.cache.files.max_mb > 0 else None
+
+    def _record(self, tool: str, rel_path: str, attrs: Dict[str, Any], seconds: float | None, error: BaseException | None) -> None:
+        if self.runlog is None:
+            return
+        nbytes = attrs.get("bytes_read", attrs.get("bytes_written"))
+        action = {"read_file": "read", "read_range": "read", "write_file": "write", "open_stream": "write"}.get(tool)
+        access = FileAccessRecord(path=rel_path, action=action, bytes=nbytes) if action and error is None else None
+        self.runlog.record_tool(
+            ToolInvocationRecord(tool=tool, args={"path": rel_path}, ok=error is None,
+                                 error=None if error is None else str(error), seconds=seconds, bytes=nbytes),
+            access,
+        )
+
+    @contextmanager
+    def _traced(self, tool: str, rel_path: str) -> Iterator[Dict[str, Any]]:
+        if self.runlog is None:
+            yield {}
+            return
+        span = self.runlog.start_span(f"{tool} {rel_path}", "file", path=rel_path)
+        try:
+            yield span.attrs
+        except BaseException as e:
+            self.runlog.end_span(span, e)
+            self._record(tool, rel_path, span.attrs, span.seconds, e)
+            raise
+        self.runlog.end_span(span)
+        self._record(tool, rel_path, span.attrs, span.seconds, None)
+
+    # --- reads ------------------------------------------------------------------
+
+    def read_bytes(self, rel_path: str, max_bytes: int) -> bytes:
+        """File contents; cached contents are shared, not copied (bytes are immutable)."""
+        with self._traced("read_file", rel_path) as attrs, self._buffer(rel_path, max_bytes, attrs) as buf:
+            return buf if isinstance(buf, bytes) else buf[:]
 
     def read_file(self, rel_path: str, max_bytes: int) -> str:
+        with self._traced("read_file", rel_path) as attrs, self._buffer(rel_path, max_bytes, attrs) as buf:
+            return str(buf, "utf-8", "replace")
+
+    def read_range(self, rel_path: str, offset: int, length: int, max_bytes: int) -> bytes:
+        """Up to ``length`` bytes from ``offset``, without reading the rest of the file."""
+        if offset < 0 or length < 0:
+            raise ToolError(f"read_range: negative offset or length for {rel_path}")
+        if length > max_bytes:
+            raise ToolError(f"read_range too large: {rel_path} ({length} bytes)")
+        with self._traced("read_range", rel_path) as attrs:
+            path = self.ws.safe_path(rel_path)
+            size = path.stat().st_size
+            end = min(offset + length, size)
+            if offset >= end:
+                data = b""
+            elif size >= MMAP_MIN_BYTES:
+                with _mapped(path, size) as mm:
+                    data = mm[offset:end]
+            else:
+                with open(path, "rb") as fh:
+                    fh.seek(offset)
+                    data = fh.read(end - offset)
+            attrs["offset"] = offset
+            attrs["bytes_read"] = len(data)
+            return data
+
+    @contextmanager
+    def _buffer(self, rel_path: str, max_bytes: int, attrs: Dict[str, Any]) -> Iterator[Buffer]:
         path = self.ws.safe_path(rel_path)
-        data = path.read_bytes()
+        size = path.stat().st_size
+        if size > max_bytes:
+            raise ToolError(f"read_file too large: {rel_path} ({size} bytes)")
+        if self.cache is not None and self.cache.cacheable(size):
+            try:
+                data, hit = self.cache.get(path, max_bytes)
+            except FileTooLarge as e:  # grew since the stat
+                raise ToolError(f"read_file too large: {rel_path} ({e.size} bytes)") from None
+            attrs["cache"] = "hit" if hit else "miss"
+            if self.runlog is not None:
+                self.runlog.count_file_cache(hit)
+            attrs["bytes_read"] = len(data)
+            yield data
+            return
+        if size >= MMAP_MIN_BYTES:
+            with _mapped(path, size) as mm:
+                if len(mm) > max_bytes:
+                    raise ToolError(f"read_file too large: {rel_path} ({len(mm)} bytes)")
+                attrs["mmap"] = True
+                attrs["bytes_read"] = len(mm)
+                yield mm
+            return
+        with open(path, "rb") as fh:
+            data = fh.read(max_bytes + 1)  # bounded even if the file grew since the stat
         if len(data) > max_bytes:
-            raise ToolError(f"read_file too large: {rel_path} ({len(data)} bytes)")
-        return data.decode("utf-8", errors="replace")
+            raise ToolError(f"read_file too large: {rel_path} (over {max_bytes} bytes)")
+        attrs["bytes_read"] = len(data)
+        yield data
+
+    # --- writes -----------------------------------------------------------------
+
+    def _invalidate(self, path: Path) -> None:
+        # mtime alone can miss a rewrite within the filesystem's timestamp granularity.
+        if self.cache is not None:
+            self.cache.invalidate(path)
+
+    def _temp_for(self, path: Path) -> Path:
+        return path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
 
     def write_file(self, rel_path: str, content: str, max_bytes: int) -> None:
-        data = content.encode("utf-8")
-        if len(data) > max_bytes:
-            raise ToolError(f"write_file too large: {rel_path} ({len(data)} bytes)")
+        """Atomically replace rel_path with content; the limit is checked slice by slice as it is written."""
+        with self._traced("write_file", rel_path) as attrs:
+            if len(content) > max_bytes:  # each char is at least one byte
+                raise ToolError(f"write_file too large: {rel_path} ({len(content)} chars)")
+            path = self.ws.safe_path(rel_path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self._temp_for(path)
+            with StreamWriter(tmp.open("wb"), rel_path, max_bytes, commit_to=path) as w:
+                for i in range(0, len(content), WRITE_CHUNK_CHARS):
+                    w.write(content[i:i + WRITE_CHUNK_CHARS])
+            self._invalidate(path)
+            attrs["bytes_written"] = w.bytes_written
+
+    def open_stream(self, rel_path: str, max_bytes: int, atomic: bool = False) -> StreamWriter:
+        """A StreamWriter for rel_path: in place and tail-able, or with atomic=True, published only when closed cleanly."""
         path = self.ws.safe_path(rel_path)
         path.parent.mkdir(parents=True, exist_ok=True)
-        path.write_bytes(data)
+        self._invalidate(path)
+        fh = self._temp_for(path).open("wb") if atomic else path.open("wb")
+        commit_to = path if atomic else None
+        if self.runlog is None:
+            return StreamWriter(fh, rel_path, max_bytes, on_close=lambda w: self._invalidate(path), commit_to=commit_to)
+        # The span stays open until the writer is closed.
+        runlog = self.runlog
+        span = runlog.start_span(f"open_stream {rel_path}", "file", path=rel_path, atomic=atomic)
+
+        def _closed(w: StreamWriter) -> None:
+            self._invalidate(path)
+            span.attrs["bytes_written"] = w.bytes_written
+            runlog.end_span(span, w.error)
+            self._record("open_stream", rel_path, span.attrs, span.seconds, w.error)
+
+        return StreamWriter(fh, rel_path, max_bytes, on_close=_closed, commit_to=commit_to)
+
+    def remove_file(self, rel_path: str) -> None:
+        with self._traced("remove_file", rel_path):
+            path = self.ws.safe_path(rel_path)
+            path.unlink(missing_ok=True)
+            self._invalidate(path)
@@ -0,0 +1,136 @@
+from __future__ import annotations
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import yaml
+
+from storyos.workflow.engine import WorkflowEngine
+
+_range_rx = re.compile(r"^(?P<prefix>.*?)(?P<start>\d+)\s*(?:-|\.\.)\s*(?:(?P<prefix2>.*?)(?P<end>\d+))$")
+
+
+class BatchError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class BatchItem:
+    chapter: str
+    beat: str
+
+
+@dataclass
+class BatchOutcome:
+    item: BatchItem
+    run_id: str | None = None
+    outputs: Dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def expand_ids(spec: str) -> List[str]:
+    """Expand "beat_01-beat_04", "beat_01..04" or "beat_01,beat_03" into ids, keeping zero padding."""
+    out: List[str] = []
+    for part in (p.strip() for p in spec.split(",")):
+        if not part:
+            continue
+        m = _range_rx.match(part)
+        if not m or (m.group("prefix2") and m.group("prefix2") != m.group("prefix")):
+            out.append(part)
+            continue
+        start, end = int(m.group("start")), int(m.group("end"))
+        if end < start:
+            raise BatchError(f"Empty range: {part}")
+        width = len(m.group("start"))
+        out.extend(f"{m.group('prefix')}{i:0{width}d}" for i in range(start, end + 1))
+    return out
+
+
+def items_from_ranges(chapters: str, beats: str) -> List[BatchItem]:
+    return [BatchItem(c, b) for c in expand_ids(chapters) for b in expand_ids(beats)]
+
+
+def load_manifest(path: str) -> List[BatchItem]:
+    """Read a batch manifest.
+
+    Either a list or a mapping with an ``items`` list; each entry has a ``chapter`` and
+    either ``beat`` or ``beats`` (a list or a range string like "beat_01-beat_06").
+    """
+    raw = yaml.safe_load(Path(path).read_text(encoding="utf-8")) or []
+    entries = raw.get("items", []) if isinstance(raw, dict) else raw
+    items: List[BatchItem] = []
+    for e in entries:
+        if not isinstance(e, dict) or not e.get("chapter"):
+            raise BatchError(f"Manifest entry needs a chapter: {e!r}")
+        beats = e.get("beats", e.get("beat"))
+        if beats is None:
+            raise BatchError(f"Manifest entry needs beat or beats: {e!r}")
+        for spec in (beats if isinstance(beats, list) else [beats]):
+            items.extend(BatchItem(c, b) for c in expand_ids(str(e["chapter"])) for b in expand_ids(str(spec)))
+    return items
+
+
+def run_batch(
+    engine: WorkflowEngine,
+    items: List[BatchItem],
+    *,
+    workers: int = 4,
+    resume: bool = True,
+    on_progress: Optional[Callable[[BatchOutcome, int, int], None]] = None,
+) -> List[BatchOutcome]:
+    """Draft many beats through one engine on a bounded worker pool.
+
+    Config, workspace, plugin registry, LLM cache and canon index are shared through
+    the engine; beat-independent (shareable) steps run once up front and are reused.
+    A failing beat is reported in its outcome and does not stop the batch.
+    """
+    preloaded = engine.preload()
+
+    def _one(item: BatchItem) -> BatchOutcome:
+        t0 = time.perf_counter()
+        try:
+            result = engine.run(chapter=item.chapter, beat=item.beat, preloaded=preloaded, resume=resume)
+        except Exception as e:
+            return BatchOutcome(item=item, error=f"{type(e).__name__}: {e}", seconds=time.perf_counter() - t0)
+        return BatchOutcome(item=item, run_id=result.run_id, outputs=result.outputs, seconds=time.perf_counter() - t0)
+
+    outcomes: Dict[int, BatchOutcome] = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(_one, item): i for i, item in enumerate(items)}
+        for fut in as_completed(futures):
+            outcome = fut.result()
+            outcomes[futures[fut]] = outcome
+            if on_progress is not None:
+                on_progress(outcome, len(outcomes), len(items))
+    return [outcomes[i] for i in range(len(items))]
+
+
+def summary_yaml(batch_id: str, outcomes: List[BatchOutcome], wall_seconds: float) -> str:
+    ok = [o for o in outcomes if o.ok]
+    doc = {
+        "batch_id": batch_id,
+        "beats": len(outcomes),
+        "succeeded": len(ok),
+        "failed": len(outcomes) - len(ok),
+        "wall_seconds": round(wall_seconds, 3),
+        "items": [
+            {
+                "chapter": o.item.chapter,
+                "beat": o.item.beat,
+                "run_id": o.run_id,
+                "seconds": round(o.seconds, 3),
+                "draft_path": o.outputs.get("draft_path"),
+                "error": o.error,
+            }
+            for o in outcomes
+        ],
+    }
+    return yaml.safe_dump(doc, sort_keys=False, allow_unicode=True)
@@ -0,0 +1,85 @@
+from __future__ import annotations
+import inspect
+import json
+import os
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from storyos.config import LLM_TRANSPORT_FIELDS, ProjectConfig
+from storyos.core.hashing import sha256_file, sha256_json
+from storyos.core.workspace import Workspace
+from storyos.llm.base import adapter_namespace
+from storyos.paths import _slugify
+from storyos.plugins.loader import load_entrypoint
+from storyos.plugins.registry import PluginRegistry
+from storyos.workflow.steps import StepSpec
+
+# ctx entries that are live objects rather than step inputs.
+_UNHASHED_KEYS = frozenset({"policy", "runlog", "llm"})
+
+
+@lru_cache(maxsize=None)
+def _source_digest(path: str) -> str:
+    return sha256_file(Path(path))
+
+
+def code_fingerprint(spec: StepSpec, registry: PluginRegistry) -> Dict[str, str]:
+    """Digest of the code that produces a step's output: the step function and its agent plugin."""
+    fp = {"step": _source_digest(inspect.getsourcefile(spec.fn) or "")}
+    if spec.plugin:
+        manifest = registry.get(spec.plugin)
+        fp["plugin"] = f"{manifest.id}@{manifest.version}"
+        fp["plugin_source"] = _source_digest(inspect.getsourcefile(load_entrypoint(manifest.entrypoint)) or "")
+    return fp
+
+
+def step_input_hash(spec: StepSpec, cfg: ProjectConfig, registry: PluginRegistry, ctx: Dict[str, Any]) -> str:
+    """Hash everything a step's output depends on: declared ctx inputs, config slice, code and adapter."""
+    reads = spec.reads | spec.optional_reads
+    keys = sorted(reads - _UNHASHED_KEYS)
+    return sha256_json({
+        "step": spec.name,
+        "inputs": {k: ctx.get(k) for k in keys},
+        "config": {"project": cfg.project.model_dump(), "llm": cfg.llm.model_dump(exclude=set(LLM_TRANSPORT_FIELDS))},
+        "code": code_fingerprint(spec, registry),
+        # Output of the stub or fake adapter must not be restored for a real model.
+        "adapter": adapter_namespace(ctx.get("llm")) if "llm" in reads else None,
+    })
+
+
+@dataclass
+class CheckpointStore:
+    """Per chapter/beat step outputs, stored as <root>/<chapter>__<beat>/<step>.json."""
+
+    root: Path
+
+    @classmethod
+    def for_workspace(cls, ws: Workspace) -> "CheckpointStore":
+        return cls(ws.safe_path(".storyos/checkpoints"))
+
+    def _path(self, chapter: str, beat: str, step: str) -> Path:
+        return self.root / f"{_slugify(chapter, 60)}__{_slugify(beat, 60)}" / f"{step}.json"
+
+    def load(self, chapter: str, beat: str, step: str, input_hash: str) -> Optional[Dict[str, Any]]:
+        """Return the saved outputs if the step last ran with exactly these inputs."""
+        try:
+            data = json.loads(self._path(chapter, beat, step).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get("input_hash") != input_hash:
+            return None
+        outputs = data.get("outputs")
+        return outputs if isinstance(outputs, dict) else None
+
+    def save(self, chapter: str, beat: str, step: str, input_hash: str, outputs: Dict[str, Any], run_id: str) -> None:
+        path = self._path(chapter, beat, step)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(
+            json.dumps({"input_hash": input_hash, "run_id": run_id, "outputs": outputs}, ensure_ascii=False, default=str),
+            encoding="utf-8",
+        )
+        os.replace(tmp, path)
@@ -0,0 +1,70 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Mapping, Set
+
+from storyos.workflow.steps import StepSpec
+
+# ctx keys the engine provides before the first step runs.
+BASE_KEYS: FrozenSet[str] = frozenset({"chapter", "beat", "policy", "runlog", "llm"})
+
+
+class WorkflowError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class StepGraph:
+    """Configured steps plus, for each, the earlier steps it must wait for."""
+
+    order: List[str]
+    specs: Dict[str, StepSpec]
+    deps: Dict[str, FrozenSet[str]]
+
+    @staticmethod
+    def build(step_names: List[str], specs: Mapping[str, StepSpec], base_keys: FrozenSet[str] = BASE_KEYS) -> "StepGraph":
+        """Validate the step list and derive dependencies from declared reads/writes.
+
+        Raises WorkflowError for unknown or repeated steps, for a step that reads a key
+        only a later step writes, and for a required read nothing earlier provides.
+        """
+        unknown = [n for n in step_names if n not in specs]
+        if unknown:
+            raise WorkflowError(f"Unknown workflow step(s): {', '.join(unknown)} (known: {', '.join(specs)})")
+        repeated = sorted({n for n in step_names if step_names.count(n) > 1})
+        if repeated:
+            raise WorkflowError(f"Workflow step(s) listed more than once: {', '.join(repeated)}")
+
+        chosen = {n: specs[n] for n in step_names}
+        writer_of: Dict[str, str] = {}
+        for n in step_names:
+            for key in chosen[n].writes:
+                writer_of.setdefault(key, n)
+
+        deps: Dict[str, FrozenSet[str]] = {}
+        for i, n in enumerate(step_names):
+            spec = chosen[n]
+            earlier = step_names[:i]
+            for key in sorted(spec.reads | spec.optional_reads):
+                producer = writer_of.get(key)
+                if producer is not None and producer not in earlier:
+                    raise WorkflowError(
+                        f"Step '{n}' reads '{key}', which is only written by later step '{producer}'"
+                    )
+                if key in spec.reads and producer is None and key not in base_keys:
+                    raise WorkflowError(f"Step '{n}' reads '{key}', but no earlier step writes it")
+
+            mine = spec.reads | spec.optional_reads | spec.writes
+            wait: Set[str] = set()
+            for m in earlier:
+                other = chosen[m]
+                if spec.barrier or other.barrier:
+                    wait.add(m)
+                elif other.writes & mine or (other.reads | other.optional_reads) & spec.writes:
+                    wait.add(m)
+            deps[n] = frozenset(wait)
+
+        return StepGraph(order=list(step_names), specs=chosen, deps=deps)
+
+    def ready(self, done: Set[str], started: Set[str]) -> List[str]:
+        """Steps not yet started whose dependencies are all done, in configured order."""
+        return [n for n in self.order if n not in started and self.deps[n] <= done]
@@ -1,24 +1,23 @@
 from __future__ import annotations
+import asyncio
+import sqlite3
 import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass
-from typing import Dict, Any
+from typing import Callable, Dict, Any, Optional, Tuple
 from storyos.config import ProjectConfig
 from storyos.core.policy import Policy
-from storyos.core.runlog import RunLog
+from storyos.core.runlog import RunLog, compact_journal
+from storyos.core.runs_index import RunsIndex
 from storyos.core.workspace import Workspace
+from storyos.llm.base import LLMAdapter
+from storyos.llm.cache import CachingLLMAdapter, LLMCache
 from storyos.llm.openai_adapter_stub import OpenAIAdapterStub
+from storyos.llm.registry import get_adapter
 from storyos.plugins.registry import PluginRegistry
-from storyos.workflow.steps import (
-    load_context_step,
-    retrieve_canon_step,
-    plan_beat_step,
-    draft_beat_step,
-    continuity_check_step,
-    voice_pass_step,
-    user_review_gate_step,
-    write_outputs_step,
-    write_runlog_step,
-)
+from storyos.workflow.checkpoints import CheckpointStore, step_input_hash
+from storyos.workflow.dag import StepGraph
+from storyos.workflow.steps import STEPS, StepSpec
 
 @dataclass
 class RunResult:
@@ -26,15 +25,23 @@ class RunResult:
     outputs: Dict[str, Any]
 
 class WorkflowEngine:
-    def __init__(self, cfg: ProjectConfig, ws: Workspace):
+    def __init__(self, cfg: ProjectConfig, ws: Workspace, llm: Any | None = None):
         self.cfg = cfg
         self.ws = ws
         self.registry = PluginRegistry.builtin()
-        self.llm = OpenAIAdapterStub()
+        # Without an adapter the engine drafts offline: the echo stub, or the
+        # configurable fake when llm.provider is "fake"/"stub".
+        if llm is None:
+            llm = OpenAIAdapterStub() if cfg.llm.provider == "openai" else get_adapter(cfg.llm)
+        self.llm: LLMAdapter = llm
+        self.llm_cache = LLMCache.for_workspace(ws)
+        self.checkpoints = CheckpointStore.for_workspace(ws)
+        # Built up front so a misconfigured step list fails before any LLM call.
+        self.graph = StepGraph.build(list(cfg.workflow.steps), STEPS)
 
     @classmethod
-    def from_config(cls, cfg: ProjectConfig, ws: Workspace) -> "WorkflowEngine":
-        return cls(cfg, ws)
+    def from_config(cls, cfg: ProjectConfig, ws: Workspace, llm: Any | None = None) -> "WorkflowEngine":
+        return cls(cfg, ws, llm=llm)
 
     def _policy_for(self) -> Policy:
         sec = self.cfg.security
@@ -45,29 +52,191 @@ class WorkflowEngine:
             max_file_write_bytes=sec.max_file_write_kb * 1024,
         )
 
-    def run(self, chapter: str, beat: str) -> RunResult:
+    def preload(self) -> Dict[str, Any]:
+        """Run the shareable steps (e.g. retrieve_canon) once and return the ctx values they write.
+
+        Pass the result to run()/arun() as ``preloaded`` to reuse it across many beats.
+        """
+        _, ctx = self._start(chapter="", beat="")
+        for step_name in self.graph.order:
+            spec = self.graph.specs[step_name]
+            if spec.shareable:
+                spec.fn(cfg=self.cfg, ws=self.ws, registry=self.registry, ctx=ctx)
+        return {
+            key: ctx[key]
+            for step_name in self.graph.order if self.graph.specs[step_name].shareable
+            for key in self.graph.specs[step_name].writes if key in ctx
+        }
+
+    def _skip_preloaded(self, runlog: RunLog, ctx: Dict[str, Any], preloaded: Dict[str, Any] | None) -> set[str]:
+        done: set[str] = set()
+        if not preloaded:
+            return done
+        ctx.update(preloaded)
+        for step_name in self.graph.order:
+            spec = self.graph.specs[step_name]
+            if spec.writes and spec.writes <= preloaded.keys():
+                runlog.step_finished(step_name, "preloaded")
+                done.add(step_name)
+        return done
+
+    def _restore(self, spec: StepSpec, ctx: Dict[str, Any], resume: bool) -> Tuple[str | None, bool]:
+        """Reuse a checkpoint if the step's input hash is unchanged.
+
+        Returns (hash to save the step's outputs under, whether outputs were restored).
+        """
+        if not (spec.checkpoint and self.cfg.workflow.checkpoints):
+            return None, False
+        input_hash = step_input_hash(spec, self.cfg, self.registry, ctx)
+        if resume:
+            saved = self.checkpoints.load(ctx["chapter"], ctx["beat"], spec.name, input_hash)
+            if saved is not None and spec.writes <= saved.keys():
+                ctx.update({k: saved[k] for k in spec.writes})
+                return input_hash, True
+        return input_hash, False
+
+    def _save(self, spec: StepSpec, ctx: Dict[str, Any], input_hash: str | None) -> None:
+        if input_hash is not None:
+            outputs = {k: ctx[k] for k in spec.writes if k in ctx}
+            self.checkpoints.save(ctx["chapter"], ctx["beat"], spec.name, input_hash, outputs, ctx["runlog"].run_id)
+
+    def _run_step(self, spec: StepSpec, ctx: Dict[str, Any], resume: bool) -> str:
+        with ctx["runlog"].span(spec.name, "step") as span:
+            input_hash, restored = self._restore(spec, ctx, resume)
+            span.attrs["status"] = "checkpoint" if restored else "ran"
+            if restored:
+                return "checkpoint"
+            spec.fn(cfg=self.cfg, ws=self.ws, registry=self.registry, ctx=ctx)
+            self._save(spec, ctx, input_hash)
+            return "ran"
+
+    async def _arun_step(self, spec: StepSpec, ctx: Dict[str, Any], resume: bool) -> str:
+        with ctx["runlog"].span(spec.name, "step") as span:
+            input_hash, restored = self._restore(spec, ctx, resume)
+            span.attrs["status"] = "checkpoint" if restored else "ran"
+            if restored:
+                return "checkpoint"
+            await spec.afn(cfg=self.cfg, ws=self.ws, registry=self.registry, ctx=ctx)
+            self._save(spec, ctx, input_hash)
+            return "ran"
+
+    def _start(
+        self,
+        chapter: str,
+        beat: str,
+        on_progress: Optional[Callable[[str, int], None]] = None,
+        journal: bool = False,
+    ) -> Tuple[RunLog, Dict[str, Any]]:
         run_id = uuid.uuid4().hex[:12]
-        runlog = RunLog.new(run_id)
+        runlog = RunLog.new(run_id, chapter=chapter, beat=beat)
         runlog.model = self.cfg.llm.model
+        if journal:
+            runlog.open_journal(self.ws.safe_path(f"05_RUNS/{run_id}.jsonl"))
 
         policy = self._policy_for()
-        ctx: Dict[str, Any] = {"chapter": chapter, "beat": beat, "policy": policy, "runlog": runlog, "llm": self.llm}
-
-        step_map = {
-            "load_context": load_context_step,
-            "retrieve_canon": retrieve_canon_step,
-            "plan_beat": plan_beat_step,
-            "draft_beat": draft_beat_step,
-            "continuity_check": continuity_check_step,
-            "voice_pass": voice_pass_step,
-            "user_review_gate": user_review_gate_step,
-            "write_outputs": write_outputs_step,
-            "write_runlog": write_runlog_step,
-        }
+        llm = CachingLLMAdapter(self.llm, self.llm_cache, runlog=runlog)
+        ctx: Dict[str, Any] = {"chapter": chapter, "beat": beat, "policy": policy, "runlog": runlog, "llm": llm}
+        if on_progress is not None:
+            ctx["on_progress"] = on_progress  # (stage, bytes written so far) while drafts stream
+        return runlog, ctx
+
+    def run(
+        self,
+        chapter: str,
+        beat: str,
+        preloaded: Dict[str, Any] | None = None,
+        resume: bool = True,
+        on_progress: Optional[Callable[[str, int], None]] = None,
+    ) -> RunResult:
+        """Run the configured steps; steps with no dependency between them run concurrently.
+
+        Checkpointed steps whose inputs are unchanged since their last run for this
+        chapter/beat are skipped (their saved outputs are reused) unless resume=False.
+        on_progress(stage, bytes) is called as streamed drafts grow.
+        """
+        runlog, ctx = self._start(chapter, beat, on_progress, journal=True)
+        graph = self.graph
+        try:
+            done = self._skip_preloaded(runlog, ctx, preloaded)
+            started: set[str] = set(done)
+            running: Dict[Future[str], str] = {}
+
+            with ThreadPoolExecutor(max_workers=max(1, self.cfg.workflow.max_parallel_steps)) as pool:
+                while len(done) < len(graph.order):
+                    for step_name in graph.ready(done, started):
+                        started.add(step_name)
+                        runlog.step_started(step_name)
+                        fut = pool.submit(self._run_step, graph.specs[step_name], ctx, resume)
+                        running[fut] = step_name
+                    finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for fut in finished:
+                        step_name = running.pop(fut)
+                        exc = fut.exception()
+                        if exc is not None:
+                            runlog.step_finished(step_name, "failed")
+                            for other in running:
+                                other.cancel()
+                            raise exc
+                        runlog.step_finished(step_name, fut.result())
+                        done.add(step_name)
+        except BaseException as e:
+            self._end(runlog, e)
+            raise
+        self._end(runlog)
+        return RunResult(run_id=runlog.run_id, outputs=runlog.outputs)
+
+    async def arun(
+        self,
+        chapter: str,
+        beat: str,
+        preloaded: Dict[str, Any] | None = None,
+        resume: bool = True,
+        on_progress: Optional[Callable[[str, int], None]] = None,
+    ) -> RunResult:
+        """Async twin of run(): LLM steps await the adapter, so many beats can share one event loop.
+
+        Drafts stream into their .partial.md files and report on_progress as in run().
+        """
+        runlog, ctx = self._start(chapter, beat, on_progress, journal=True)
+        graph = self.graph
+        try:
+            done = self._skip_preloaded(runlog, ctx, preloaded)
+            started: set[str] = set(done)
+            running: Dict[asyncio.Task[str], str] = {}
+
+            while len(done) < len(graph.order):
+                for step_name in graph.ready(done, started)[: max(1, self.cfg.workflow.max_parallel_steps) - len(running)]:
+                    started.add(step_name)
+                    runlog.step_started(step_name)
+                    coro = self._arun_step(graph.specs[step_name], ctx, resume)
+                    running[asyncio.ensure_future(coro)] = step_name
+                finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    step_name = running.pop(task)
+                    exc = task.exception()
+                    if exc is not None:
+                        runlog.step_finished(step_name, "failed")
+                        for other in running:
+                            other.cancel()
+                        raise exc
+                    runlog.step_finished(step_name, task.result())
+                    done.add(step_name)
+        except BaseException as e:
+            await asyncio.to_thread(self._end, runlog, e)
+            raise
+        await asyncio.to_thread(self._end, runlog)
+        return RunResult(run_id=runlog.run_id, outputs=runlog.outputs)
 
-        for step_name in self.cfg.workflow.steps:
-            runlog.steps.append(step_name)
-            step_map[step_name](cfg=self.cfg, ws=self.ws, registry=self.registry, ctx=ctx)
+    def _end(self, runlog: RunLog, error: BaseException | None = None) -> None:
+        """Finish the run and compact its journal into 05_RUNS/<run_id>.yaml and .trace.json.
 
-        runlog.finish()
-        return RunResult(run_id=run_id, outputs=runlog.outputs)
+        Failed runs are compacted too (status: failed); only a crash that never gets
+        here leaves the .jsonl journal behind, and compact_journal() recovers it.
+        """
+        runlog.finish(error)
+        runlog.close_journal()
+        summary = compact_journal(self.ws.safe_path(f"05_RUNS/{runlog.run_id}.jsonl"), runlog)
+        try:
+            RunsIndex.for_workspace(self.ws).record_run(runlog, summary)
+        except sqlite3.Error:
+            pass  # the index is derived data; the next `storyos runs` refresh picks the run up
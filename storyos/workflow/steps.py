@@ -1,38 +1,112 @@
 from __future__ import annotations
-from typing import Any, Dict
+import asyncio
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, FrozenSet, Iterator
 from storyos.config import ProjectConfig
+from storyos.core.runlog import FileAccessRecord
 from storyos.core.workspace import Workspace
 from storyos.plugins.registry import PluginRegistry
 from storyos.plugins.loader import load_entrypoint
+from storyos.retrieval.canon_index import CanonIndex
 from storyos.tools.file_tools import FileTools
 
 def load_context_step(cfg: ProjectConfig, ws: Workspace, registry: PluginRegistry, ctx: Dict[str, Any]) -> None:
-    ft = FileTools(ws)
+    ft = FileTools(ws, ctx["runlog"])
     chapter_file = f"03_OUTLINES/{ctx['chapter']}.md"
     if ws.safe_path(chapter_file).exists():
         ctx["chapter_outline"] = ft.read_file(chapter_file, ctx["policy"].max_file_read_bytes)
-        ctx["runlog"].file_access.append({"path": chapter_file, "action": "read"})
     else:
         ctx["chapter_outline"] = ""
 
+def _beat_section(outline: str, beat: str) -> str:
+    """The outline section whose heading names the beat, or the whole outline."""
+    lines = outline.splitlines()
+    for i, line in enumerate(lines):
+        if line.startswith("#") and beat and beat in line:
+            level = len(line) - len(line.lstrip("#"))
+            section = [line]
+            for nxt in lines[i + 1:]:
+                if nxt.startswith("#") and len(nxt) - len(nxt.lstrip("#")) <= level:
+                    break
+                section.append(nxt)
+            return "\n".join(section)
+    return outline
+
 def retrieve_canon_step(cfg: ProjectConfig, ws: Workspace, registry: PluginRegistry, ctx: Dict[str, Any]) -> None:
-    ft = FileTools(ws)
-    canon_files = ["01_CANON/world.md", "01_CANON/timeline.md", "01_CANON/rules.md"]
+    ft = FileTools(ws, ctx["runlog"])
+    r = cfg.retrieval
+    budget = r.max_kb * 1024
     canon = []
-    for f in canon_files:
+    for f in r.always_include:
         p = ws.safe_path(f)
         if p.exists():
-            canon.append(ft.read_file(f, ctx["policy"].max_file_read_bytes))
-            ctx["runlog"].file_access.append({"path": f, "action": "read"})
+            text = ft.read_file(f, ctx["policy"].max_file_read_bytes)
+            canon.append(text)
+            budget -= len(text.encode("utf-8"))
+
+    runlog = ctx["runlog"]
+    with runlog.span("search_canon", "file") as span:
+        index = CanonIndex.for_workspace(ws)
+        index.refresh()
+        query = "\n".join([ctx["chapter"], ctx["beat"], _beat_section(ctx.get("chapter_outline", ""), ctx["beat"])])
+        hits = index.search(query, top_k=r.top_k, max_bytes=max(0, budget), exclude=r.always_include)
+        span.attrs["hits"] = len(hits)
+    for path in dict.fromkeys(h.path for h in hits):
+        runlog.record_access(FileAccessRecord(path=path, action="read"))
+    canon.extend(h.render() for h in hits)
     ctx["canon_bundle"] = "\n\n---\n\n".join(canon)
 
 def plan_beat_step(cfg: ProjectConfig, ws: Workspace, registry: PluginRegistry, ctx: Dict[str, Any]) -> None:
     Planner = load_entrypoint(registry.get("builtin.planner").entrypoint)
     ctx["beat_plan"] = Planner().run(cfg, ws, ctx)
 
+# Drafting stages stream into 04_DRAFTS/<chapter>_<beat>_<run_id>.<stage>.partial.md while
+# the model writes, so an interrupted run keeps its partial text; write_outputs
+# removes them once the final draft is written.
+STREAMED_STAGES = ("draft", "voice")
+
+def _partial_path(ctx: Dict[str, Any], stage: str) -> str:
+    return f"04_DRAFTS/{ctx['chapter']}_{ctx['beat']}_{ctx['runlog'].run_id}.{stage}.partial.md"
+
+def _stream_to_partial(ws: Workspace, ctx: Dict[str, Any], stage: str, deltas: Iterator[str]) -> str:
+    ft = FileTools(ws, ctx["runlog"])
+    path = _partial_path(ctx, stage)
+    on_progress = ctx.get("on_progress")
+    parts = []
+    with ft.open_stream(path, ctx["policy"].max_file_write_bytes) as out:
+        for delta in deltas:
+            out.write(delta)
+            parts.append(delta)
+            if on_progress is not None:
+                on_progress(stage, out.bytes_written)
+    return "".join(parts)
+
+async def _astream_to_partial(ws: Workspace, ctx: Dict[str, Any], stage: str, deltas: AsyncIterator[str]) -> str:
+    """Async twin of _stream_to_partial(); opening and closing (fsync, runlog) run in a worker thread."""
+    ft = FileTools(ws, ctx["runlog"])
+    on_progress = ctx.get("on_progress")
+    parts = []
+    out = await asyncio.to_thread(ft.open_stream, _partial_path(ctx, stage), ctx["policy"].max_file_write_bytes)
+    try:
+        async for delta in deltas:
+            out.write(delta)
+            parts.append(delta)
+            if on_progress is not None:
+                on_progress(stage, out.bytes_written)
+    except BaseException as e:
+        out.error = e
+        raise
+    finally:
+        await asyncio.to_thread(out.close)
+    return "".join(parts)
+
 def draft_beat_step(cfg: ProjectConfig, ws: Workspace, registry: PluginRegistry, ctx: Dict[str, Any]) -> None:
     Writer = load_entrypoint(registry.get("builtin.writer").entrypoint)
-    ctx["draft_text"] = Writer().run(cfg, ws, ctx)
+    writer = Writer()
+    if hasattr(writer, "stream"):
+        ctx["draft_text"] = _stream_to_partial(ws, ctx, "draft", writer.stream(cfg, ws, ctx))
+    else:
+        ctx["draft_text"] = writer.run(cfg, ws, ctx)
 
 def continuity_check_step(cfg: ProjectConfig, ws: Workspace, registry: PluginRegistry, ctx: Dict[str, Any]) -> None:
     Continuity = load_entrypoint(registry.get("builtin.continuity").entrypoint)
@@ -40,23 +114,120 @@ def continuity_check_step(cfg: ProjectConfig, ws: Workspace, registry: PluginReg
 
 def voice_pass_step(cfg: ProjectConfig, ws: Workspace, registry: PluginRegistry, ctx: Dict[str, Any]) -> None:
     Voice = load_entrypoint(registry.get("builtin.voice").entrypoint)
-    ctx["voice_text"] = Voice().run(cfg, ws, ctx)
+    voice = Voice()
+    if hasattr(voice, "stream"):
+        ctx["voice_text"] = _stream_to_partial(ws, ctx, "voice", voice.stream(cfg, ws, ctx))
+    else:
+        ctx["voice_text"] = voice.run(cfg, ws, ctx)
 
 def user_review_gate_step(cfg: ProjectConfig, ws: Workspace, registry: PluginRegistry, ctx: Dict[str, Any]) -> None:
     ctx["approved_text"] = ctx.get("voice_text") or ctx.get("draft_text") or ""
 
 def write_outputs_step(cfg: ProjectConfig, ws: Workspace, registry: PluginRegistry, ctx: Dict[str, Any]) -> None:
-    ft = FileTools(ws)
+    ft = FileTools(ws, ctx["runlog"])
     run_id = ctx["runlog"].run_id
     out_path = f"04_DRAFTS/{ctx['chapter']}_{ctx['beat']}_{run_id}.md"
     ft.write_file(out_path, ctx["approved_text"], ctx["policy"].max_file_write_bytes)
-    ctx["runlog"].file_access.append({"path": out_path, "action": "write"})
     ctx["runlog"].outputs["draft_path"] = out_path
+    for stage in STREAMED_STAGES:
+        ft.remove_file(_partial_path(ctx, stage))
 
 def write_runlog_step(cfg: ProjectConfig, ws: Workspace, registry: PluginRegistry, ctx: Dict[str, Any]) -> None:
-    ft = FileTools(ws)
-    run_id = ctx["runlog"].run_id
-    log_path = f"05_RUNS/{run_id}.yaml"
-    ft.write_file(log_path, ctx["runlog"].to_yaml(), ctx["policy"].max_file_write_bytes)
-    ctx["runlog"].file_access.append({"path": log_path, "action": "write"})
-    ctx["runlog"].outputs["runlog_path"] = log_path
+    # The run is journaled to 05_RUNS/<run_id>.jsonl as it goes; once it ends the engine
+    # compacts the journal into these two files (see WorkflowEngine._end).
+    runlog = ctx["runlog"]
+    runlog.outputs["runlog_path"] = f"05_RUNS/{runlog.run_id}.yaml"
+    runlog.outputs["trace_path"] = f"05_RUNS/{runlog.run_id}.trace.json"
+
+
+# --- async variants (used by WorkflowEngine.arun) -----------------------------
+# LLM steps await the agent's arun(); file steps run the sync step in a worker
+# thread so many beats can share one event loop without blocking it.
+
+async def aload_context_step(cfg: ProjectConfig, ws: Workspace, registry: PluginRegistry, ctx: Dict[str, Any]) -> None:
+    await asyncio.to_thread(load_context_step, cfg, ws, registry, ctx)
+
+async def aretrieve_canon_step(cfg: ProjectConfig, ws: Workspace, registry: PluginRegistry, ctx: Dict[str, Any]) -> None:
+    await asyncio.to_thread(retrieve_canon_step, cfg, ws, registry, ctx)
+
+async def aplan_beat_step(cfg: ProjectConfig, ws: Workspace, registry: PluginRegistry, ctx: Dict[str, Any]) -> None:
+    Planner = load_entrypoint(registry.get("builtin.planner").entrypoint)
+    ctx["beat_plan"] = await Planner().arun(cfg, ws, ctx)
+
+async def adraft_beat_step(cfg: ProjectConfig, ws: Workspace, registry: PluginRegistry, ctx: Dict[str, Any]) -> None:
+    Writer = load_entrypoint(registry.get("builtin.writer").entrypoint)
+    writer = Writer()
+    if hasattr(writer, "astream"):
+        ctx["draft_text"] = await _astream_to_partial(ws, ctx, "draft", writer.astream(cfg, ws, ctx))
+    else:
+        ctx["draft_text"] = await writer.arun(cfg, ws, ctx)
+
+async def acontinuity_check_step(cfg: ProjectConfig, ws: Workspace, registry: PluginRegistry, ctx: Dict[str, Any]) -> None:
+    Continuity = load_entrypoint(registry.get("builtin.continuity").entrypoint)
+    ctx["continuity_report"] = await Continuity().arun(cfg, ws, ctx)
+
+async def avoice_pass_step(cfg: ProjectConfig, ws: Workspace, registry: PluginRegistry, ctx: Dict[str, Any]) -> None:
+    Voice = load_entrypoint(registry.get("builtin.voice").entrypoint)
+    voice = Voice()
+    if hasattr(voice, "astream"):
+        ctx["voice_text"] = await _astream_to_partial(ws, ctx, "voice", voice.astream(cfg, ws, ctx))
+    else:
+        ctx["voice_text"] = await voice.arun(cfg, ws, ctx)
+
+async def auser_review_gate_step(cfg: ProjectConfig, ws: Workspace, registry: PluginRegistry, ctx: Dict[str, Any]) -> None:
+    user_review_gate_step(cfg, ws, registry, ctx)
+
+async def awrite_outputs_step(cfg: ProjectConfig, ws: Workspace, registry: PluginRegistry, ctx: Dict[str, Any]) -> None:
+    await asyncio.to_thread(write_outputs_step, cfg, ws, registry, ctx)
+
+async def awrite_runlog_step(cfg: ProjectConfig, ws: Workspace, registry: PluginRegistry, ctx: Dict[str, Any]) -> None:
+    await asyncio.to_thread(write_runlog_step, cfg, ws, registry, ctx)
+
+
+# --- step declarations ---------------------------------------------------------
+# Each step names the ctx keys it reads and writes so WorkflowEngine can order the
+# configured steps as a dependency graph (see storyos.workflow.dag).
+
+StepFn = Callable[..., None]
+AsyncStepFn = Callable[..., Awaitable[None]]
+
+@dataclass(frozen=True)
+class StepSpec:
+    name: str
+    fn: StepFn
+    afn: AsyncStepFn
+    reads: FrozenSet[str] = frozenset()        # must be written by an earlier step (or be a base key)
+    optional_reads: FrozenSet[str] = frozenset()  # used if present; the producer must still run first
+    writes: FrozenSet[str] = frozenset()
+    barrier: bool = False                       # waits for every earlier step; later steps wait for it
+    shareable: bool = False                     # output depends only on the workspace, not chapter/beat
+    checkpoint: bool = False                    # outputs are saved and reused while the input hash is unchanged
+    plugin: str | None = None                   # agent plugin whose code is part of the input hash
+
+STEPS: Dict[str, StepSpec] = {s.name: s for s in [
+    StepSpec("load_context", load_context_step, aload_context_step,
+             reads=frozenset({"chapter", "policy", "runlog"}), writes=frozenset({"chapter_outline"})),
+    StepSpec("retrieve_canon", retrieve_canon_step, aretrieve_canon_step,
+             reads=frozenset({"chapter", "beat", "policy", "runlog"}), optional_reads=frozenset({"chapter_outline"}),
+             writes=frozenset({"canon_bundle"})),
+    StepSpec("plan_beat", plan_beat_step, aplan_beat_step,
+             reads=frozenset({"chapter", "beat", "llm"}),
+             optional_reads=frozenset({"canon_bundle", "chapter_outline"}), writes=frozenset({"beat_plan"}),
+             checkpoint=True, plugin="builtin.planner"),
+    StepSpec("draft_beat", draft_beat_step, adraft_beat_step,
+             reads=frozenset({"llm", "beat_plan"}), optional_reads=frozenset({"canon_bundle"}),
+             writes=frozenset({"draft_text"}), checkpoint=True, plugin="builtin.writer"),
+    StepSpec("continuity_check", continuity_check_step, acontinuity_check_step,
+             reads=frozenset({"llm", "draft_text"}), optional_reads=frozenset({"canon_bundle"}),
+             writes=frozenset({"continuity_report"}), checkpoint=True, plugin="builtin.continuity"),
+    StepSpec("voice_pass", voice_pass_step, avoice_pass_step,
+             reads=frozenset({"llm", "draft_text"}), optional_reads=frozenset({"continuity_report"}),
+             writes=frozenset({"voice_text"}), checkpoint=True, plugin="builtin.voice"),
+    StepSpec("user_review_gate", user_review_gate_step, auser_review_gate_step,
+             optional_reads=frozenset({"voice_text", "draft_text"}), writes=frozenset({"approved_text"})),
+    StepSpec("write_outputs", write_outputs_step, awrite_outputs_step,
+             reads=frozenset({"chapter", "beat", "policy", "runlog", "approved_text"}),
+             writes=frozenset({"draft_path"})),
+    StepSpec("write_runlog", write_runlog_step, awrite_runlog_step,
+             reads=frozenset({"policy", "runlog"}), writes=frozenset({"runlog_path"}), barrier=True),
+]}
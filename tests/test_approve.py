@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from storyos.cli import app
+from storyos.core.workspace import Workspace
+from storyos.ingest.approve import approve_proposals_runs
+
+
+def _project(tmp_path: Path, runs: int) -> Path:
+    root = tmp_path / "story"
+    Workspace.init_project(str(root), "Test")
+    for i in range(runs):
+        run_dir = root / "00_INGEST" / "proposals" / f"run{i}"
+        run_dir.mkdir(parents=True)
+        doc = {"characters": [], "world": {"facts": [{"claim": f"Fact number {i} about the forest"}]},
+               "timeline": {"events": []}}
+        (run_dir / "raw_llm_output.txt").write_text(json.dumps(doc), encoding="utf-8")
+    return root
+
+
+def test_multi_run_approval_archives_each_run(tmp_path: Path) -> None:
+    root = _project(tmp_path, 2)
+    approve_proposals_runs(root, ["run0", "run1"])
+    for run_id in ("run0", "run1"):
+        assert (root / "00_INGEST" / "approved" / run_id / "proposals" / "raw_llm_output.txt").exists()
+
+
+def test_no_archive_is_honoured_for_several_runs(tmp_path: Path) -> None:
+    root = _project(tmp_path, 2)
+    result = CliRunner().invoke(app, ["ingest", "approve", str(root), "run0", "run1", "--no-archive"])
+    assert result.exit_code == 0, result.output
+    assert not (root / "00_INGEST" / "approved" / "run0" / "proposals").exists()
+    assert (root / "00_INGEST" / "approved" / "run0" / "APPROVAL_REPORT.md").exists()
+
+
+def test_all_pending_with_nothing_pending_succeeds(tmp_path: Path) -> None:
+    root = _project(tmp_path, 0)
+    result = CliRunner().invoke(app, ["ingest", "approve", str(root), "--all-pending"])
+    assert result.exit_code == 0
+    assert "Nothing pending" in result.output
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from typing import AsyncIterator, List, Tuple
+
+import pytest
+
+from storyos.config import load_project_config
+from storyos.core.workspace import Workspace
+from storyos.llm.base import LLMMessage, LLMResult
+from storyos.workflow.engine import WorkflowEngine
+
+
+class DropsMidStream:
+    """Plans fine, then loses the connection partway through the draft."""
+
+    async def agenerate(self, messages: List[LLMMessage], *, model: str, temperature: float = 0.2,
+                        max_output_tokens: int = 2000) -> LLMResult:
+        return LLMResult(text="plan", raw={})
+
+    async def agenerate_stream(
+        self, messages: List[LLMMessage], *, model: str, temperature: float = 0.2,
+        max_output_tokens: int = 2000,
+    ) -> AsyncIterator[str]:
+        yield "Once upon "
+        yield "a time"
+        raise ConnectionError("stream dropped")
+
+
+def test_interrupted_arun_keeps_partial_draft(tmp_path: Path) -> None:
+    root = tmp_path / "story"
+    Workspace.init_project(str(root), "Test")
+    cfg = load_project_config(str(root))
+    cfg.cache.llm.mode = "bypass"
+    engine = WorkflowEngine(cfg, Workspace.open(str(root), cfg), llm=DropsMidStream())
+    seen: List[Tuple[str, int]] = []
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(engine.arun("chapter_01", "beat_01",
+                                on_progress=lambda stage, n: seen.append((stage, n))))
+
+    partials = list((root / "04_DRAFTS").glob("chapter_01_beat_01_*.draft.partial.md"))
+    assert len(partials) == 1
+    assert partials[0].read_text(encoding="utf-8") == "Once upon a time"
+    assert seen == [("draft", 10), ("draft", 16)]
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from storyos.config import load_project_config
+from storyos.core.workspace import Workspace
+from storyos.ingest.bulk import MANIFEST_PATH, load_ingest_manifest, save_ingest_manifest
+
+
+@pytest.fixture
+def ws(tmp_path: Path) -> Workspace:
+    root = tmp_path / "story"
+    Workspace.init_project(str(root), "Test")
+    return Workspace.open(str(root), load_project_config(str(root)))
+
+
+def test_manifest_round_trip(ws: Workspace) -> None:
+    assert load_ingest_manifest(ws) == {}
+    entries = {"abc": {"run_id": "r1", "path": "book.md", "ingested_utc": "2026-01-01T00:00:00"}}
+    save_ingest_manifest(ws, entries)
+    assert load_ingest_manifest(ws) == entries
+
+
+@pytest.mark.parametrize("content", ["[]", '{"inputs": ["abc"]}', '{"version": 1}'])
+def test_manifest_of_the_wrong_shape_is_empty(ws: Workspace, content: str) -> None:
+    path = ws.safe_path(MANIFEST_PATH)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+    assert load_ingest_manifest(ws) == {}
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from storyos.retrieval.canon_index import CanonIndex, Passage
+
+
+def _index(tmp_path: Path) -> CanonIndex:
+    canon = tmp_path / "canon"
+    canon.mkdir()
+    (canon / "places.md").write_text(
+        "# Places\n\nThe lighthouse stands on the northern cliff.\n\nThe harbour freezes each winter.\n",
+        encoding="utf-8",
+    )
+    (canon / "people.md").write_text(
+        "# People\n\nMara keeps the lighthouse lamp burning.\n\nTomas sells eels at the harbour.\n",
+        encoding="utf-8",
+    )
+    idx = CanonIndex(tmp_path, tmp_path / "index.json", ["canon/*.md"])
+    assert idx.refresh()
+    return idx
+
+
+def test_search_returns_everything_when_canon_fits(tmp_path: Path) -> None:
+    idx = _index(tmp_path)
+    hits = idx.search("lighthouse")
+    assert len(hits) == 4
+    assert [p.path for p in hits] == sorted(p.path for p in hits)
+
+    hits = idx.search("lighthouse", exclude=["canon/people.md"])
+    assert {p.path for p in hits} == {"canon/places.md"}
+
+
+def test_search_ranks_within_byte_budget_without_rendering(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    idx = _index(tmp_path)
+    sizes = sorted(len(p.render().encode("utf-8")) for p in idx._passages)
+
+    def fail(self: Passage) -> str:
+        raise AssertionError("search() should use the sizes computed at index time")
+
+    monkeypatch.setattr(Passage, "render", fail)
+    hits = idx.search("lighthouse lighthouse lamp", max_bytes=sizes[-1] + sizes[-2] - 1)
+    assert hits
+    assert hits[0].text.startswith("Mara")
+    assert all("lighthouse" in p.text or "lamp" in p.text for p in hits)
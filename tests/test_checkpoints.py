@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from storyos.config import load_project_config
+from storyos.core.workspace import Workspace
+from storyos.llm.base import LLMMessage, LLMResult
+from storyos.workflow.checkpoints import CheckpointStore
+from storyos.workflow.engine import WorkflowEngine
+
+
+class CountingAdapter:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def generate(self, messages: List[LLMMessage], *, model: str, temperature: float = 0.2,
+                 max_output_tokens: int = 2000) -> LLMResult:
+        self.calls += 1
+        return LLMResult(text="real output", raw={})
+
+
+@pytest.fixture
+def project(tmp_path: Path) -> Path:
+    root = tmp_path / "story"
+    Workspace.init_project(str(root), "Test")
+    return root
+
+
+def _engine(root: Path, llm: CountingAdapter | None = None) -> WorkflowEngine:
+    cfg = load_project_config(str(root))
+    cfg.cache.llm.mode = "bypass"  # so only checkpoints can skip calls
+    return WorkflowEngine(cfg, Workspace.open(str(root), cfg), llm=llm)
+
+
+def test_unchanged_rerun_restores_checkpoints(project: Path) -> None:
+    _engine(project).run("chapter_01", "beat_01")
+    llm = CountingAdapter()
+    first = _engine(project, llm)
+    first.run("chapter_01", "beat_01")
+    calls = llm.calls
+    assert calls > 0
+    _engine(project, llm).run("chapter_01", "beat_01")
+    assert llm.calls == calls
+
+
+def test_stub_checkpoints_are_not_restored_for_another_adapter(project: Path) -> None:
+    _engine(project).run("chapter_01", "beat_01")
+    llm = CountingAdapter()
+    _engine(project, llm).run("chapter_01", "beat_01")
+    assert llm.calls > 0
+    drafts = list((project / "04_DRAFTS").glob("chapter_01_beat_01_*.md"))
+    assert any(p.read_text(encoding="utf-8").strip() == "real output" for p in drafts)
+
+
+@pytest.mark.parametrize("content", ['["not", "an", "object"]', '{"input_hash": "h", "outputs": null}'])
+def test_malformed_checkpoint_is_a_miss(tmp_path: Path, content: str) -> None:
+    store = CheckpointStore(tmp_path)
+    store.save("chapter_01", "beat_01", "plan_beat", "h", {"beat_plan": "plan"}, "run1")
+    assert store.load("chapter_01", "beat_01", "plan_beat", "h") == {"beat_plan": "plan"}
+    store._path("chapter_01", "beat_01", "plan_beat").write_text(content, encoding="utf-8")
+    assert store.load("chapter_01", "beat_01", "plan_beat", "h") is None
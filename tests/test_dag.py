@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+import pytest
+
+from storyos.config import WorkflowConfig
+from storyos.workflow.dag import StepGraph, WorkflowError
+from storyos.workflow.steps import STEPS
+
+
+def test_default_steps_build() -> None:
+    graph = StepGraph.build(WorkflowConfig().steps, STEPS)
+    assert graph.ready(set(), set()) == ["load_context"]
+    assert "retrieve_canon" in graph.deps["plan_beat"]
+
+
+def test_read_before_write_is_rejected() -> None:
+    with pytest.raises(WorkflowError, match="only written by later step 'plan_beat'"):
+        StepGraph.build(["load_context", "draft_beat", "plan_beat"], STEPS)
+
+
+def test_unknown_step_is_rejected() -> None:
+    with pytest.raises(WorkflowError, match="Unknown workflow step"):
+        StepGraph.build(["load_context", "no_such_step"], STEPS)
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import json
+from types import SimpleNamespace
+from typing import Any, List
+
+from storyos.ingest.extract import _run_extraction, _truncation_note
+from storyos.llm.base import LLMMessage, LLMResult
+
+DOC = {
+    "characters": [{"name": "Pooh", "facts": [{"claim": "Pooh loves honey"}]}],
+    "world": {"facts": [{"claim": "The forest is large"}, {"claim": "Rabbit has many relations"}]},
+    "timeline": {"events": []},
+}
+TRUNCATED = json.dumps(DOC)[: json.dumps(DOC).index("Rabbit") + 3]
+
+
+class FailingContinuation:
+    """Returns a truncated reply, then fails every continuation call."""
+
+    def __init__(self) -> None:
+        self.calls: List[List[LLMMessage]] = []
+
+    def generate(self, messages: List[LLMMessage], *, model: str, temperature: float = 0.2,
+                 max_output_tokens: int = 2000) -> LLMResult:
+        self.calls.append(messages)
+        if len(self.calls) > 1:
+            raise RuntimeError("503 upstream unavailable")
+        return LLMResult(text=TRUNCATED, raw={})
+
+
+def test_failed_continuation_keeps_salvaged_items() -> None:
+    llm = FailingContinuation()
+    pipe: Any = SimpleNamespace(temperature=0.0, max_output_tokens=100)
+    ex = _run_extraction(llm, "m", pipe, [LLMMessage(role="user", content="extract")])
+
+    assert len(llm.calls) == 2
+    assert llm.calls[1][1] == LLMMessage(role="assistant", content=TRUNCATED)
+    assert [f.claim for f in ex.extracted.world.facts] == ["The forest is large"]
+    assert [c.name for c in ex.extracted.characters] == ["Pooh"]
+    assert ex.truncated and not ex.complete
+    assert "503 upstream unavailable" in _truncation_note(ex)
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import json
+import random
+import re
+import threading
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+from storyos.core.workspace import Workspace
+from storyos.ingest.extract import extract_to_proposals
+from storyos.llm.base import LLMMessage, LLMResult
+
+PACK_DIR = str(Path(__file__).resolve().parents[1] / "content" / "packs")
+REPLY = {"characters": [], "world": {"facts": [{"claim": "Pooh lives in the forest"}]}, "timeline": {"events": []}}
+
+
+class JitteryAdapter:
+    """Finishes calls out of order."""
+
+    def __init__(self) -> None:
+        self._rng = random.Random(7)
+        self._lock = threading.Lock()
+
+    def generate(self, messages: List[LLMMessage], *, model: str, temperature: float = 0.2,
+                 max_output_tokens: int = 2000) -> LLMResult:
+        with self._lock:
+            delay = self._rng.random() * 0.01
+        time.sleep(delay)
+        return LLMResult(text=json.dumps(REPLY), raw={})
+
+
+def test_map_reduce_reports_completed_call_count(tmp_path: Path) -> None:
+    root = tmp_path / "story"
+    Workspace.init_project(str(root), "Test")
+    src = tmp_path / "book.md"
+    src.write_text("\n".join(f"Line {i} about Pooh." for i in range(200)), encoding="utf-8")
+    seen: List[Tuple[str, int]] = []
+
+    extract_to_proposals(project_dir=str(root), input_path=str(src), pack_dir=PACK_DIR, map_reduce=True,
+                         max_lines_per_chunk=10, overlap=0, concurrency=8, llm=JitteryAdapter(),
+                         on_progress=lambda label, n: seen.append((label, n)))
+
+    calls = [n for label, n in seen if label == "calls"]
+    assert calls == list(range(1, 21))
+
+
+def test_ingest_meta_records_token_totals(tmp_path: Path) -> None:
+    root = tmp_path / "story"
+    Workspace.init_project(str(root), "Test")
+    src = tmp_path / "book.md"
+    src.write_text("Pooh lives in the forest.\n", encoding="utf-8")
+
+    result = extract_to_proposals(project_dir=str(root), input_path=str(src), pack_dir=PACK_DIR,
+                                  llm=JitteryAdapter())
+
+    meta = (Path(result.proposals_dir) / "00_META.md").read_text(encoding="utf-8")
+    m = re.search(r"- tokens: prompt=(\d+), completion=(\d+)", meta)
+    assert m is not None
+    assert int(m.group(1)) > 0 and int(m.group(2)) > 0
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from storyos.config import FakeLLMConfig
+from storyos.llm import fake
+from storyos.llm.base import LLMMessage
+from storyos.llm.fake import FakeBackend
+
+
+def _messages(i: int) -> list[LLMMessage]:
+    return [LLMMessage(role="user", content=f"prompt {i}")]
+
+
+def test_attempts_are_forgotten_once_a_prompt_succeeds() -> None:
+    backend = FakeBackend(FakeLLMConfig())
+    for i in range(10):
+        assert backend.reply(_messages(i), model="m", max_output_tokens=50).error is None
+    assert len(backend._attempts) == 0
+
+
+def test_failing_prompts_tracked_up_to_the_cap(monkeypatch) -> None:
+    monkeypatch.setattr(fake, "MAX_TRACKED_PROMPTS", 5)
+    backend = FakeBackend(FakeLLMConfig(error_rate=1.0))
+    for i in range(20):
+        assert backend.reply(_messages(i), model="m", max_output_tokens=50).error is not None
+    assert len(backend._attempts) == 5
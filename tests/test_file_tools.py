@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import os
+import stat
+from pathlib import Path
+
+import pytest
+
+from storyos.config import load_project_config
+from storyos.core.file_cache import FileContentCache, FileTooLarge
+from storyos.core.workspace import Workspace
+from storyos.tools.base import ToolError
+from storyos.tools.file_tools import FileTools
+
+
+@pytest.fixture
+def tools(tmp_path: Path) -> FileTools:
+    root = tmp_path / "story"
+    Workspace.init_project(str(root), "Test")
+    return FileTools(Workspace.open(str(root), load_project_config(str(root))))
+
+
+def _leftover_temps(path: Path) -> list[str]:
+    return [p.name for p in path.parent.iterdir() if p.name.endswith(".tmp")]
+
+
+@pytest.mark.skipif(os.name != "posix", reason="POSIX permission bits")
+def test_write_file_keeps_the_targets_mode(tools: FileTools) -> None:
+    path = tools.ws.safe_path("notes/run.sh")
+    tools.write_file("notes/run.sh", "#!/bin/sh\n", max_bytes=100)
+    path.chmod(0o751)
+    tools.write_file("notes/run.sh", "#!/bin/sh\necho hi\n", max_bytes=100)
+    assert stat.S_IMODE(path.stat().st_mode) == 0o751
+    with tools.open_stream("notes/run.sh", max_bytes=100, atomic=True) as w:
+        w.write("#!/bin/sh\n")
+    assert stat.S_IMODE(path.stat().st_mode) == 0o751
+
+
+def test_failed_write_leaves_old_content_and_no_temp(tools: FileTools) -> None:
+    tools.write_file("notes/a.md", "old", max_bytes=100)
+    with pytest.raises(ToolError):
+        with tools.open_stream("notes/a.md", max_bytes=5, atomic=True) as w:
+            w.write("new")
+            w.write("too long")
+    assert tools.read_file("notes/a.md", max_bytes=100) == "old"
+    assert _leftover_temps(tools.ws.safe_path("notes/a.md")) == []
+
+
+def test_cache_get_reads_at_most_one_byte_past_the_limit(tmp_path: Path) -> None:
+    path = tmp_path / "big.txt"
+    path.write_bytes(b"x" * 10)
+    cache = FileContentCache(max_bytes=1024)
+    real_stat = os.stat
+    # The file grows between the size check and the read.
+    shrunk = os.stat_result((*real_stat(path)[:6], 4, *real_stat(path)[7:]))
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(os, "stat", lambda p, *a, **k: shrunk if Path(p) == path
+                   else real_stat(p, *a, **k))
+        with pytest.raises(FileTooLarge) as e:
+            cache.get(path, max_bytes=5)
+    assert e.value.size == 6
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import json
+import shutil
+from pathlib import Path
+from typing import List
+
+from storyos.config import LLMConfig
+from storyos.core.workspace import Workspace
+from storyos.ingest.extract import extract_to_proposals
+from storyos.llm.base import LLMMessage, LLMResult
+from storyos.llm.registry import AdapterRegistry
+
+PACK_DIR = str(Path(__file__).resolve().parents[1] / "content" / "packs")
+REPLY = {"characters": [], "world": {"facts": [{"claim": "Pooh lives in the forest", "confidence": "high"}]},
+         "timeline": {"events": []}}
+
+
+class CountingAdapter:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def generate(self, messages: List[LLMMessage], *, model: str, temperature: float = 0.2,
+                 max_output_tokens: int = 2000) -> LLMResult:
+        self.calls += 1
+        return LLMResult(text=json.dumps(REPLY), raw={})
+
+
+def _project(tmp_path: Path) -> tuple[Path, Path]:
+    root = tmp_path / "story"
+    Workspace.init_project(str(root), "Test")
+    src = tmp_path / "book.md"
+    src.write_text("\n\n".join(f"Paragraph {i}. Pooh walks to the forest." for i in range(40)), encoding="utf-8")
+    return root, src
+
+
+def _extract(root: Path, src: Path, llm: object) -> None:
+    extract_to_proposals(project_dir=str(root), input_path=str(src), pack_dir=PACK_DIR, incremental=True, llm=llm)
+
+
+def test_unchanged_chunks_are_reused(tmp_path: Path) -> None:
+    root, src = _project(tmp_path)
+    llm = CountingAdapter()
+    _extract(root, src, llm)
+    calls = llm.calls
+    assert calls > 0
+    shutil.rmtree(root / ".storyos" / "cache", ignore_errors=True)  # only the chunk store may skip calls
+    _extract(root, src, llm)
+    assert llm.calls == calls
+
+
+def test_fake_extractions_are_not_reused_for_another_adapter(tmp_path: Path) -> None:
+    root, src = _project(tmp_path)
+    _extract(root, src, AdapterRegistry().get(LLMConfig(provider="fake")))
+    llm = CountingAdapter()
+    _extract(root, src, llm)
+    assert llm.calls > 0
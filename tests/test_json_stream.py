@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import json
+
+from storyos.ingest.json_stream import ExtractorStreamParser, parse_extractor_text, salvage_extractor_output
+
+DOC = {
+    "characters": [{"name": "Pooh", "facts": [{"claim": "Pooh loves honey", "confidence": "High"}]}],
+    "world": {"facts": [{"claim": "The forest is large"}, {"claim": "Rabbit has many relations"}]},
+    "timeline": {"events": []},
+}
+
+
+def test_complete_document_in_deltas() -> None:
+    text = "Here you go:\n```json\n" + json.dumps(DOC) + "\n```"
+    parser = ExtractorStreamParser()
+    for i in range(0, len(text), 7):
+        parser.feed(text[i:i + 7])
+    data, complete = parser.result()
+    assert complete
+    assert data["characters"][0]["facts"][0]["confidence"] == "high"
+
+
+def test_truncated_document_keeps_complete_items() -> None:
+    text = json.dumps(DOC)
+    cut = text.index("Rabbit") + 3
+    data, complete = parse_extractor_text(text[:cut])
+    assert not complete
+    assert [f["claim"] for f in data["world"]["facts"]] == ["The forest is large"]
+    assert data["characters"][0]["name"] == "Pooh"
+
+
+def test_salvage_drops_invalid_items_and_sections() -> None:
+    out = salvage_extractor_output({
+        "characters": [{"name": "Pooh", "facts": [{"claim": "Pooh loves honey"}, {"nope": 1}]}],
+        "world": ["not", "an", "object"],
+        "timeline": None,
+    })
+    assert [f.claim for f in out.characters[0].facts] == ["Pooh loves honey"]
+    assert out.world.facts == []
+    assert out.timeline.events == []
+
+
+def test_single_char_deltas_match_whole_text() -> None:
+    text = "prose first " + json.dumps(DOC)
+    cut = text.index("Rabbit") + 3
+    parser = ExtractorStreamParser()
+    for c in text[:cut]:
+        parser.feed(c)
+    assert parser.text == text[:cut]
+    assert parser.result() == parse_extractor_text(text[:cut])
+    assert parser.items == 3  # Pooh, his fact and the first world fact
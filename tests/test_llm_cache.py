@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, List
+
+from storyos.llm.base import LLMMessage, LLMResult, adapter_namespace
+from storyos.llm.cache import CachingLLMAdapter, LLMCache
+from storyos.llm.openai_adapter_stub import OpenAIAdapterStub
+
+MESSAGES = [LLMMessage(role="user", content="Write the beat.")]
+
+
+class CountingAdapter:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def generate(self, messages: List[LLMMessage], *, model: str, temperature: float = 0.2,
+                 max_output_tokens: int = 2000) -> LLMResult:
+        self.calls += 1
+        return LLMResult(text="real output", raw={})
+
+
+def _cache(tmp_path: Path) -> LLMCache:
+    return LLMCache(tmp_path / "llm", max_bytes=1024 * 1024)
+
+
+def test_key_depends_on_namespace() -> None:
+    kw: Any = dict(model="m", temperature=0.2, max_output_tokens=10)
+    assert LLMCache.key(MESSAGES, namespace="a", **kw) != LLMCache.key(MESSAGES, namespace="b", **kw)
+
+
+def test_adapter_namespace_defaults_to_class_path() -> None:
+    assert adapter_namespace(CountingAdapter()) == f"{__name__}.CountingAdapter"
+    assert adapter_namespace(OpenAIAdapterStub()) == "stub"
+
+
+def test_stub_output_is_not_served_to_another_adapter(tmp_path: Path) -> None:
+    cache = _cache(tmp_path)
+    stub = CachingLLMAdapter(OpenAIAdapterStub(), cache)
+    assert stub.generate(MESSAGES, model="m").text.startswith("(STUB LLM OUTPUT)")
+
+    real = CountingAdapter()
+    result = CachingLLMAdapter(real, cache).generate(MESSAGES, model="m")
+    assert real.calls == 1
+    assert result.text == "real output"
+
+
+def test_same_adapter_hits(tmp_path: Path) -> None:
+    cache = _cache(tmp_path)
+    real = CountingAdapter()
+    wrapped = CachingLLMAdapter(real, cache)
+    wrapped.generate(MESSAGES, model="m")
+    wrapped.generate(MESSAGES, model="m")
+    assert real.calls == 1
+    assert (wrapped.hits, wrapped.misses) == (1, 1)
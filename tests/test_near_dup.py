@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from storyos.ingest.approve import DEFAULT_NEAR_DUP_THRESHOLD, approve_proposals_run
+from storyos.ingest.near_dup import NearDupIndex
+
+
+def _index(*claims: str) -> NearDupIndex:
+    idx = NearDupIndex()
+    for claim in claims:
+        idx.add(claim)
+    return idx
+
+
+def test_paraphrase_matches_at_default_threshold() -> None:
+    match = _index("Pooh is fond of honey").query("Pooh loves honey", DEFAULT_NEAR_DUP_THRESHOLD)
+    assert match is not None
+    assert match[0] == "Pooh is fond of honey"
+
+
+@pytest.mark.parametrize("canon, claim", [
+    ("Pooh is fond of honey", "Pooh is not fond of honey"),
+    ("Pooh lives in a beech tree", "Pooh never lives in a beech tree"),
+    ("Pooh is fond of honey", "Pooh isn't fond of honey"),
+])
+def test_negation_is_never_a_near_duplicate(canon: str, claim: str) -> None:
+    assert _index(canon).query(claim, 0.1) is None
+
+
+def _project(tmp_path: Path, facts: List[str]) -> Path:
+    root = tmp_path / "story"
+    (root / "01_CANON").mkdir(parents=True)
+    (root / "01_CANON" / "world.md").write_text("# World\n\n- Pooh is fond of honey (high)\n", encoding="utf-8")
+    run_dir = root / "00_INGEST" / "proposals" / "run1"
+    run_dir.mkdir(parents=True)
+    doc = {"characters": [], "world": {"facts": [{"claim": f, "confidence": "med"} for f in facts]},
+           "timeline": {"events": []}}
+    (run_dir / "raw_llm_output.txt").write_text(json.dumps(doc), encoding="utf-8")
+    return root
+
+
+def test_keep_near_dups_adds_and_flags_them(tmp_path: Path) -> None:
+    root = _project(tmp_path, ["Pooh loves honey", "Pooh is not fond of honey"])
+    result = approve_proposals_run(str(root), "run1", suppress_near_dups=False)
+    assert result.world_facts_added == 2
+    world = (root / "01_CANON" / "world.md").read_text(encoding="utf-8")
+    assert "- Pooh loves honey (med)" in world
+    assert "- Pooh is not fond of honey (med)" in world
+    report = result.report_path.read_text(encoding="utf-8")
+    assert "Pooh loves honey ≈ Pooh is fond of honey (similarity 0.50)" in report
+    assert "Pooh is not fond of honey ≈" not in report
+
+
+def test_near_dups_are_suppressed_by_default(tmp_path: Path) -> None:
+    root = _project(tmp_path, ["Pooh loves honey", "Pooh is not fond of honey"])
+    result = approve_proposals_run(str(root), "run1")
+    assert result.world_facts_added == 1
+    world = (root / "01_CANON" / "world.md").read_text(encoding="utf-8")
+    assert "Pooh loves honey" not in world
+    assert "- Pooh is not fond of honey (med)" in world
+    report = result.report_path.read_text(encoding="utf-8")
+    assert "Near-duplicates suppressed" in report
+    assert "Pooh loves honey ≈ Pooh is fond of honey (similarity 0.50)" in report
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+import pytest
+
+from storyos.llm.base import LLMMessage
+from storyos.llm.openai_adapter import OpenAIAdapter
+
+
+def test_assistant_turns_are_sent_as_output_text(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    adapter = OpenAIAdapter()
+    sent: List[Dict[str, Any]] = []
+
+    def create(**kwargs: Any) -> Any:
+        sent.append(kwargs)
+        return SimpleNamespace(output_text="ok", usage=None)
+
+    adapter.client = SimpleNamespace(responses=SimpleNamespace(create=create))
+    result = adapter.generate([
+        LLMMessage(role="system", content="be brief"),
+        LLMMessage(role="user", content="extract"),
+        LLMMessage(role="assistant", content='{"characters": ['),
+        LLMMessage(role="user", content="continue"),
+    ], model="gpt-4.1-mini")
+
+    assert result.text == "ok"
+    assert [(m["role"], m["content"][0]["type"]) for m in sent[0]["input"]] == [
+        ("system", "input_text"), ("user", "input_text"),
+        ("assistant", "output_text"), ("user", "input_text"),
+    ]
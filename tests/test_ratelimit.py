@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from email.utils import formatdate
+from typing import List
+
+import pytest
+
+from storyos.llm.fake import FakeHTTPError
+from storyos.llm.ratelimit import (
+    RateLimiter,
+    RateLimits,
+    TokenBucket,
+    backoff_delay,
+    call_with_retry,
+    retry_after_seconds,
+)
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_token_bucket_burst_wait_refill_and_refund(monkeypatch: pytest.MonkeyPatch) -> None:
+    clock = _Clock()
+    monkeypatch.setattr("time.monotonic", clock)
+    bucket = TokenBucket(60)  # one token per second, burst of 60
+
+    assert bucket.reserve(60) == 0.0
+    assert bucket.reserve(3) == pytest.approx(3.0)
+    # Later callers queue behind the debt instead of jumping it.
+    assert bucket.reserve(1) == pytest.approx(4.0)
+
+    clock.now += 10
+    assert bucket.reserve(1) == 0.0  # -4 + 10 refilled - 1 = 5 left
+
+    bucket.refund(1000)
+    assert bucket.reserve(60) == 0.0  # refunds never exceed the burst capacity
+    assert bucket.reserve(1) == pytest.approx(1.0)
+
+
+def test_settle_refunds_unused_tokens(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("time.monotonic", _Clock())
+    lim = RateLimiter(RateLimits(tokens_per_minute=600))
+    assert lim._reserve(600) == 0.0
+    lim.settle(600, 540)
+    assert lim._reserve(60) == 0.0
+    assert lim._reserve(10) == pytest.approx(1.0)
+
+
+def test_in_flight_limit_blocks_threads_until_release() -> None:
+    lim = RateLimiter(RateLimits(max_in_flight=2))
+    lim.acquire()
+    lim.acquire()
+    assert lim.in_flight == 2
+    assert not lim._try_enter()
+
+    entered = threading.Event()
+
+    def worker() -> None:
+        with lim.slot():
+            entered.set()
+
+    t = threading.Thread(target=worker)
+    t.start()
+    assert not entered.wait(0.1)
+    lim.release()
+    assert entered.wait(2)
+    t.join(2)
+    lim.release()
+    assert lim.in_flight == 0
+
+
+def test_in_flight_limit_caps_async_tasks() -> None:
+    lim = RateLimiter(RateLimits(max_in_flight=3))
+    peak = 0
+
+    async def task() -> None:
+        nonlocal peak
+        async with lim.aslot():
+            peak = max(peak, lim.in_flight)
+            await asyncio.sleep(0.01)
+
+    async def main() -> None:
+        await asyncio.gather(*(task() for _ in range(10)))
+
+    asyncio.run(main())
+    assert peak == 3
+    assert lim.in_flight == 0
+
+
+def test_retry_after_headers() -> None:
+    assert retry_after_seconds(FakeHTTPError(429, "slow down", retry_after=2.5)) == 2.5
+    ms = FakeHTTPError(429, "slow down", retry_after=9)
+    ms.response.headers["retry-after-ms"] = "1500"
+    assert retry_after_seconds(ms) == 1.5  # the millisecond header wins
+    date = FakeHTTPError(503, "busy")
+    date.response.headers["retry-after"] = formatdate(usegmt=True)
+    assert 0.0 <= (retry_after_seconds(date) or 0.0) <= 1.0
+    assert retry_after_seconds(FakeHTTPError(500, "boom")) is None
+
+
+def test_backoff_honours_retry_after_up_to_max_delay() -> None:
+    limits = RateLimits(retry_base_delay=0.01, retry_max_delay=5.0)
+    for attempt in range(10):
+        assert 0.0 <= backoff_delay(attempt, limits) <= 5.0
+    assert backoff_delay(0, limits, retry_after=3.0) >= 3.0
+    assert backoff_delay(0, limits, retry_after=120.0) == 5.0
+
+
+def test_call_with_retry_sleeps_for_retry_after_then_succeeds() -> None:
+    limits = RateLimits(max_retries=3, retry_base_delay=0.01, retry_max_delay=60.0)
+    errors = [FakeHTTPError(429, "slow down", retry_after=4), FakeHTTPError(503, "busy")]
+    slept: List[float] = []
+
+    def fn() -> str:
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+
+    assert call_with_retry(fn, limits, sleep=slept.append) == "ok"
+    assert len(slept) == 2
+    assert slept[0] >= 4.0
+    assert slept[1] <= 0.02
+
+
+def test_call_with_retry_gives_up() -> None:
+    limits = RateLimits(max_retries=2, retry_base_delay=0.0)
+    slept: List[float] = []
+    calls = 0
+
+    def failing(status: int) -> str:
+        nonlocal calls
+        calls += 1
+        raise FakeHTTPError(status, "nope")
+
+    with pytest.raises(FakeHTTPError):
+        call_with_retry(lambda: failing(400), limits, sleep=slept.append)
+    assert (calls, slept) == (1, [])
+
+    calls = 0
+    with pytest.raises(FakeHTTPError):
+        call_with_retry(lambda: failing(500), limits, sleep=slept.append)
+    assert calls == 3 and len(slept) == 2
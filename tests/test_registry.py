@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import asyncio
+import gc
+import sys
+from typing import Any
+
+import pytest
+
+from storyos.config import LLMConfig
+from storyos.llm.openai_adapter import OpenAIAdapter
+from storyos.llm.registry import AdapterRegistry
+
+
+def test_openai_adapter_without_httpx(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setitem(sys.modules, "httpx", None)  # makes `import httpx` raise ImportError
+    registry = AdapterRegistry()
+    adapter = registry.get(LLMConfig())
+    assert isinstance(adapter, OpenAIAdapter)
+    assert registry.get(LLMConfig()) is adapter
+    assert registry.stats() == {}
+
+
+def test_async_adapters_are_kept_per_loop() -> None:
+    registry = AdapterRegistry()
+    cfg = LLMConfig(provider="fake")
+
+    async def get() -> Any:
+        return registry.get(cfg, asynchronous=True)
+
+    async def get_twice() -> bool:
+        return registry.get(cfg, asynchronous=True) is registry.get(cfg, asynchronous=True)
+
+    assert asyncio.run(get_twice())
+    first = asyncio.run(get())
+    gc.collect()
+    assert len(registry._loop_entries) == 0  # dropped along with the closed loop
+    assert asyncio.run(get()) is not first
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+import yaml
+
+from storyos.core.runlog import RunLog, compact_journal
+
+
+def _crashed_run(path: Path) -> RunLog:
+    """A run that got through plan_beat and was killed while drafting."""
+    runlog = RunLog.new("run1", chapter="chapter_01", beat="beat_01")
+    runlog.open_journal(path)
+    runlog.step_started("plan_beat")
+    with runlog.span("llm m", "llm", model="m") as span:
+        span.attrs["prompt_tokens"] = 120
+    runlog.llm_cache["misses"] = 1
+    runlog.step_finished("plan_beat", "ran")  # also journals the state
+    runlog.step_started("draft_beat")
+    runlog.start_span("llm m", "llm", model="m")  # never ended
+    runlog.close_journal()
+    return runlog
+
+
+def test_journal_without_end_replays_as_crashed(tmp_path: Path) -> None:
+    path = tmp_path / "run1.jsonl"
+    _crashed_run(path)
+
+    replayed = RunLog.from_journal(path)
+
+    assert replayed.status == "crashed"
+    assert replayed.finished_at is None
+    assert replayed.steps == ["plan_beat", "draft_beat"]
+    assert replayed.step_status == {"plan_beat": "ran"}
+    done, open_span = replayed.spans
+    assert done.end is not None and done.attrs["prompt_tokens"] == 120  # from span_end
+    assert open_span.end is None
+
+
+def test_torn_last_line_is_ignored(tmp_path: Path) -> None:
+    path = tmp_path / "run1.jsonl"
+    _crashed_run(path)
+    with path.open("a", encoding="utf-8") as fh:
+        fh.write('{"ev": "span_end", "id": 1, "en')
+
+    replayed = RunLog.from_journal(path)
+
+    assert replayed.status == "crashed"
+    assert replayed.spans[1].end is None
+    assert replayed.llm_cache == {"misses": 1}  # from the last complete state event
+
+
+def test_finished_run_replays_its_end(tmp_path: Path) -> None:
+    path = tmp_path / "run1.jsonl"
+    runlog = _crashed_run(path)
+    runlog.open_journal(path)
+    runlog.finish(RuntimeError("boom"))
+    runlog.close_journal()
+
+    replayed = RunLog.from_journal(path)
+
+    assert replayed.status == "failed"
+    assert replayed.error == "RuntimeError: boom"
+
+
+def test_compact_journal_recovers_a_crashed_run(tmp_path: Path) -> None:
+    path = tmp_path / "run1.jsonl"
+    _crashed_run(path)
+
+    yaml_path = compact_journal(path)
+
+    assert not path.exists()
+    summary = yaml.safe_load(yaml_path.read_text(encoding="utf-8"))
+    assert summary["status"] == "crashed"
+    assert summary["step_status"] == {"plan_beat": "ran"}
+    trace = json.loads(path.with_suffix(".trace.json").read_text(encoding="utf-8"))
+    assert [e["name"] for e in trace["traceEvents"] if e["ph"] == "X"] == ["llm m", "llm m"]
+
+
+def test_journal_must_start_with_a_run_event(tmp_path: Path) -> None:
+    path = tmp_path / "run1.jsonl"
+    path.write_text('{"ev": "step", "name": "plan_beat", "status": "started"}\n', encoding="utf-8")
+    with pytest.raises(ValueError):
+        RunLog.from_journal(path)
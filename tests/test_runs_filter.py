@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+import pytest
+import typer
+
+from storyos.cli import _run_filter
+
+
+def test_run_filter_builds_where_clause() -> None:
+    f = _run_filter("beat", "ch01", None, None, "ok", "2026-01-31", 500)
+    sql, args = f.where()
+    assert "kind = ?" in sql and "status = ?" in sql and "chapter = ?" in sql
+    assert args[:3] == ["beat", "ch01", "ok"]
+    assert f.since_ms == 1769817600000
+    assert f.min_duration_ms == 500
+
+
+def test_run_filter_rejects_bad_since() -> None:
+    with pytest.raises(typer.Exit):
+        _run_filter(None, None, None, None, None, "last week", None)
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict
+
+import pytest
+import yaml
+
+from storyos.core.runlog import RunLog
+from storyos.core.runs_index import RunFilter, RunsIndex
+
+
+def _summary(root: Path, run_id: str, beat: str, draft_s: float, prompt: int,
+             completion: int) -> Path:
+    d: Dict[str, Any] = {
+        "run_id": run_id, "chapter": "chapter_01", "beat": beat, "model": "m", "status": "ok",
+        "started_at": "2026-03-01T10:00:00+00:00", "finished_at": "2026-03-01T10:00:05+00:00",
+        "step_status": {"plan_beat": "ran", "draft_beat": "ran"},
+        "spans": [
+            {"name": "plan_beat", "kind": "step", "start": 0.0, "end": 0.5},
+            {"name": "draft_beat", "kind": "step", "start": 0.5, "end": 0.5 + draft_s},
+            {"name": "llm m", "kind": "llm", "start": 0.6, "end": 1.0,
+             "attrs": {"prompt_tokens": prompt, "completion_tokens": completion, "cache": "miss"}},
+        ],
+    }
+    path = root / "05_RUNS" / f"{run_id}.yaml"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(yaml.safe_dump(d), encoding="utf-8")
+    return path
+
+
+def _ingest(root: Path, run_id: str, tokens: str | None) -> Path:
+    run_dir = root / "00_INGEST" / "proposals" / run_id
+    run_dir.mkdir(parents=True)
+    lines = ["# Ingest run", "", "- input: /tmp/book.md",
+             "- created_utc: 2026-03-02T10:00:00+00:00",
+             "- model: m", "- seconds: 2.000", "- llm_calls: 3",
+             "- llm_cache: read_write (hits=1, misses=2)"]
+    if tokens is not None:
+        lines.append(f"- tokens: {tokens}")
+    (run_dir / "00_META.md").write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return run_dir
+
+
+@pytest.fixture
+def root(tmp_path: Path) -> Path:
+    root = tmp_path / "story"
+    _summary(root, "beat_fast", "beat_01", draft_s=1.0, prompt=100, completion=50)
+    _summary(root, "beat_slow", "beat_02", draft_s=3.0, prompt=200, completion=80)
+    _ingest(root, "ingest_new", "prompt=5000, completion=900")
+    _ingest(root, "ingest_old", None)
+    # A crashed run left only its journal behind.
+    crashed = RunLog.new("beat_crashed", chapter="chapter_02", beat="beat_01")
+    crashed.open_journal(root / "05_RUNS" / "beat_crashed.jsonl")
+    crashed.step_started("plan_beat")
+    crashed.step_finished("plan_beat", "ran")
+    crashed.close_journal()
+    return root
+
+
+def _index(root: Path) -> RunsIndex:
+    return RunsIndex(root, root / ".storyos" / "index" / "runs.sqlite")
+
+
+def test_refresh_indexes_summaries_journals_and_ingest_runs(root: Path) -> None:
+    index = _index(root)
+    assert index.refresh() == (5, 0)
+    rows = {r["run_id"]: r for r in index.runs(RunFilter(), limit=10)}
+    assert rows["beat_crashed"]["status"] == "incomplete"
+    assert rows["beat_slow"]["duration_ms"] == 5000
+    new = rows["ingest_new"]
+    assert (new["prompt_tokens"], new["completion_tokens"]) == (5000, 900)
+    assert rows["ingest_old"]["prompt_tokens"] == 0
+    assert new["llm_calls"] == 3 and new["cache_hits"] == 1
+    by_tokens = index.runs(RunFilter(), sort="tokens", limit=2)
+    assert [r["run_id"] for r in by_tokens] == ["ingest_new", "beat_slow"]
+
+
+def test_refresh_picks_up_changed_removed_and_approved_runs(root: Path) -> None:
+    index = _index(root)
+    index.refresh()
+    assert index.refresh() == (0, 0)
+
+    _summary(root, "beat_fast", "beat_01", draft_s=1.0, prompt=999, completion=1)  # rewritten
+    (root / "05_RUNS" / "beat_slow.yaml").unlink()
+    (root / "00_INGEST" / "approved" / "ingest_new").mkdir(parents=True)
+    assert index.refresh() == (2, 1)
+
+    rows = {r["run_id"]: r for r in index.runs(RunFilter(), limit=10)}
+    assert "beat_slow" not in rows
+    assert rows["beat_fast"]["prompt_tokens"] == 999
+    assert rows["ingest_new"]["status"] == "approved"
+    assert [r["run_id"] for r in index.runs(RunFilter(status="pending"))] == ["ingest_old"]
+
+
+def test_aggregate_and_slowest_steps(root: Path) -> None:
+    index = _index(root)
+    index.refresh()
+    by_kind = {r["kind"]: r for r in index.aggregate("kind", RunFilter())}
+    assert by_kind["ingest"]["runs"] == 2
+    assert by_kind["ingest"]["prompt_tokens"] == 5000
+    assert by_kind["beat"]["prompt_tokens"] == 300
+
+    steps = index.slowest_steps(RunFilter(chapter="chapter_01"))
+    assert [(s["step"], s["runs"], s["avg_ms"], s["max_ms"]) for s in steps] == [
+        ("draft_beat", 2, 2000, 3000),
+        ("plan_beat", 2, 500, 500),
+    ]